@@ -0,0 +1,5 @@
+"""
+Бенчмарки на синтетических данных. Запуск из корня репозитория:
+
+    python -m benchmarks.bench_package
+"""
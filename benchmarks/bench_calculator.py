@@ -0,0 +1,133 @@
+"""
+Бенчмарк расчета РЦИ (Logic.run) на синтетических файлах.
+
+Замеряет время и пик памяти для каждого макета РЦИ, количества файлов, способа загрузки книг
+и количества процессов разбора (--workers). С --cache дополнительно — повторный расчет с заполненным кэшем разбора.
+Итоговая сумма каждого расчета сверяется с суммами, записанными генератором.
+
+    python -m benchmarks.bench_calculator --counts 1 10 100 1000 --repeat 3
+    python -m benchmarks.bench_calculator --counts 10 100 --load-modes read_only --workers 1 4
+    python -m benchmarks.bench_calculator --counts 100 --load-modes read_only --cache
+    python -m benchmarks.bench_calculator --compare old.json new.json
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from benchmarks import harness, synthetic_rci
+from src.core.calculator.cache import ParseCache
+from src.core.calculator.loader import LOAD_MODES
+from src.core.calculator.logic import Logic
+
+
+def calculate(
+    files: list[Path], load_mode: str, gp: bool, workers: int = 1, cache: Optional[ParseCache] = None
+) -> dict:
+    """Расчет без вывода; на вопрос о госпошлине всегда отвечает gp"""
+    logic = Logic(
+        output_func=lambda *_: None,
+        ask_gp_callback=lambda _: gp,
+        load_mode=load_mode,
+        workers=workers,
+        cache=cache,
+    )
+    return logic.run(files=files)
+
+
+def bench_layout(
+    folder: Path,
+    spec: synthetic_rci.RciSpec,
+    counts: list[int],
+    modes: list[str],
+    repeat: int,
+    gp: bool,
+    workers: list[int] = (1,),
+    cache_folder: Optional[Path] = None,
+) -> dict:
+    """
+    Все замеры одного макета; файлы генерируются один раз на наибольшее количество.
+    Пик памяти замеряется только в основном процессе, поэтому для workers > 1 не записывается.
+    Если задана cache_folder, каждый вариант замеряется ещё и с кэшем разбора, заполненным одним расчетом до замера.
+    """
+    paths, figures = synthetic_rci.make_rci_set(folder / spec.layout, spec, max(counts))
+    results = {}
+    for count in counts:
+        files = paths[:count]
+        expected = synthetic_rci.expected_total(figures[:count], include_gp=gp)
+        for mode in modes:
+            for n in workers:
+                name = f'{spec.layout} x{count} [{mode}]' + (f' w{n}' if n != 1 else '')
+                variants = [(name, None)]
+                if cache_folder is not None:
+                    cache = ParseCache(cache_folder / f'{spec.layout}-{count}-{mode}-{n}.sqlite3')
+                    calculate(files, mode, gp, n, cache)  # заполнение кэша
+                    variants.append((f'{name} cache', cache))
+                for variant, cache in variants:
+                    stats = harness.measure(lambda: calculate(files, mode, gp, n, cache), repeat=repeat, memory=n == 1)
+                    total = stats.pop('result', {}).get('Общая сумма', 0)
+                    stats['total'] = total
+                    if round(total, 2) != expected:
+                        print(f'Внимание: {variant}: сумма {total}, ожидалось {expected}')
+                    results[variant] = stats
+                    if cache is not None:
+                        cache.close()
+    return results
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_calculator', description=__doc__.split('\n')[1])
+    parser.add_argument('--layouts', nargs='+', choices=synthetic_rci.LAYOUTS, default=list(synthetic_rci.LAYOUTS))
+    parser.add_argument('--counts', nargs='+', type=int, default=[1, 10, 100], help='Количества файлов (до 1000)')
+    parser.add_argument('--load-modes', nargs='+', choices=LOAD_MODES, default=list(LOAD_MODES))
+    parser.add_argument(
+        '--workers', nargs='+', type=int, default=[1], help='Количества процессов разбора (1 — без пула)'
+    )
+    parser.add_argument('--cache', action='store_true', help='Замерить и повторный расчет с кэшем разбора')
+    parser.add_argument('--history-rows', type=int, default=200, help='Строк истории в каждом листе')
+    parser.add_argument('--extra-sheets', type=int, default=1, help='Дополнительных листов в каждом файле')
+    parser.add_argument('--no-gp', action='store_true', help='Файлы без строки госпошлины')
+    parser.add_argument('--exclude-gp', action='store_true', help='Отвечать "нет" на вопрос о госпошлине')
+    parser.add_argument('--repeat', type=int, default=3, help='Количество повторов каждого замера')
+    parser.add_argument('--out', default=None, help='Файл результатов (по умолчанию benchmarks/results/...)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='Сравнить два файла результатов и выйти')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        print(harness.compare_results(*map(harness.load_results, args.compare)))
+        return 0
+
+    gp = not args.exclude_gp
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='docprep-bench-rci-') as tmp:
+        for layout in args.layouts:
+            spec = synthetic_rci.RciSpec(
+                layout=layout, history_rows=args.history_rows, extra_sheets=args.extra_sheets, gp=not args.no_gp
+            )
+            cache_folder = Path(tmp) / 'cache' if args.cache else None
+            results.update(
+                bench_layout(Path(tmp), spec, args.counts, args.load_modes, args.repeat, gp, args.workers, cache_folder)
+            )
+
+    params = {
+        'layouts': args.layouts,
+        'counts': args.counts,
+        'load_modes': args.load_modes,
+        'workers': args.workers,
+        'cache': args.cache,
+        'history_rows': args.history_rows,
+        'extra_sheets': args.extra_sheets,
+        'gp_rows': not args.no_gp,
+        'include_gp': gp,
+        'repeat': args.repeat,
+    }
+    path = harness.save_results('calculator', params, results, args.out)
+    print(harness.format_results(results))
+    print(f'Результаты: {path}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
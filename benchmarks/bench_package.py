@@ -0,0 +1,171 @@
+"""
+Бенчмарк обработки пакета на синтетических данных.
+
+Замеряет proccess_statement и каждый его шаг (docx_tools), unzip_archive,
+unzip_all_nested_archives, _prepare_arbiter_folder для каждого способа формирования файлов
+и procces_package целиком. Результаты сохраняются в JSON (см. harness.save_results).
+
+    python -m benchmarks.bench_package --preset large --repeat 5
+    python -m benchmarks.bench_package --compare old.json new.json
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import replace
+from pathlib import Path
+
+from benchmarks import harness, synthetic
+from src.core import file_tools, workflow
+from src.utils.templates_utils import clear_template_cache
+from src.utils.trace_utils import Tracer
+
+
+def bench_statement(root: Path, spec: synthetic.CaseSpec, repeat: int, bank: str, signa: bool) -> dict:
+    """proccess_statement целиком и каждый шаг по отдельности (по отрезкам трассировки)"""
+    original = synthetic.make_statement(root / 'statement.docx', spec)
+    work = root / 'Заявление на включение требований в РТК.docx'
+    total, steps = [], defaultdict(list)
+    clear_template_cache()
+    for _ in range(repeat):
+        shutil.copyfile(original, work)
+        tracer = Tracer()
+        start = time.perf_counter()
+        workflow.proccess_statement(work, bank, signa, format_header=True, tracer=tracer)
+        total.append(time.perf_counter() - start)
+        for span in tracer.spans:
+            steps[span.name].append(span.wall)
+
+    results = {'proccess_statement': harness.summarize(total)}
+    for name, samples in steps.items():
+        results[f'proccess_statement: {name.strip()}'] = harness.summarize(samples)
+    return results
+
+
+def bench_archives(root: Path, spec: synthetic.CaseSpec, repeat: int, modes: list[str], all_in_arb: bool) -> dict:
+    """Распаковка досье, вложенных архивов и формирование папки арбитр"""
+    archive = synthetic.make_dossier(root, spec)
+    results = {}
+    counter = iter(range(sys.maxsize))
+
+    def _fresh_extract() -> Path:
+        path = root / f'extract {next(counter)}'
+        shutil.rmtree(path, ignore_errors=True)
+        return path
+
+    def _unzip(path: Path) -> int:
+        file_tools.unzip_archive(archive, path)
+        return sum(1 for p in path.rglob('*') if p.is_file())
+
+    results['unzip_archive'] = harness.measure(_unzip, lambda: (_fresh_extract(),), repeat)
+
+    def _extracted() -> tuple:
+        path = _fresh_extract()
+        file_tools.unzip_archive(archive, path)
+        return (path,)
+
+    results['unzip_all_nested_archives'] = harness.measure(file_tools.unzip_all_nested_archives, _extracted, repeat)
+
+    dossier = _extracted()[0]
+    file_tools.unzip_all_nested_archives(dossier)
+    for mode in modes:
+
+        def _arbiter(mode=mode) -> int:
+            path, stats = workflow._prepare_arbiter_folder(
+                dossier, synthetic.CASE_NUMBER, synthetic.FIO_DEBTOR, all_in_arb, materialize_mode=mode
+            )
+            shutil.rmtree(path)
+            return stats.files
+
+        results[f'_prepare_arbiter_folder [{mode}]'] = harness.measure(_arbiter, repeat=repeat)
+    return results
+
+
+def bench_package(root: Path, spec: synthetic.CaseSpec, repeat: int, bank: str, signa: bool) -> dict:
+    """procces_package целиком на копии рабочей директории"""
+    case = synthetic.make_case(root / 'case', spec)
+    counter = iter(range(sys.maxsize))
+
+    def _fresh_case() -> tuple:
+        path = root / f'run {next(counter)}'
+        shutil.copytree(case, path)
+        return (str(path),)
+
+    def _run(folder: str) -> None:
+        workflow.procces_package(folder, signa, bank, format_header=True)
+
+    return {'procces_package': harness.measure(_run, _fresh_case, repeat)}
+
+
+def run(spec: synthetic.CaseSpec, repeat: int, modes: list[str], bank: str, signa: bool, all_in_arb: bool) -> dict:
+    """Все замеры во временной папке; шаблоны генерируются в ней же"""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='docprep-bench-') as tmp, harness.working_directory(tmp) as root:
+        synthetic.make_templates(root)
+        for name, bench in (
+            ('statement', lambda path: bench_statement(path, spec, repeat, bank, signa)),
+            ('archives', lambda path: bench_archives(path, spec, repeat, modes, all_in_arb)),
+            ('package', lambda path: bench_package(path, spec, repeat, bank, signa)),
+        ):
+            path = root / name
+            path.mkdir()
+            results.update(bench(path))
+            shutil.rmtree(path, ignore_errors=True)
+    return results
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_package', description=__doc__.split('\n')[1])
+    parser.add_argument('--preset', choices=synthetic.PRESETS, default='medium', help='Размер синтетического пакета')
+    for field in ('obligations', 'paragraphs', 'appendices', 'points', 'files', 'file_size', 'nesting', 'nested_files'):
+        parser.add_argument(
+            f'--{field.replace("_", "-")}', type=int, default=None, help='Переопределить значение пресета'
+        )
+    parser.add_argument('--archive-format', choices=('zip', 'rar'), default=None, help='Формат архивов досье')
+    parser.add_argument('--repeat', type=int, default=5, help='Количество повторов каждого замера')
+    parser.add_argument(
+        '--materialize',
+        nargs='+',
+        choices=file_tools.MATERIALIZE_MODES,
+        default=['auto', 'copy'],
+        help='Способы формирования папки арбитр',
+    )
+    parser.add_argument('--all-in-arb', action='store_true', help='Все файлы обязательств в одной папке арбитр')
+    parser.add_argument('--bank', default=synthetic.BANK_NAME, help='Банк для вставки реквизитов')
+    parser.add_argument('--no-signa', action='store_true', help='Без вставки подписи')
+    parser.add_argument('--out', default=None, help='Файл результатов (по умолчанию benchmarks/results/...)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='Сравнить два файла результатов и выйти')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        print(harness.compare_results(*map(harness.load_results, args.compare)))
+        return 0
+
+    overrides = {
+        field: getattr(args, field)
+        for field in synthetic.CaseSpec.__dataclass_fields__
+        if getattr(args, field, None) is not None
+    }
+    spec = replace(synthetic.PRESETS[args.preset], **overrides)
+    results = run(spec, args.repeat, args.materialize, args.bank, not args.no_signa, args.all_in_arb)
+
+    params = {
+        'preset': args.preset,
+        'spec': spec.to_dict(),
+        'repeat': args.repeat,
+        'materialize': args.materialize,
+        'all_in_arb': args.all_in_arb,
+        'bank': args.bank,
+        'signa': not args.no_signa,
+    }
+    path = harness.save_results('package', params, results, args.out)
+    print(harness.format_results(results))
+    print(f'Результаты: {path}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Бенчмарк масштабирования перенумерации пунктов ПРОСИТ СУД (insert_gosposhlina и renumber_list).
+
+Заявления с разным количеством пунктов генерируются во временной папке. Время на один пункт
+должно оставаться примерно постоянным: если оно растет с количеством пунктов больше, чем в --max-ratio раз,
+бенчмарк завершается с кодом 1 (перенумерация перестала быть линейной).
+
+    python -m benchmarks.bench_renumber
+    python -m benchmarks.bench_renumber --points 100 200 400 800 1600 --repeat 7
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+from docx import Document
+
+from benchmarks import harness, synthetic
+from src.core import docx_tools
+from src.utils.templates_utils import GOSPOSHLINA_TEMPLATE_PATH
+
+
+def _prosit_start(index: docx_tools.StatementIndex) -> int:
+    return next(i for i, text in enumerate(index.texts) if docx_tools.PROSIT_SUD_MARK in text)
+
+
+def bench_points(root: Path, points: int, template, repeat: int) -> dict:
+    """insert_gosposhlina и renumber_list на заявлении с points пунктами; документ загружается вне замера"""
+    spec = synthetic.CaseSpec(obligations=1, paragraphs=1, appendices=5, points=points)
+    statement = synthetic.make_statement(root / f'statement-{points}.docx', spec)
+
+    def _fresh() -> tuple:
+        doc = Document(str(statement))
+        return doc, docx_tools.StatementIndex(doc)
+
+    def _insert(doc, index):
+        docx_tools.insert_gosposhlina(doc, template, index)
+
+    def _renumber(doc, index):
+        last = docx_tools.renumber_list(index, _prosit_start(index), stop=docx_tools.APPENDICES_MARK)
+        assert last == points + 2, f'перенумеровано {last - 1} пунктов из {points + 1}'
+
+    return {
+        f'insert_gosposhlina x{points}': harness.measure(_insert, _fresh, repeat),
+        f'renumber_list x{points}': harness.measure(_renumber, _fresh, repeat),
+    }
+
+
+def check_linear(results: dict, counts: list[int], max_ratio: float) -> list[str]:
+    """Замеры, у которых время на пункт выросло больше чем в max_ratio раз относительно наименьшего"""
+    errors = []
+    for name in ('insert_gosposhlina', 'renumber_list'):
+        per_point = {count: results[f'{name} x{count}']['median'] / count for count in counts}
+        ratio = max(per_point.values()) / min(per_point.values())
+        line = ', '.join(f'{count}: {value * 1e6:.1f} мкс' for count, value in per_point.items())
+        print(f'{name} на пункт — {line}; разброс {ratio:.2f}')
+        if ratio > max_ratio:
+            errors.append(f'{name}: время на пункт выросло в {ratio:.2f} раза (допустимо {max_ratio})')
+    return errors
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_renumber', description=__doc__.split('\n')[1])
+    parser.add_argument('--points', nargs='+', type=int, default=[100, 200, 400, 800], help='Количества пунктов')
+    parser.add_argument('--repeat', type=int, default=5, help='Количество повторов каждого замера')
+    parser.add_argument(
+        '--max-ratio', type=float, default=2.0, help='Допустимый рост времени на пункт (квадратичный рост — в разы)'
+    )
+    parser.add_argument('--out', default=None, help='Файл результатов (по умолчанию benchmarks/results/...)')
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='docprep-bench-renumber-') as tmp:
+        synthetic.make_templates(tmp)
+        template = Document(str(Path(tmp) / GOSPOSHLINA_TEMPLATE_PATH))
+        for points in args.points:
+            results.update(bench_points(Path(tmp), points, template, args.repeat))
+
+    params = {'points': args.points, 'repeat': args.repeat, 'max_ratio': args.max_ratio}
+    path = harness.save_results('renumber', params, results, args.out)
+    print(harness.format_results(results))
+    print(f'Результаты: {path}')
+
+    errors = check_linear(results, args.points, args.max_ratio)
+    for error in errors:
+        print(f'ОШИБКА: {error}')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
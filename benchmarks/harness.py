@@ -0,0 +1,152 @@
+"""
+Общие инструменты бенчмарков: замер времени, сводка по повторам, сохранение
+результатов в JSON и сравнение двух запусков (например, до и после коммита).
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_FOLDER = REPO_ROOT / 'benchmarks' / 'results'
+
+
+def summarize(samples: list[float]) -> dict:
+    """Сводка по повторам: min, median, mean, max и все замеры, сек"""
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'max': max(samples),
+        'runs': samples,
+    }
+
+
+def measure(func: Callable, setup: Optional[Callable[[], tuple]] = None, repeat: int = 5, memory: bool = False) -> dict:
+    """
+    Замер времени func по repeat повторам.
+    setup() выполняется перед каждым повтором вне замера и возвращает аргументы для func.
+    Результат последнего вызова func сохраняется в поле 'result', если он не None.
+    Если memory=True, выполняется ещё один прогон под tracemalloc: пик памяти Python в поле 'peak_memory', байт.
+    Он не входит в замеры времени, потому что tracemalloc заметно замедляет выполнение.
+    """
+    samples = []
+    result = None
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        result = func(*args)
+        samples.append(time.perf_counter() - start)
+    stats = summarize(samples)
+    if result is not None:
+        stats['result'] = result
+    if memory:
+        stats['peak_memory'] = peak_memory(func, setup)
+    return stats
+
+
+def peak_memory(func: Callable, setup: Optional[Callable[[], tuple]] = None) -> int:
+    """Пик памяти, выделенной Python за один вызов func, байт"""
+    args = setup() if setup else ()
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@contextmanager
+def working_directory(path: str | Path):
+    """Временная смена текущей папки (шаблоны загружаются по относительным путям)"""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield Path(path)
+    finally:
+        os.chdir(previous)
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ['git', *args], cwd=REPO_ROOT, capture_output=True, text=True, timeout=30, check=True
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.strip()
+
+
+def environment() -> dict:
+    """Коммит и окружение запуска — чтобы результаты разных коммитов можно было сравнить"""
+    status = _git('status', '--porcelain', '--untracked-files=no')
+    return {
+        'commit': _git('rev-parse', 'HEAD'),
+        'dirty': bool(status) if status is not None else None,
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def save_results(suite: str, params: dict, results: dict, path: Optional[str | Path] = None) -> Path:
+    """
+    Сохраняет результаты в JSON.
+    По умолчанию — benchmarks/results/<suite>-<коммит>-<время>.json
+    """
+    env = environment()
+    if path is None:
+        commit = (env['commit'] or 'nogit')[:10]
+        path = RESULTS_FOLDER / f'{suite}-{commit}-{time.strftime("%Y%m%d-%H%M%S")}.json'
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {'suite': suite, 'environment': env, 'params': params, 'results': results}
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+    return path
+
+
+def load_results(path: str | Path) -> dict:
+    return json.loads(Path(path).read_text(encoding='utf-8'))
+
+
+def format_results(results: dict) -> str:
+    """Таблица: название, median и min, мс, и пик памяти, МБ, если он замерялся"""
+    width = max((len(name) for name in results), default=0)
+    memory = any('peak_memory' in stats for stats in results.values())
+    lines = [f'{"":{width}}  {"median, мс":>12}  {"min, мс":>12}' + (f'  {"пик, МБ":>9}' if memory else '')]
+    for name, stats in results.items():
+        line = f'{name:{width}}  {stats["median"] * 1000:12.1f}  {stats["min"] * 1000:12.1f}'
+        if 'peak_memory' in stats:
+            line += f'  {stats["peak_memory"] / 1024 / 1024:9.1f}'
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def compare_results(old: dict, new: dict) -> str:
+    """
+    Сравнение двух файлов результатов по медиане.
+    Ускорение > 1 — новый запуск быстрее.
+    """
+    old_results, new_results = old['results'], new['results']
+    names = [name for name in new_results if name in old_results]
+    width = max((len(name) for name in names), default=0)
+    lines = [
+        f'{old["environment"].get("commit") or "?"} -> {new["environment"].get("commit") or "?"}',
+        f'{"":{width}}  {"было, мс":>12}  {"стало, мс":>12}  {"ускорение":>9}',
+    ]
+    for name in names:
+        before, after = old_results[name]['median'], new_results[name]['median']
+        speedup = before / after if after else float('inf')
+        lines.append(f'{name:{width}}  {before * 1000:12.1f}  {after * 1000:12.1f}  {speedup:8.2f}x')
+    if old['params'] != new['params']:
+        lines.append('Внимание: параметры запусков различаются')
+    return '\n'.join(lines)
@@ -0,0 +1,270 @@
+"""
+Генерация синтетических входных данных для бенчмарков обработки пакета:
+заявление РТК, шаблоны и архив досье с вложенными архивами.
+
+Заявление содержит те же метки разделов, по которым работает docx_tools
+(Обязательство №, ПРОСИТ СУД:, ПРИЛОЖЕНИЯ:, Реквизиты ПАО Сбербанк, Электронный адрес),
+и строки из текстовых шаблонов удаления, поэтому каждый шаг обработки выполняет реальную работу.
+"""
+
+import io
+import random
+import shutil
+import struct
+import zipfile
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from docx import Document
+from docx.shared import Pt
+
+from src.core.docx_tools import APPENDICES_MARK, OBYAZATELSTVO_MARK, PROSIT_SUD_MARK
+from src.utils.templates_utils import (
+    BANK_REQUISITES_FILE,
+    GOSPOSHLINA_TEMPLATE_PATH,
+    SIGNA_PATH,
+    ZALOG_CONTACTS_TEMPLATE_PATH,
+)
+
+REPO_TEMPLATES = Path(__file__).resolve().parent.parent / 'templates'
+
+FIO_DEBTOR = 'Иванов Иван Иванович'
+CASE_NUMBER = 'А40-123456/2024'
+BANK_NAME = 'ПАО Сбербанк'
+REQUISITES_ROWS = 4  # Размер таблицы реквизитов в заявлении и в шаблоне реквизитов
+REQUISITES_COLS = 2
+
+_FILLER = (
+    'Между ПАО Сбербанк и должником заключен кредитный договор, по условиям которого банк '
+    'предоставил заемщику денежные средства, а заемщик обязался возвратить полученный кредит '
+    'и уплатить проценты за пользование им в размере, в сроки и на условиях договора.'
+)
+
+
+@dataclass
+class CaseSpec:
+    """
+    Размеры синтетического пакета.
+
+    :param obligations: Количество обязательств (разделов в заявлении и папок в досье)
+    :param paragraphs: Абзацев текста в каждом обязательстве
+    :param appendices: Пунктов в разделе ПРИЛОЖЕНИЯ
+    :param points: Пунктов в разделе ПРОСИТ СУД
+    :param files: Файлов в папке каждого обязательства
+    :param file_size: Размер каждого файла, байт
+    :param nesting: Глубина вложенных архивов в папке обязательства (0 — без вложенных архивов)
+    :param nested_files: Файлов на каждом уровне вложенного архива
+    :param archive_format: Формат архива досье и вложенных архивов: zip или rar
+    :param seed: Зерно генератора содержимого файлов
+    """
+
+    obligations: int = 5
+    paragraphs: int = 10
+    appendices: int = 20
+    points: int = 4
+    files: int = 10
+    file_size: int = 64 * 1024
+    nesting: int = 1
+    nested_files: int = 3
+    archive_format: str = 'zip'
+    seed: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+PRESETS = {
+    'small': CaseSpec(obligations=2, paragraphs=5, appendices=8, files=5, file_size=16 * 1024, nesting=1),
+    'medium': CaseSpec(),
+    'large': CaseSpec(obligations=30, paragraphs=30, appendices=120, points=8, files=40, nesting=2, nested_files=5),
+}
+
+
+def _obligation_folder(num: int) -> str:
+    """Имя папки обязательства: номер обязательства — третье слово с конца"""
+    return f'Кредитный договор {num} от 15.03.2021'
+
+
+# ==== Заявление ====
+def make_statement(path: str | Path, spec: CaseSpec) -> Path:
+    """Заявление на включение требований в РТК с разделами и строками из шаблонов удаления"""
+    doc = Document()
+    doc.add_paragraph('В Арбитражный суд города Москвы')
+    doc.add_paragraph(f'Кредитор: {BANK_NAME}')
+    doc.add_paragraph('Должник:')
+    doc.add_paragraph(FIO_DEBTOR)
+    doc.add_paragraph(f'Дело № {CASE_NUMBER}')
+    doc.add_paragraph('ЗАЯВЛЕНИЕ')
+
+    for num in range(1, spec.obligations + 1):
+        doc.add_paragraph(f'{OBYAZATELSTVO_MARK} {num}')
+        doc.add_paragraph(f'Кредитный договор № {1000 + num} под 0.0 % годовых. Иное')
+        doc.add_paragraph('Кредит погашается внесением ежемесячных аннуитетных платежей')
+        for _ in range(spec.paragraphs):
+            doc.add_paragraph(_FILLER)
+        doc.add_paragraph('Задолженность по неустойке в размере 1 000 руб.')
+
+    doc.add_paragraph(PROSIT_SUD_MARK)
+    doc.add_paragraph('')
+    doc.add_paragraph(f'1. Включить в реестр требований кредиторов {FIO_DEBTOR} в размере 100 000 руб.')
+    for num in range(2, spec.points + 2):
+        doc.add_paragraph('')
+        para = doc.add_paragraph()
+        para.add_run(f'{num}.').bold = True
+        para.add_run(f' Требование номер {num} в размере 1 000 руб.')
+    doc.add_paragraph('')
+    doc.add_paragraph('Задолженность по неустойке в размере 5 000 руб.')
+
+    para = doc.add_paragraph()
+    para.add_run(APPENDICES_MARK).bold = True
+    removable = ('Выписка из АС «Мобильный банк» ', 'Копия графика платежей по договору')
+    for num in range(1, spec.appendices + 1):
+        text = removable[num % 2] if num % 5 == 0 else f'Копия кредитного договора № {1000 + num}'
+        run = doc.add_paragraph().add_run(f'{num}. {text}')
+        run.font.size = Pt(11)
+
+    doc.add_paragraph(f'Реквизиты {BANK_NAME} для погашения задолженности')
+    doc.add_table(rows=REQUISITES_ROWS, cols=REQUISITES_COLS)
+    doc.add_paragraph('Электронный адрес: Bankrot_FL@sberbank.ru')
+    doc.add_paragraph('Представитель по доверенности')
+
+    path = Path(path)
+    doc.save(path)
+    return path
+
+
+# ==== Шаблоны ====
+def _png_1x1() -> bytes:
+    """Минимальная PNG-картинка для подписи"""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', 1, 1, 8, 2, 0, 0, 0)
+    return (
+        b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(b'\0\0\0\0')) + chunk(b'IEND', b'')
+    )
+
+
+def make_templates(root: str | Path) -> Path:
+    """
+    Папка templates для обработки заявления в root.
+    Текстовые шаблоны удаления копируются из репозитория, шаблоны docx и подпись генерируются,
+    чтобы их структура совпадала с синтетическим заявлением.
+    """
+    root = Path(root)
+    shutil.copytree(REPO_TEMPLATES, root / 'templates', ignore=shutil.ignore_patterns('*.docx', '*.png'))
+
+    doc = Document()
+    doc.add_paragraph('Взыскать с ФИО в пользу ПАО Сбербанк расходы по оплате государственной пошлины.')
+    doc.add_paragraph('')
+    doc.save(root / GOSPOSHLINA_TEMPLATE_PATH)
+
+    doc = Document()
+    doc.add_paragraph('Контакты по вопросам залогового имущества: 8-800-000-00-00')
+    doc.save(root / ZALOG_CONTACTS_TEMPLATE_PATH)
+
+    doc = Document()
+    for bank in (BANK_NAME, 'АО Банк'):
+        doc.add_paragraph(f'Реквизиты {bank}')
+        table = doc.add_table(rows=REQUISITES_ROWS, cols=REQUISITES_COLS)
+        table.cell(0, 0).text = bank
+        for row in range(1, REQUISITES_ROWS):
+            table.cell(row, 0).text = f'Реквизит {row}'
+            table.cell(row, 1).text = str(40702810000000000000 + row)
+    doc.save(root / BANK_REQUISITES_FILE)
+
+    (root / SIGNA_PATH).write_bytes(_png_1x1())
+    return root / 'templates'
+
+
+# ==== Архивы ====
+def _rar_block(kind: int, flags: int, body: bytes) -> bytes:
+    data = struct.pack('<BHH', kind, flags, 7 + len(body)) + body
+    return struct.pack('<H', zlib.crc32(data) & 0xFFFF) + data
+
+
+def rar_bytes(members: list[tuple[str, bytes]]) -> bytes:
+    """
+    Архив RAR 4 без сжатия (метод store) с именами в UTF-8.
+    Генератор нужен, потому что утилиты для создания RAR обычно не установлены.
+    """
+    out = [b'Rar!\x1a\x07\x00', _rar_block(0x73, 0, struct.pack('<HI', 0, 0))]
+    for name, data in members:
+        name_bytes = name.replace('/', '\\').encode('utf-8')
+        body = struct.pack(
+            '<IIBIIBBHI',
+            len(data),  # размер в архиве
+            len(data),  # размер после распаковки
+            2,  # ОС: Windows
+            zlib.crc32(data) & 0xFFFFFFFF,
+            0x5A6F0000,  # время в формате DOS
+            20,  # версия для распаковки
+            0x30,  # метод: без сжатия
+            len(name_bytes),
+            0x20,  # атрибут: архивный
+        )
+        out.append(_rar_block(0x74, 0x8000 | 0x0200, body + name_bytes) + data)  # LONG_BLOCK | UNICODE
+    out.append(_rar_block(0x7B, 0x4000, b''))
+    return b''.join(out)
+
+
+def archive_bytes(fmt: str, members: list[tuple[str, bytes]]) -> bytes:
+    """Архив zip или rar из списка (имя, содержимое)"""
+    if fmt == 'rar':
+        return rar_bytes(members)
+    if fmt != 'zip':
+        raise ValueError(f'Неподдерживаемый формат архива: {fmt}')
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members:
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def _nested_archive(spec: CaseSpec, rnd: random.Random, depth: int) -> bytes:
+    """Вложенный архив: nested_files файлов и архив следующего уровня"""
+    members = [(f'Скан {num}.pdf', rnd.randbytes(spec.file_size)) for num in range(1, spec.nested_files + 1)]
+    if depth < spec.nesting:
+        members.append((f'Уровень {depth + 1}.{spec.archive_format}', _nested_archive(spec, rnd, depth + 1)))
+    return archive_bytes(spec.archive_format, members)
+
+
+def dossier_members(spec: CaseSpec) -> list[tuple[str, bytes]]:
+    """Содержимое архива досье: папки обязательств, вложенные архивы и 'Документы о банкротстве'"""
+    rnd = random.Random(spec.seed)
+    members = []
+    for num in range(1, spec.obligations + 1):
+        folder = _obligation_folder(1000 + num)
+        for file_num in range(1, spec.files + 1):
+            members.append((f'{folder}/Документ {file_num}.pdf', rnd.randbytes(spec.file_size)))
+        if spec.nesting:
+            members.append((f'{folder}/Документы.{spec.archive_format}', _nested_archive(spec, rnd, 1)))
+    members.append(('Документы о банкротстве/Решение суда.pdf', rnd.randbytes(spec.file_size)))
+    return members
+
+
+def dossier_name(fmt: str) -> str:
+    """Имя архива досье, которое находит file_tools.find_dossier_archive"""
+    return f'Досье по банкротству {CASE_NUMBER.replace("/", "_")} {FIO_DEBTOR}.{fmt}'
+
+
+def make_dossier(folder: str | Path, spec: CaseSpec) -> Path:
+    """Архив досье в папке folder"""
+    path = Path(folder) / dossier_name(spec.archive_format)
+    path.write_bytes(archive_bytes(spec.archive_format, dossier_members(spec)))
+    return path
+
+
+def make_case(folder: str | Path, spec: CaseSpec) -> Path:
+    """
+    Рабочая директория пакета: заявление и архив досье.
+    Обработка пакета (procces_package) находит только архив досье .zip,
+    поэтому при archive_format='rar' в формате RAR будут только вложенные архивы.
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    make_statement(folder / 'Заявление на включение требований в РТК.docx', spec)
+    (folder / dossier_name('zip')).write_bytes(archive_bytes('zip', dossier_members(spec)))
+    return folder
@@ -0,0 +1,245 @@
+"""
+Генерация синтетических файлов РЦИ (расчет цены иска) для бенчмарков калькулятора.
+
+Каждый макет повторяет то, что читает Logic.run:
+- titul       — 'Титульный лист' (ЦСКО) и лист госпошлины 'Расчёт'
+- titul_card  — 'Титульный лист' (МСЦ) и листы госпошлины 'Приложение 5', 'Расчет_7'
+- sheet1      — 'Sheet1': суммы в колонке F, заголовок в A2
+- dogovor     — 'Задолженность по договору': суммы в колонке B
+- operations  — 'Отчет по операциям': суммы строками '12 345,67' в колонке C
+
+Размер файла задаётся строками истории (график платежей и листы госпошлины) и дополнительными листами —
+именно они занимают большую часть реальных РЦИ, хотя расчет их не читает.
+"""
+
+import random
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+from openpyxl import Workbook
+
+LAYOUTS = ('titul', 'titul_card', 'sheet1', 'dogovor', 'operations')
+RCI_PREFIX = 'Расчет цены иска'  # Префикс имени, по которому контроллер отбирает файлы
+
+FIO_DEBTOR = 'Иванов Иван Иванович'
+HEADER_CSKO = 'Управление администрирования кредитов ЦСКО'
+HEADER_MSC = 'Управление администрирования кредитов МСЦ'
+
+
+@dataclass
+class RciSpec:
+    """
+    Параметры синтетического РЦИ.
+
+    :param layout: Макет из LAYOUTS
+    :param history_rows: Строк в графике платежей и в листах госпошлины
+    :param extra_sheets: Дополнительных листов с историей операций
+    :param gp: Добавить строку госпошлины (вызывает вопрос об учете госпошлины)
+    :param seed: Зерно генератора сумм
+    """
+
+    layout: str = 'titul'
+    history_rows: int = 200
+    extra_sheets: int = 1
+    gp: bool = True
+    seed: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _title(num: int, length: int) -> str:
+    """Заголовок обязательства с датой 'по состоянию на', дополненный до length символов"""
+    text = (
+        f'Расчет цены иска по Кредитному договору № {num:06d} от 15.03.2021 '
+        f'заемщик {FIO_DEBTOR} (должник) по состоянию на 01.10.2024 года'
+    )
+    return text.ljust(length, ' ')
+
+
+def _amount(rnd: random.Random, low: int, high: int) -> float:
+    return round(rnd.uniform(low, high), 2)
+
+
+def _fill_history(ws, rnd: random.Random, rows: int, first_row: int = 30) -> None:
+    """Строки истории: дата, суммы и остатки — как в графике платежей"""
+    day = date(2021, 3, 15)
+    balance = 500000.0
+    for row in range(first_row, first_row + rows):
+        payment = _amount(rnd, 1000, 20000)
+        balance = round(balance - payment, 2)
+        day += timedelta(days=30)
+        for col, value in enumerate(
+            (day, 'Погашение', payment, round(payment * 0.3, 2), round(payment * 0.7, 2), balance, 'RUB', row), 1
+        ):
+            ws.cell(row=row, column=col, value=value)
+
+
+def _add_extra_sheets(wb: Workbook, spec: RciSpec, rnd: random.Random) -> None:
+    for num in range(1, spec.extra_sheets + 1):
+        ws = wb.create_sheet(f'История операций {num}')
+        ws['a1'] = 'Дата'
+        _fill_history(ws, rnd, spec.history_rows, first_row=2)
+
+
+def _titul(wb: Workbook, spec: RciSpec, rnd: random.Random, num: int) -> dict:
+    card = spec.layout == 'titul_card'
+    ws = wb.active
+    ws.title = 'Титульный лист'
+    ws['a1'] = HEADER_MSC if card else HEADER_CSKO
+    ws['a5'] = _title(num, 160)
+    ws['a7'] = 'Расчет задолженности'
+
+    figures = {
+        'od': _amount(rnd, 50000, 900000),
+        'prc': _amount(rnd, 1000, 90000),
+        'neus': _amount(rnd, 100, 9000),
+        'km': _amount(rnd, 10, 900) if card else 0.0,
+        'gp': _amount(rnd, 1000, 9000) if spec.gp else 0.0,
+    }
+    rows = [
+        ('Задолженность по основному долгу (ссудная задолженность)', figures['od']),
+        ('Задолженность по процентам', figures['prc']),
+        ('Неустойка по кредиту', figures['neus']),
+    ]
+    if card:
+        rows.append(('Комиссии на отчетную дату', figures['km']))
+    if spec.gp:
+        rows.append(('Госпошлина', figures['gp']))
+    ws['a9'] = 'Вид задолженности'
+    ws['i9'] = 'Сумма, руб.'
+    for row, (label, value) in enumerate(rows, start=10):
+        ws.cell(row=row, column=1, value=label)
+        ws.cell(row=row, column=9, value=value)
+    ws.cell(row=26, column=1, value='Итого')
+
+    gp_sheets = ('Приложение 5', 'Расчет_7') if card else ('Расчёт',)
+    for title in gp_sheets:
+        sheet = wb.create_sheet(title)
+        sheet['a1'] = sheet['a7'] = f'Расчет госпошлины {num:06d}'
+        sheet['i6'] = sheet['e11'] = sheet['j17'] = 0
+        _fill_history(sheet, rnd, spec.history_rows)
+    return figures
+
+
+def _sheet1(wb: Workbook, spec: RciSpec, rnd: random.Random, num: int) -> dict:
+    ws = wb.active
+    ws.title = 'Sheet1'
+    ws['a2'] = _title(num, 120)
+    figures = {
+        'od': _amount(rnd, 50000, 900000),
+        'prc': _amount(rnd, 1000, 90000),
+        'neus': _amount(rnd, 100, 9000),
+        'gp': _amount(rnd, 1000, 9000) if spec.gp else 0.0,
+    }
+    rows = [
+        ('Ссудная задолженность', figures['od']),
+        ('Проценты за кредит', f'{figures["prc"]:.2f}'.replace('.', ',')),
+        ('Неустойка по процентам', figures['neus']),
+    ]
+    if spec.gp:
+        rows.append(('Госпошлина', figures['gp']))
+    for row, (label, value) in enumerate(rows, start=8):
+        ws.cell(row=row, column=1, value=label)
+        ws.cell(row=row, column=6, value=value)  # колонка F, в листе не больше 6 колонок
+    return figures
+
+
+def _dogovor(wb: Workbook, spec: RciSpec, rnd: random.Random, num: int) -> dict:
+    ws = wb.active
+    ws.title = 'Задолженность по договору'
+    ws['a1'] = 'Задолженность по договору'
+    ws['c4'] = f'Кредитный договор № {num:06d} от 15.03.2021'
+    ws['a5'] = _title(num, 120)
+    figures = {
+        'od': _amount(rnd, 50000, 900000),
+        'prc': _amount(rnd, 1000, 90000),
+        'penod': _amount(rnd, 100, 9000),
+        'penprc': _amount(rnd, 100, 9000),
+        'neus': _amount(rnd, 100, 9000),
+        'gp': _amount(rnd, 1000, 9000) if spec.gp else 0.0,
+    }
+    rows = [
+        ('Просроченная ссудная задолженность', figures['od']),
+        ('Просроченная задолженность по процентам', figures['prc']),
+        ('Пени за кредит (присужденные)', figures['penod']),
+        ('Пени за проценты (присужденные)', figures['penprc']),
+        ('Неустойка по кредиту', figures['neus']),
+    ]
+    if spec.gp:
+        rows.append(('Госпошлина', figures['gp']))
+    for row, (label, value) in enumerate(rows, start=8):
+        ws.cell(row=row, column=1, value=label)
+        ws.cell(row=row, column=2, value=value)
+        ws.cell(row=row, column=9, value=value)
+    return figures
+
+
+def _operations(wb: Workbook, spec: RciSpec, rnd: random.Random, num: int) -> dict:
+    ws = wb.active
+    ws.title = 'Отчет по операциям'
+    ws['a1'] = _title(num, 260)
+    figures = {
+        'od': _amount(rnd, 50000, 900000),
+        'prc': _amount(rnd, 1000, 90000),
+        'neus': _amount(rnd, 100, 9000),
+        'pp': _amount(rnd, 100, 9000),
+    }
+    neus_od = round(figures['neus'] / 2, 2)
+    rows = [
+        ('Основной долг', figures['od']),
+        ('Проценты за пользование кредитом', figures['prc']),
+        ('Неустойка за просроченную ссуду', neus_od),
+        ('Неустойка за просроченные проценты', round(figures['neus'] - neus_od, 2)),
+        ('Просроченные платежи', figures['pp']),
+    ]
+    for row, (label, value) in enumerate(rows, start=18):
+        ws.cell(row=row, column=1, value=label)
+        ws.cell(row=row, column=3, value=f'{value:,.2f}'.replace(',', ' ').replace('.', ','))
+    return figures
+
+
+_BUILDERS = {
+    'titul': _titul,
+    'titul_card': _titul,
+    'sheet1': _sheet1,
+    'dogovor': _dogovor,
+    'operations': _operations,
+}
+
+
+def make_rci(path: str | Path, spec: RciSpec, num: int = 1) -> dict:
+    """
+    Файл РЦИ в макете spec.layout.
+    :return: Суммы, записанные в файл, по видам задолженности (od, prc, neus, gp, ...)
+    """
+    if spec.layout not in _BUILDERS:
+        raise ValueError(f'Неизвестный макет РЦИ: {spec.layout}')
+    rnd = random.Random(f'{spec.seed}-{spec.layout}-{num}')
+    wb = Workbook()
+    figures = _BUILDERS[spec.layout](wb, spec, rnd, num)
+    _add_extra_sheets(wb, spec, rnd)
+    wb.save(path)
+    wb.close()
+    return figures
+
+
+def make_rci_set(folder: str | Path, spec: RciSpec, count: int) -> tuple[list[Path], list[dict]]:
+    """
+    count файлов РЦИ с разными суммами в папке folder.
+    :return: (пути к файлам, суммы каждого файла)
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    paths, figures = [], []
+    for num in range(1, count + 1):
+        path = folder / f'{RCI_PREFIX} {spec.layout} {num}.xlsx'
+        figures.append(make_rci(path, spec, num))
+        paths.append(path)
+    return paths, figures
+
+
+def expected_total(figures: list[dict], include_gp: bool = True) -> float:
+    """Общая сумма, которую должен получить расчет по этим файлам"""
+    return round(sum(value for f in figures for key, value in f.items() if include_gp or key != 'gp'), 2)
@@ -1,17 +1,133 @@
 # main.py
+import argparse
 import sys
+from pathlib import Path
 
-from PyQt6.QtWidgets import QApplication
 
-from src.ui.main_window import DocPrepApp  # Импортируем GUI
+def main():
+    from PyQt6.QtWidgets import QApplication
 
+    from src.ui.main_window import DocPrepApp  # Импортируем GUI
 
-def main():
     app = QApplication(sys.argv)
     window = DocPrepApp()
     window.show()
     sys.exit(app.exec())
 
 
+def batch(argv: list[str]) -> int:
+    """Пакетная обработка папок дел без GUI: python main.py batch <root>"""
+    from src.core.batch import run_batch, write_summary
+    from src.core.file_tools import MATERIALIZE_MODES
+    from src.utils.settings_utils import (
+        load_all_in_arbitter,
+        load_arbitter_name,
+        load_checkpoint,
+        load_format_header,
+        load_materialize_mode,
+    )
+
+    parser = argparse.ArgumentParser(prog='main.py batch', description='Формирование пакетов по всем папкам дел')
+    parser.add_argument('root', help='Корневая папка с папками дел')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Количество процессов (по умолчанию — ядра)')
+    parser.add_argument('--bank', default=None, help='Банк для вставки реквизитов')
+    parser.add_argument('--signa', action='store_true', help='Вставить подпись')
+    parser.add_argument('--save-orig', action='store_true', help='Сохранить исходное заявление')
+    parser.add_argument(
+        '--checkpoint',
+        action='store_true',
+        help='При ошибке шага сохранить заявление с успешными шагами (по умолчанию — из настроек)',
+    )
+    parser.add_argument(
+        '--materialize',
+        choices=MATERIALIZE_MODES,
+        default=None,
+        help='Способ формирования файлов в папке арбитр (по умолчанию — из настроек)',
+    )
+    parser.add_argument('--trace', action='store_true', help='Сохранить трассировку времени обработки каждого дела')
+    parser.add_argument('--summary', default=None, help='Файл итогов (по умолчанию <root>/batch_summary.json)')
+    args = parser.parse_args(argv)
+
+    def _print_result(result):
+        if result.ok:
+            print(f'[OK] {result.case_number} {result.fio_debtor} ({result.elapsed:.1f} с)')
+        else:
+            print(f'[ОШИБКА] {result.folder}: {result.error}')
+
+    results = run_batch(
+        args.root,
+        workers=args.workers,
+        signa=args.signa,
+        bank=args.bank,
+        save_orig=args.save_orig,
+        all_in_arb=load_all_in_arbitter(),
+        arb_name=load_arbitter_name(),
+        format_header=load_format_header(),
+        checkpoint=args.checkpoint or load_checkpoint(),
+        materialize_mode=args.materialize or load_materialize_mode(),
+        trace=args.trace,
+        on_result=_print_result,
+    )
+
+    summary_path = write_summary(results, args.summary or Path(args.root) / 'batch_summary.json')
+    failed = sum(1 for r in results if not r.ok)
+    print(f'Обработано дел: {len(results)}, ошибок: {failed}. Итоги: {summary_path}')
+    return 1 if failed else 0
+
+
+def rci(argv: list[str]) -> int:
+    """Расчет РЦИ без GUI: python main.py rci <файлы или папки>"""
+    import os
+    import re
+    from contextlib import nullcontext
+
+    from src.core.calculator import gp_policy
+    from src.core.calculator.cache import ParseCache
+    from src.core.calculator.logic import Logic
+
+    modes = (gp_policy.INCLUDE, gp_policy.EXCLUDE, gp_policy.THRESHOLD, gp_policy.RULES)
+    parser = argparse.ArgumentParser(prog='main.py rci', description='Расчет цены иска по файлам РЦИ')
+    parser.add_argument('paths', nargs='+', help='Файлы РЦИ или папки с файлами "Расчет цены иска*.xlsx"')
+    parser.add_argument('-j', '--workers', type=int, default=1, help='Процессов для разбора (0 — по числу ядер)')
+    parser.add_argument('--gp', choices=modes, default=gp_policy.EXCLUDE, help='Учет госпошлины (по умолчанию exclude)')
+    parser.add_argument('--gp-threshold', type=float, default=0, help='Для --gp threshold: учитывать меньше порога')
+    parser.add_argument('--gp-rules', default=None, help='Для --gp rules: JSON {"номер обязательства": true/false}')
+    parser.add_argument('--no-cache', action='store_true', help='Не использовать кэш разобранных файлов')
+    args = parser.parse_args(argv)
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files += [
+                    os.path.join(root, f)
+                    for f in sorted(names)
+                    if f.lower().endswith('.xlsx') and f.startswith('Расчет цены иска')
+                ]
+        else:
+            files.append(path)
+
+    try:
+        policy = gp_policy.make_policy(args.gp, args.gp_threshold, args.gp_rules)
+    except (OSError, ValueError) as e:
+        print(f'Правила учета госпошлины: {e}')
+        return 2
+
+    def _print(text):
+        print(re.sub(r'<[^>]+>', '', str(text)))
+
+    with nullcontext() if args.no_cache else ParseCache() as cache:
+        logic = Logic(output_func=_print, workers=args.workers or None, cache=cache, gp_policy=policy)
+        total = logic.run(files=files)
+
+    for key, value in total.items():
+        print(f'{key}: {value}')
+    return 1 if any(o.error for o in logic.result.obligations) else 0
+
+
 if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        sys.exit(batch(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'rci':
+        sys.exit(rci(sys.argv[2:]))
     main()
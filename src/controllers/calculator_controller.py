@@ -1,10 +1,21 @@
 import os
 
+from PyQt6.QtCore import QCoreApplication
 from PyQt6.QtWidgets import QFileDialog, QMessageBox
 
-import src.core.calculator.utils as rci_utils
-from src.core.calculator.logic import Logic
-from src.utils.settings_utils import load_resave_rci, load_show_btn_resave
+from src.controllers.workers import CalculatorWorker
+from src.core.calculator.gp_policy import make_policy
+from src.utils.settings_utils import (
+    load_cache_rci,
+    load_gp_mode,
+    load_gp_rules_file,
+    load_gp_threshold,
+    load_parallel_rci,
+    load_resave_rci,
+    load_show_btn_resave,
+)
+
+SHUTDOWN_POLL_MS = 50  # Период обработки событий GUI, пока фоновый расчет останавливается
 
 
 class CalculatorController:
@@ -16,7 +27,7 @@ class CalculatorController:
         self.view.reset_clicked.connect(self.handle_reset)
         self.view.resave_clicked.connect(self.handle_resave)
 
-        self.logic = Logic(output_func=self.view.append_text, ask_gp_callback=self.view.ask_gp_callback)
+        self.worker = None  # Текущий расчет в фоне
         self.files = []  # список для хранения выбранных файлов
         self.show_btn_resave()
 
@@ -56,21 +67,70 @@ class CalculatorController:
             QMessageBox.warning(self.view, 'Ошибка', 'Пожалуйста, выберите файлы для расчета.')
             return
 
-        self.view.append_text('\nРасчет ...')
-        result = self.logic.run(files=self.files)
+        try:
+            gp_policy = make_policy(load_gp_mode(), load_gp_threshold(), load_gp_rules_file())
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self.view, 'Ошибка', f'Не удалось прочитать правила учета госпошлины:\n{e}')
+            return
 
-        self.view.update_totals(result)  # <-- отдаём результат во view
-        if load_resave_rci():
-            logs = rci_utils.resave_files(self.files)
-            self.view.append_text(logs)
+        self.view.append_text('\nРасчет ...')
+        workers = None if load_parallel_rci() else 1  # None — по числу ядер
+        self._start_worker(
+            CalculatorWorker(
+                self.files,
+                self.view.ask_gp_callback,
+                resave=load_resave_rci(),
+                workers=workers,
+                cache=load_cache_rci(),
+                gp_policy=gp_policy,
+                ask_gp_all_callback=self.view.ask_gp_all_callback,
+            )
+        )
 
     def handle_reset(self):
         self.files = []
         self.view.reset()
 
     def handle_resave(self):
-        logs = rci_utils.resave_files(self.files)
-        self.view.append_text(logs)
+        self._start_worker(CalculatorWorker(self.files, calculate=False, resave=True))
+
+    def shutdown(self):
+        """
+        Останавливает фоновый расчет при закрытии окна.
+        Пока поток завершается, события GUI-потока обрабатываются: вопрос о госпошлине,
+        отправленный до запроса отмены, ждёт ответа от GUI-потока (ответ — не учитывать, без диалога).
+        """
+        worker = self.worker  # _on_worker_finished может обнулить self.worker во время processEvents
+        if worker is not None and worker.isRunning():
+            worker.requestInterruption()
+            while not worker.wait(SHUTDOWN_POLL_MS):
+                QCoreApplication.processEvents()
+
+    def _start_worker(self, worker: CalculatorWorker):
+        """Запускает расчет в фоновом потоке; кнопки заблокированы до его завершения"""
+        if self.worker is not None and self.worker.isRunning():
+            return
+
+        worker.output.connect(self.view.append_text)
+        worker.file_done.connect(self._on_file_done)
+        worker.succeeded.connect(self.view.update_totals)  # <-- отдаём результат во view
+        worker.failed.connect(
+            lambda error, details: self.view.append_text(f'<b>Ошибка расчета: {error}</b>\n{details}')
+        )
+        worker.finished.connect(self._on_worker_finished)
+
+        self.worker = worker
+        self.view.set_busy(True)
+        worker.start()
+
+    def _on_file_done(self, done: int, total: int, running_total: dict):
+        self.view.set_progress(done, total)
+        self.view.update_totals(running_total)
+
+    def _on_worker_finished(self):
+        self.view.set_busy(False)
+        self.worker.deleteLater()
+        self.worker = None
 
     def show_btn_resave(self):
         value = load_show_btn_resave()
@@ -1,6 +1,6 @@
-import traceback
 from pathlib import Path
 
+from src.controllers.workers import WorkflowWorker
 from src.core import docx_tools
 from src.core.workflow import (
     insert_statement,
@@ -10,7 +10,10 @@ from src.core.workflow import (
 from src.utils.settings_utils import (
     load_all_in_arbitter,
     load_arbitter_name,
+    load_checkpoint,
     load_format_header,
+    load_materialize_mode,
+    load_trace,
     load_work_directory,
     save_all_in_arbitter,
 )
@@ -27,6 +30,9 @@ class PackageController:
         self.view.insert_clicked.connect(self.handle_insert_clicked)
         self.view.reset_clicked.connect(self.handle_reset_clicked)
         self.view.checkbox_all_in_arbitter.stateChanged.connect(self.handle_all_in_arbitter_clicked)
+        self.view.cancel_clicked.connect(self.handle_cancel_clicked)
+
+        self.worker = None  # Текущая фоновая обработка
 
         # Инициализация необходимых параметров
         self.have_bank_requisites = False  # Флаг наличия реквизитов банков
@@ -35,6 +41,9 @@ class PackageController:
         self.arbitter_name = self._load_arbitter_name()
         self._load_setting_all_in_arbitter()
         self.format_header = self._load_format_header()
+        self.checkpoint = load_checkpoint()
+        self.materialize_mode = load_materialize_mode()
+        self.trace = load_trace()
 
     def handle_checkbox_no_statement(self, state):
         enabled = state == 0  # 0 = unchecked, 2 = checked
@@ -69,23 +78,21 @@ class PackageController:
         have_signa = self.view.radio_yes.isChecked()  # Вставить подпись или нет
         all_in_arb = self.view.checkbox_all_in_arbitter.isChecked()  # Объединить все обязательства в одну папку
 
-        try:  # Формируем пакет
-            fio_debtor, case_number = procces_package(
-                folder_path=folder,
-                signa=have_signa,
-                bank=selected_bank,
-                save_orig=save_orig,
-                all_in_arb=all_in_arb,
-                arb_name=self.arbitter_name,
-                format_header=self.format_header,
-            )
-            self.view.set_current_case(f'{case_number} {fio_debtor}')
-            self.view.append_log('Пакет документов сформирован.')
-        except Exception as e:
-            self.view.append_log(f'Ошибка формирования пакета: {e}\n{traceback.format_exc()}')
-            return
-
-        self.view.reset_bank()
+        self._start_worker(  # Формируем пакет в фоне
+            procces_package,
+            self._on_package_done,
+            'Ошибка формирования пакета',
+            folder_path=folder,
+            signa=have_signa,
+            bank=selected_bank,
+            save_orig=save_orig,
+            all_in_arb=all_in_arb,
+            arb_name=self.arbitter_name,
+            format_header=self.format_header,
+            checkpoint=self.checkpoint,
+            materialize_mode=self.materialize_mode,
+            trace=self.trace,
+        )
 
     def handle_unpack_clicked(self):
         """Распаковка архива пакета документов без заявления"""
@@ -95,13 +102,9 @@ class PackageController:
         if not folder:  # Проверяем выбрана ли рабочая директория
             return
 
-        try:  # Распаковка архива
-            case_number = unpack_package(folder)
-            self.view.set_current_case(f'{case_number} без заявления')
-            self.view.append_log('Архив документов распакован')
-        except Exception as e:
-            self.view.append_log(f'Ошибка распаковки архива: {e}\n{traceback.format_exc()}')
-            return
+        self._start_worker(
+            unpack_package, self._on_unpack_done, 'Ошибка распаковки архива', folder_path=folder, trace=self.trace
+        )
 
     def handle_insert_clicked(self):
         """Перемещение заявления в разархивированный пакет документов"""
@@ -125,24 +128,68 @@ class PackageController:
         all_in_arb = self.view.checkbox_all_in_arbitter.isChecked()  # Объединить все обязательства в одну папку
 
         self.view.reset()
-        try:  # Формируем пакет
-            fio_debtor, case_number = insert_statement(
-                folder_path=folder,
-                signa=have_signa,
-                bank=selected_bank,
-                save_orig=save_orig,
-                all_in_arb=all_in_arb,
-                arb_name=self.arbitter_name,
-                format_header=self.format_header,
-            )
-            self.view.set_current_case(f'{case_number} {fio_debtor}')
-            self.view.append_log('Пакет документов сформирован.')
-        except Exception as e:
-            self.view.append_log(f'Ошибка формирования пакета: {e}\n{traceback.format_exc()}')
+        self._start_worker(  # Формируем пакет в фоне
+            insert_statement,
+            self._on_package_done,
+            'Ошибка формирования пакета',
+            folder_path=folder,
+            signa=have_signa,
+            bank=selected_bank,
+            save_orig=save_orig,
+            all_in_arb=all_in_arb,
+            arb_name=self.arbitter_name,
+            format_header=self.format_header,
+            checkpoint=self.checkpoint,
+            materialize_mode=self.materialize_mode,
+            trace=self.trace,
+        )
+
+    def handle_cancel_clicked(self):
+        """Остановить обработку перед следующим этапом"""
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.requestInterruption()
+            self.view.btn_cancel.setEnabled(False)
+            self.view.append_log('Остановка после завершения текущего этапа...')
+
+    def shutdown(self):
+        """Останавливает фоновую обработку при закрытии окна"""
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.requestInterruption()
+            self.worker.wait()
+
+    def _start_worker(self, func, on_success, error_prefix: str, **kwargs):
+        """Запускает функцию workflow в фоновом потоке; кнопки запуска заблокированы до её завершения"""
+        if self.worker is not None and self.worker.isRunning():
+            self.view.append_log('Дождитесь завершения текущей обработки.')
             return
 
+        worker = WorkflowWorker(func, **kwargs)
+        worker.log.connect(self.view.append_log)
+        worker.progress.connect(self.view.set_progress)
+        worker.succeeded.connect(on_success)
+        worker.failed.connect(lambda error, details: self.view.append_log(f'{error_prefix}: {error}\n{details}'))
+        worker.cancelled.connect(self.view.append_log)
+        worker.finished.connect(self._on_worker_finished)
+
+        self.worker = worker
+        self.view.set_busy(True)
+        worker.start()
+
+    def _on_worker_finished(self):
+        self.view.set_busy(False)
+        self.worker.deleteLater()
+        self.worker = None
+
+    def _on_package_done(self, result):
+        fio_debtor, case_number = result
+        self.view.set_current_case(f'{case_number} {fio_debtor}')
+        self.view.append_log('Пакет документов сформирован.')
         self.view.reset_bank()
 
+    def _on_unpack_done(self, case_number):
+        self.view.set_current_case(f'{case_number} без заявления')
+        self.view.append_log('Архив документов распакован')
+
     def handle_all_in_arbitter_clicked(self):
         """Объединить содержимое папок всех обязательств в одну папку"""
         value = self.view.checkbox_all_in_arbitter.isChecked()
@@ -6,14 +6,30 @@ from PyQt6.QtWidgets import QFileDialog, QMessageBox
 
 from src.utils.settings_utils import (
     load_arbitter_name,
+    load_cache_rci,
+    load_checkpoint,
     load_format_header,
+    load_gp_mode,
+    load_gp_rules_file,
+    load_gp_threshold,
+    load_materialize_mode,
+    load_parallel_rci,
     load_resave_rci,
     load_show_btn_resave,
+    load_trace,
     load_work_directory,
     save_arbitter_name,
+    save_cache_rci,
+    save_checkpoint,
     save_format_header,
+    save_gp_mode,
+    save_gp_rules_file,
+    save_gp_threshold,
+    save_materialize_mode,
+    save_parallel_rci,
     save_resave_rci,
     save_show_btn_resave,
+    save_trace,
     save_work_directory,
 )
 
@@ -29,9 +45,18 @@ class SettingsController:
         self.view.browse_clicked.connect(self.handle_browse_work_dir_clicked)
         self.view.save_clicked.connect(self.handle_save_work_dir_clicked)
         self.view.arbitter_selector.currentTextChanged.connect(self.handle_arbitter_changed)
+        self.view.materialize_selector.currentIndexChanged.connect(self.handle_materialize_mode_changed)
         self.view.checkbox_format_header.stateChanged.connect(self.handle_format_header_clicked)
+        self.view.checkbox_checkpoint.stateChanged.connect(self.handle_checkpoint_clicked)
+        self.view.checkbox_trace.stateChanged.connect(self.handle_trace_clicked)
         self.view.checkbox_resave_rci.stateChanged.connect(self.handle_resave_rci_clicked)
         self.view.checkbox_show_btn_resave.stateChanged.connect(self.handle_show_btn_resave_clicked)
+        self.view.checkbox_parallel_rci.stateChanged.connect(self.handle_parallel_rci_clicked)
+        self.view.checkbox_cache_rci.stateChanged.connect(self.handle_cache_rci_clicked)
+        self.view.gp_mode_selector.currentIndexChanged.connect(self.handle_gp_mode_changed)
+        self.view.gp_threshold.editingFinished.connect(self.handle_gp_threshold_changed)
+        self.view.gp_rules_path.editingFinished.connect(self.handle_gp_rules_path_changed)
+        self.view.gp_rules_browse_clicked.connect(self.handle_gp_rules_browse_clicked)
         self.view.aplly_settings_clicked.connect(self.handle_apply_settings_clicked)
 
         self._load_settings()  # Инициализация рабочего пути
@@ -66,6 +91,13 @@ class SettingsController:
             self.view, 'Настройки сохранены', 'Чтобы настройка применилась необходимо перезапустить программу'
         )
 
+    def handle_materialize_mode_changed(self, index: int):
+        """Способ формирования файлов в папке арбитр"""
+        save_materialize_mode(self.view.materialize_selector.itemData(index))
+        QMessageBox.information(
+            self.view, 'Настройки сохранены', 'Чтобы настройка применилась необходимо перезапустить программу'
+        )
+
     def handle_format_header_clicked(self):
         """Форматировать шапку документа"""
         value = self.view.checkbox_format_header.isChecked()
@@ -74,12 +106,57 @@ class SettingsController:
             self.view, 'Настройки сохранены', 'Чтобы настройка применилась необходимо перезапустить программу'
         )
 
+    def handle_checkpoint_clicked(self):
+        """Сохранять заявление с успешными шагами при ошибке шага"""
+        value = self.view.checkbox_checkpoint.isChecked()
+        save_checkpoint(value)
+        QMessageBox.information(
+            self.view, 'Настройки сохранены', 'Чтобы настройка применилась необходимо перезапустить программу'
+        )
+
+    def handle_trace_clicked(self):
+        """Сохранять трассировку времени обработки"""
+        value = self.view.checkbox_trace.isChecked()
+        save_trace(value)
+        QMessageBox.information(
+            self.view, 'Настройки сохранены', 'Чтобы настройка применилась необходимо перезапустить программу'
+        )
 
     def handle_resave_rci_clicked(self):
         """Пересохранять файлы РЦИ"""
         value = self.view.checkbox_resave_rci.isChecked()
         save_resave_rci(value)
 
+    def handle_parallel_rci_clicked(self):
+        """Разбирать файлы РЦИ в нескольких процессах"""
+        value = self.view.checkbox_parallel_rci.isChecked()
+        save_parallel_rci(value)
+
+    def handle_cache_rci_clicked(self):
+        """Запоминать разобранные файлы РЦИ"""
+        value = self.view.checkbox_cache_rci.isChecked()
+        save_cache_rci(value)
+
+    def handle_gp_mode_changed(self, index: int):
+        """Способ учета госпошлины"""
+        save_gp_mode(self.view.gp_mode_selector.itemData(index))
+        self._update_gp_widgets()
+
+    def handle_gp_threshold_changed(self):
+        """Порог госпошлины - сохраняется по окончании ввода (Enter или уход фокуса), а не на каждое изменение"""
+        save_gp_threshold(self.view.gp_threshold.value())
+
+    def handle_gp_rules_path_changed(self):
+        """Файл правил госпошлины - введен вручную"""
+        save_gp_rules_file(self.view.gp_rules_path.text().strip())
+
+    def handle_gp_rules_browse_clicked(self):
+        """Файл правил госпошлины - Обзор"""
+        path, _ = QFileDialog.getOpenFileName(self.view, 'Выберите файл правил госпошлины', '', 'JSON (*.json)')
+        if path:
+            self.view.gp_rules_path.setText(path)
+            save_gp_rules_file(path)
+
     def handle_show_btn_resave_clicked(self):
         """Показать кнопку Пересохранять файлы"""
         value = self.view.checkbox_show_btn_resave.isChecked()
@@ -98,8 +175,14 @@ class SettingsController:
         self._load_work_directory()
         self._load_resave_rci()
         self._load_show_btn_resave()
+        self._load_parallel_rci()
+        self._load_cache_rci()
+        self._load_gp_policy()
         self._load_arbitter_name()
+        self._load_materialize_mode()
+        self._load_trace()
         self._load_format_header()
+        self._load_checkpoint()
 
     def _load_work_directory(self) -> str | None:
         folder_path = load_work_directory()
@@ -122,6 +205,32 @@ class SettingsController:
 
         self.view.arbitter_selector.blockSignals(False)
 
+    def _load_gp_policy(self):
+        index = self.view.gp_mode_selector.findData(load_gp_mode())
+        for widget in (self.view.gp_mode_selector, self.view.gp_threshold, self.view.gp_rules_path):
+            widget.blockSignals(True)
+        if index >= 0:
+            self.view.gp_mode_selector.setCurrentIndex(index)
+        self.view.gp_threshold.setValue(load_gp_threshold())
+        self.view.gp_rules_path.setText(load_gp_rules_file() or '')
+        for widget in (self.view.gp_mode_selector, self.view.gp_threshold, self.view.gp_rules_path):
+            widget.blockSignals(False)
+        self._update_gp_widgets()
+
+    def _update_gp_widgets(self):
+        """Порог и файл правил доступны только для своих способов учета"""
+        mode = self.view.gp_mode_selector.currentData()
+        self.view.gp_threshold.setEnabled(mode == 'threshold')
+        self.view.gp_rules_path.setEnabled(mode == 'rules')
+        self.view.btn_gp_rules_browse.setEnabled(mode == 'rules')
+
+    def _load_materialize_mode(self):
+        index = self.view.materialize_selector.findData(load_materialize_mode())
+        if index >= 0:
+            self.view.materialize_selector.blockSignals(True)
+            self.view.materialize_selector.setCurrentIndex(index)
+            self.view.materialize_selector.blockSignals(False)
+
     def _load_format_header(self):
         value = load_format_header()
         if value:
@@ -129,6 +238,19 @@ class SettingsController:
             self.view.checkbox_format_header.setChecked(value)
             self.view.checkbox_format_header.blockSignals(False)
 
+    def _load_checkpoint(self):
+        value = load_checkpoint()
+        if value:
+            self.view.checkbox_checkpoint.blockSignals(True)
+            self.view.checkbox_checkpoint.setChecked(value)
+            self.view.checkbox_checkpoint.blockSignals(False)
+
+    def _load_trace(self):
+        value = load_trace()
+        if value:
+            self.view.checkbox_trace.blockSignals(True)
+            self.view.checkbox_trace.setChecked(value)
+            self.view.checkbox_trace.blockSignals(False)
 
     def _load_resave_rci(self):
         value = load_resave_rci()
@@ -137,6 +259,19 @@ class SettingsController:
             self.view.checkbox_resave_rci.setChecked(value)
             self.view.checkbox_resave_rci.blockSignals(False)
 
+    def _load_parallel_rci(self):
+        value = load_parallel_rci()
+        if value:
+            self.view.checkbox_parallel_rci.blockSignals(True)
+            self.view.checkbox_parallel_rci.setChecked(value)
+            self.view.checkbox_parallel_rci.blockSignals(False)
+
+    def _load_cache_rci(self):
+        value = load_cache_rci()
+        self.view.checkbox_cache_rci.blockSignals(True)
+        self.view.checkbox_cache_rci.setChecked(value)
+        self.view.checkbox_cache_rci.blockSignals(False)
+
     def _load_show_btn_resave(self):
         value = load_show_btn_resave()
         if value:
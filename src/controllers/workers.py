@@ -0,0 +1,145 @@
+import traceback
+from contextlib import nullcontext
+
+from PyQt6.QtCore import Qt, QThread, pyqtSignal, pyqtSlot
+
+import src.core.calculator.utils as rci_utils
+from src.core.calculator.cache import ParseCache
+from src.core.calculator.engine import CalculationCancelled
+from src.core.calculator.logic import Logic
+from src.core.workflow import WorkflowCancelled
+
+
+class WorkflowWorker(QThread):
+    """
+    Выполняет функцию workflow (procces_package, insert_statement, unpack_package) в отдельном потоке.
+    Функции передаются log, progress и cancel; всё, что они сообщают, приходит в GUI-поток сигналами.
+    Отмена — requestInterruption(): функция остановится перед следующим этапом.
+    """
+
+    progress = pyqtSignal(str, int, int)  # этап, завершено этапов, всего этапов
+    log = pyqtSignal(str)
+    succeeded = pyqtSignal(object)  # результат функции
+    failed = pyqtSignal(str, str)  # сообщение, traceback
+    cancelled = pyqtSignal(str)
+
+    def __init__(self, func, parent=None, **kwargs):
+        super().__init__(parent)
+        self.func = func
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            result = self.func(
+                **self.kwargs,
+                log=self.log.emit,
+                progress=self.progress.emit,
+                cancel=self.isInterruptionRequested,
+            )
+        except WorkflowCancelled as e:
+            self.cancelled.emit(str(e))
+        except Exception as e:
+            self.failed.emit(str(e), traceback.format_exc())
+        else:
+            self.succeeded.emit(result)
+
+
+class CalculatorWorker(QThread):
+    """
+    Расчет РЦИ (и пересохранение файлов) в отдельном потоке.
+    Текст по каждому обязательству и промежуточные итоги приходят сигналами по мере разбора файлов.
+    Вопрос о госпошлине задаётся в GUI-потоке: поток расчета ждёт ответа (BlockingQueuedConnection).
+    С workers > 1 файлы разбираются на пуле процессов, текст и вопросы приходят после разбора всех файлов.
+    Отмена — requestInterruption(): расчет остановится после текущего файла, вопросы о госпошлине
+    больше не задаются (ответ — не учитывать), поэтому GUI-поток может ждать завершения потока.
+
+    :param ask_gp_callback: Диалог в GUI-потоке, возвращает True, если госпошлину нужно учесть
+    :param ask_gp_all_callback: Диалог в GUI-потоке со всей госпошлиной: список GpCandidate -> {GpCandidate: учитывать}
+    :param gp_policy: Правило учета госпошлины (gp_policy.GpPolicy)
+    :param calculate: Выполнить расчет
+    :param resave: Пересохранить файлы после расчета
+    :param workers: Процессов для разбора файлов (1 — без пула, None — по числу ядер)
+    :param cache: Брать разобранные файлы из кэша (cache.ParseCache) и сохранять туда новые
+    """
+
+    output = pyqtSignal(str)
+    file_done = pyqtSignal(int, int, object)  # номер файла, всего файлов, промежуточные итоги
+    succeeded = pyqtSignal(object)  # итоги расчета
+    failed = pyqtSignal(str, str)  # сообщение, traceback
+    gp_requested = pyqtSignal(str)
+    gp_all_requested = pyqtSignal(object)  # список GpCandidate
+
+    def __init__(
+        self,
+        files: list[str],
+        ask_gp_callback=None,
+        calculate=True,
+        resave=False,
+        workers=1,
+        cache=False,
+        gp_policy=None,
+        ask_gp_all_callback=None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.files = list(files)
+        self.ask_gp_callback = ask_gp_callback
+        self.ask_gp_all_callback = ask_gp_all_callback
+        self.gp_policy = gp_policy
+        self.calculate = calculate
+        self.resave = resave
+        self.workers = workers
+        self.cache = cache
+        self._gp_answer = False
+        self._gp_all_answer = {}
+        # Объект QThread живёт в GUI-потоке, поэтому слот выполняется там, а emit ждёт его завершения
+        self.gp_requested.connect(self._answer_gp, Qt.ConnectionType.BlockingQueuedConnection)
+        self.gp_all_requested.connect(self._answer_gp_all, Qt.ConnectionType.BlockingQueuedConnection)
+
+    def run(self):
+        try:
+            if self.calculate:
+                # Соединение с базой кэша открывается в потоке расчета
+                with ParseCache() if self.cache else nullcontext() as cache:
+                    logic = Logic(
+                        output_func=self.output.emit,
+                        ask_gp_callback=self._ask_gp,
+                        workers=self.workers,
+                        cache=cache,
+                        gp_policy=self.gp_policy,
+                        ask_gp_all_callback=self._ask_gp_all if self.ask_gp_all_callback else None,
+                    )
+                    total = logic.run(
+                        files=self.files, on_file=self.file_done.emit, cancel=self.isInterruptionRequested
+                    )
+                self.succeeded.emit(total)
+            if self.resave:
+                self.output.emit(rci_utils.resave_files(self.files))
+        except CalculationCancelled as e:
+            self.output.emit(str(e))
+        except Exception as e:
+            self.failed.emit(str(e), traceback.format_exc())
+
+    def _ask_gp(self, msg: str) -> bool:
+        """Вызывается в потоке расчета"""
+        if self.ask_gp_callback is None or self.isInterruptionRequested():
+            return False
+        self.gp_requested.emit(msg)
+        return self._gp_answer
+
+    @pyqtSlot(str)
+    def _answer_gp(self, msg: str):
+        """Выполняется в GUI-потоке; после запроса отмены диалог не открывается"""
+        self._gp_answer = not self.isInterruptionRequested() and bool(self.ask_gp_callback(msg))
+
+    def _ask_gp_all(self, candidates: list) -> dict:
+        """Вызывается в потоке расчета"""
+        if self.isInterruptionRequested():
+            return {}
+        self.gp_all_requested.emit(candidates)
+        return self._gp_all_answer
+
+    @pyqtSlot(object)
+    def _answer_gp_all(self, candidates: list):
+        """Выполняется в GUI-потоке; после запроса отмены диалог не открывается"""
+        self._gp_all_answer = {} if self.isInterruptionRequested() else self.ask_gp_all_callback(candidates) or {}
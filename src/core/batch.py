@@ -0,0 +1,148 @@
+import fnmatch
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from src.core import file_tools
+from src.core.workflow import procces_package
+
+
+@dataclass
+class CaseResult:
+    """Результат обработки одной папки дела"""
+
+    folder: str
+    ok: bool
+    fio_debtor: Optional[str] = None
+    case_number: Optional[str] = None
+    error: Optional[str] = None
+    details: Optional[str] = None
+    elapsed: float = 0.0
+
+
+def _is_case_folder(filenames: list[str]) -> bool:
+    """Есть ли в папке заявление и архив досье"""
+    has_doc = any(fnmatch.fnmatch(name, file_tools.RTK_DOC_PATTERN) for name in filenames)
+    has_archive = any(fnmatch.fnmatch(name, file_tools.DOSSIER_ARCHIVE_PATTERN) for name in filenames)
+    return has_doc and has_archive
+
+
+def find_case_folders(root: str | Path) -> list[Path]:
+    """
+    Ищет папки дел (заявление + архив 'Досье по банкротству*.zip') в root и во вложенных папках.
+    В найденную папку дела не спускается.
+
+    :param root: Корневая папка
+    :return: Отсортированный список папок дел
+    """
+    root = Path(root)
+    if not root.exists() or not root.is_dir():
+        raise NotADirectoryError(f'Папка {root} не существует')
+
+    folders = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        if _is_case_folder(filenames):
+            folders.append(Path(dirpath))
+            dirnames.clear()  # содержимое дела не сканируем
+    return sorted(folders)
+
+
+def _run_case(folder: str, options: dict) -> CaseResult:
+    """Обработка одного дела. Выполняется в дочернем процессе, исключения не пробрасывает"""
+    started = time.perf_counter()
+    try:
+        fio_debtor, case_number = procces_package(folder_path=folder, **options)
+        return CaseResult(
+            folder=folder,
+            ok=True,
+            fio_debtor=fio_debtor,
+            case_number=case_number,
+            elapsed=time.perf_counter() - started,
+        )
+    except Exception as e:
+        return CaseResult(
+            folder=folder,
+            ok=False,
+            error=str(e),
+            details=traceback.format_exc(),
+            elapsed=time.perf_counter() - started,
+        )
+
+
+def run_batch(
+    root: str | Path,
+    workers: Optional[int] = None,
+    signa=False,
+    bank=None,
+    save_orig=False,
+    all_in_arb=False,
+    arb_name=None,
+    format_header=None,
+    checkpoint=False,
+    materialize_mode='copy',
+    trace=False,
+    on_result: Optional[Callable[[CaseResult], None]] = None,
+) -> list[CaseResult]:
+    """
+    Формирует пакеты документов для всех папок дел в root на пуле процессов.
+    Ошибка в одном деле не останавливает обработку остальных.
+
+    :param root: Корневая папка с папками дел
+    :param workers: Количество процессов (по умолчанию — число ядер)
+    :param checkpoint: При ошибке шага сохранить заявление с успешными шагами (см. workflow.proccess_statement)
+    :param materialize_mode: Способ формирования файлов в папке арбитр (см. file_tools.Materializer)
+    :param trace: Сохранять трассировку времени обработки в папку каждого дела
+    :param on_result: Вызывается в основном процессе по мере завершения каждого дела
+    :return: Результаты в порядке папок дел
+    """
+    folders = find_case_folders(root)
+    options = {
+        'signa': signa,
+        'bank': bank,
+        'save_orig': save_orig,
+        'all_in_arb': all_in_arb,
+        'arb_name': arb_name,
+        'format_header': format_header,
+        'checkpoint': checkpoint,
+        'materialize_mode': materialize_mode,
+        'trace': trace,
+    }
+
+    results: dict[str, CaseResult] = {}
+    if not folders:
+        return []
+
+    max_workers = min(workers or os.cpu_count() or 1, len(folders))
+    # spawn, как в calculator.engine.parse_files: без fork многопоточного процесса на всех ОС
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {executor.submit(_run_case, str(folder), options): str(folder) for folder in folders}
+        for future in as_completed(futures):
+            folder = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:  # падение самого процесса (BrokenProcessPool и т.п.)
+                result = CaseResult(folder=folder, ok=False, error=str(e), details=traceback.format_exc())
+            results[folder] = result
+            if on_result:
+                on_result(result)
+
+    return [results[str(folder)] for folder in folders]
+
+
+def write_summary(results: list[CaseResult], path: str | Path) -> Path:
+    """Сохраняет итоги пакетной обработки в JSON"""
+    path = Path(path)
+    summary = {
+        'total': len(results),
+        'ok': sum(1 for r in results if r.ok),
+        'failed': sum(1 for r in results if not r.ok),
+        'cases': [asdict(r) for r in results],
+    }
+    path.write_text(json.dumps(summary, indent=4, ensure_ascii=False), encoding='utf-8')
+    return path
@@ -0,0 +1,175 @@
+"""
+Кэш разбора файлов РЦИ на диске — SQLite в профиле пользователя.
+
+Ключ — хэш содержимого файла, версия разбора и способ загрузки книги; значение — engine.ParsedFile.
+Повторный расчет тех же файлов не открывает книги заново: после добавления одного файла разбирается только он.
+В версию разбора входит отпечаток таблиц layouts, поэтому новое название строки в макете не даст устаревших сумм.
+Размер кэша ограничен: при превышении удаляются давно не использованные записи (LRU).
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.core.calculator import engine, layouts
+
+CACHE_FILE_NAME = 'rci_cache.sqlite3'
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    """Папка кэша в профиле пользователя: %LOCALAPPDATA%\\DocPrep или ~/.cache/docprep"""
+    if sys.platform == 'win32':
+        return Path(os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local') / 'DocPrep'
+    return Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'docprep'
+
+
+def parser_version() -> str:
+    """Версия разбора: engine.PARSER_VERSION и отпечаток таблиц макетов"""
+    fingerprint = hashlib.sha1(repr(layouts.LAYOUTS).encode('utf-8')).hexdigest()[:12]
+    return f'{engine.PARSER_VERSION}-{fingerprint}'
+
+
+def file_digest(path: str | Path, chunk_size: int = 1024 * 1024) -> str:
+    """Хэш содержимого файла"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    Кэш engine.ParsedFile по содержимому файла.
+    Ошибки базы не прерывают расчет: кэш отключается до конца работы объекта, файлы разбираются как обычно.
+    Соединение открывается при первом обращении — в том потоке, где идет расчет.
+
+    :param path: Файл базы (по умолчанию default_cache_dir() / CACHE_FILE_NAME)
+    :param max_bytes: Наибольший размер записей, байт
+    """
+
+    def __init__(self, path: Optional[str | Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path) if path else default_cache_dir() / CACHE_FILE_NAME
+        self.max_bytes = max_bytes
+        self.version = parser_version()
+        self.hits = self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = False
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None and not self._disabled:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.path, timeout=5)
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS parsed ('
+                    'key TEXT PRIMARY KEY, version TEXT NOT NULL, data BLOB NOT NULL, '
+                    'size INTEGER NOT NULL, used REAL NOT NULL)'
+                )
+                conn.execute('CREATE INDEX IF NOT EXISTS parsed_used ON parsed (used)')
+                with conn:
+                    conn.execute('DELETE FROM parsed WHERE version != ?', (self.version,))  # разбор прежних версий
+                self._conn = conn
+            except (OSError, sqlite3.Error):
+                self._disabled = True
+        return self._conn
+
+    def _fail(self) -> None:
+        """Ошибка базы: дальше работаем без кэша"""
+        self._disabled = True
+        self.close()
+
+    def key(self, file: str | Path, load_mode: str) -> Optional[str]:
+        """Ключ файла; None, если файл не прочитать"""
+        try:
+            return f'{file_digest(file)}:{load_mode}'
+        except OSError:
+            return None
+
+    def get(self, key: Optional[str]) -> Optional[engine.ParsedFile]:
+        """Разобранный файл из кэша; поле file — от файла, который разбирался при сохранении"""
+        conn = self._connect() if key else None
+        if conn is None:
+            return None
+        try:
+            row = conn.execute('SELECT data FROM parsed WHERE key = ? AND version = ?', (key, self.version)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with conn:
+                conn.execute('UPDATE parsed SET used = ? WHERE key = ?', (time.time(), key))
+            parsed = pickle.loads(row[0])
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError, AttributeError, TypeError):
+            self._fail()
+            return None
+        self.hits += 1
+        return parsed
+
+    def put(self, key: Optional[str], parsed: engine.ParsedFile) -> None:
+        """
+        Сохраняет разобранный файл. Файлы, которые не удалось открыть (шаг Failure),
+        не сохраняются — причина может быть временной (файл занят, недоступен).
+        """
+        if any(isinstance(step, engine.Failure) for step in parsed.steps):
+            return
+        conn = self._connect() if key else None
+        if conn is None:
+            return
+        try:
+            data = pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL)
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO parsed (key, version, data, size, used) VALUES (?, ?, ?, ?, ?)',
+                    (key, self.version, data, len(data), time.time()),
+                )
+                self._evict(conn)
+        except (sqlite3.Error, pickle.PicklingError, TypeError):
+            self._fail()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Удаляет давно не использованные записи, пока размер больше max_bytes"""
+        (total,) = conn.execute('SELECT COALESCE(SUM(size), 0) FROM parsed').fetchone()
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute('SELECT key, size FROM parsed ORDER BY used').fetchall():
+            conn.execute('DELETE FROM parsed WHERE key = ?', (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> dict:
+        """Записей и байт в кэше, попаданий и промахов этого объекта"""
+        conn = self._connect()
+        entries = size = 0
+        if conn is not None:
+            try:
+                entries, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parsed').fetchone()
+            except sqlite3.Error:
+                pass
+        return {'entries': entries, 'bytes': size, 'hits': self.hits, 'misses': self.misses}
+
+    def clear(self) -> None:
+        conn = self._connect()
+        if conn is not None:
+            try:
+                with conn:
+                    conn.execute('DELETE FROM parsed')
+            except sqlite3.Error:
+                self._fail()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> 'ParseCache':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
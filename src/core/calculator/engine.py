@@ -0,0 +1,723 @@
+"""
+Расчет РЦИ без общего состояния.
+
+Расчет идет в два шага:
+- parse_file(file) читает один файл и возвращает ParsedFile: суммы строк и сообщения в порядке чтения.
+  Результат зависит только от содержимого файла — его можно получать в другом потоке или процессе.
+- resolve(...) учитывает разобранные файлы по порядку: повторяющиеся суммы, ответы о госпошлине, итоги.
+  Состояние расчета живёт только внутри вызова; результат — неизменяемые ObligationResult и CalculationResult.
+
+calculate(files) выполняет оба шага файл за файлом, как раньше Logic.run,
+а с workers > 1 — сначала разбирает все файлы на пуле процессов (parse_files), затем учитывает их по порядку.
+"""
+
+import multiprocessing
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+from src.core.calculator import layouts, loader
+
+PRSUD = 'prsud'  # прочие судебные расходы — в РЦИ не встречаются, но есть в итогах
+SU = 'su'  # все учтенные суммы
+TEMP = 'temp'  # суммы текущего обязательства
+TARGETS = (
+    layouts.OD,
+    layouts.PRC,
+    layouts.GP,
+    layouts.KM,
+    layouts.PP,
+    layouts.PENOD,
+    layouts.PENPRC,
+    layouts.NEUS,
+    PRSUD,
+)
+
+PARALLEL_MIN_FILES = 4  # Меньше файлов быстрее разобрать в одном процессе, чем запускать пул
+PARSER_VERSION = 4  # Увеличить при изменении разбора или ParsedFile: записи кэша прежней версии удаляются
+
+HEADER_CSKO = 'Управление администрирования кредитов ЦСКО'
+HEADERS_MSC = ('Управление администрирования кредитов ПЦП МСЦ', 'Управление администрирования кредитов МСЦ')
+HEADER_PROBLEM = 'Подразделение по работе с проблемной задолженностью физических лиц'
+
+
+# --- Шаги разбора файла ---
+@dataclass(frozen=True, slots=True)
+class Message:
+    """Сообщение для вывода (например, о начислениях в листах госпошлины)"""
+
+    text: str
+
+
+@dataclass(frozen=True, slots=True)
+class Amount:
+    """
+    Сумма строки РЦИ до учета.
+
+    :param target: Вид задолженности (layouts.OD, layouts.PRC, ...)
+    :param value: Сумма как в файле (или после перевода строки в число)
+    :param unique: Пропустить, если такая сумма уже учтена (layouts.UNIQUE_FILE, layouts.UNIQUE_TARGET)
+    :param question: Для госпошлины — название обязательства для вопроса об учете
+    """
+
+    target: str
+    value: Any
+    unique: Optional[str] = None
+    question: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class Failure:
+    """Ошибка разбора файла: текст исключения и traceback"""
+
+    error: str
+    details: str
+
+
+@dataclass(frozen=True, slots=True)
+class Summary:
+    """
+    Итог обязательства — последний шаг разбора.
+
+    :param layout: Название макета (layouts.Layout.name)
+    :param title: Краткое название обязательства
+    :param heading: Заголовок для вывода; None — не выводится
+    :param failure: Ошибка при чтении названия: суммы учтены, итог не выводится
+    """
+
+    layout: str
+    title: Any = None
+    heading: Optional[str] = None
+    failure: Optional[Failure] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedFile:
+    """
+    Всё, что прочитано из одного файла РЦИ.
+
+    :param name: Название долга из заголовка РЦИ
+    :param steps: Message, Amount, Failure и Summary в порядке чтения
+    """
+
+    file: str
+    name: Any = None
+    steps: tuple = ()
+
+
+@dataclass(frozen=True, slots=True)
+class GpCandidate:
+    """
+    Госпошлина, об учете которой нужно решить (см. gp_policy).
+
+    :param obligation: Номер обязательства в расчете, с 1
+    :param position: Номер шага Amount в ParsedFile.steps
+    :param name: Название долга из заголовка РЦИ
+    :param title: Краткое название обязательства (номер договора) из Summary; None, если его нет
+    """
+
+    obligation: int
+    position: int
+    file: str
+    name: Any
+    title: Any
+    amount: Amount
+
+
+# --- Результаты расчета ---
+@dataclass(frozen=True, slots=True)
+class ObligationResult:
+    """
+    Обязательство (файл РЦИ) после учета.
+
+    :param index: Номер обязательства, с 1
+    :param amounts: Учтенные суммы: (вид задолженности, сумма)
+    :param total: Итоговая задолженность по обязательству; None, если итог не посчитан
+    :param messages: Всё, что выведено по обязательству
+    :param error: Ошибка, если файл не удалось рассчитать
+    """
+
+    index: int
+    file: str
+    name: Any
+    title: Any
+    amounts: tuple[tuple[str, Any], ...]
+    total: Optional[float]
+    messages: tuple[str, ...]
+    error: Optional[Failure] = None
+
+
+@dataclass(frozen=True, slots=True)
+class CalculationResult:
+    """
+    Итоги расчета по всем файлам.
+
+    :param sums: Учтенные суммы по видам задолженности (TARGETS и SU)
+    :param total: Итоги, как у build_total
+    """
+
+    obligations: tuple[ObligationResult, ...]
+    sums: Mapping[str, tuple]
+    total: Mapping[str, Any]
+
+
+# --- Общие функции ---
+def to_float(sums: list) -> None:
+    """Преобразование строковых значений в float; прочерки '–' отбрасываются"""
+    sums[:] = [float(x) for x in sums if str(x).strip() != '–']
+
+
+def format_heading(text: str) -> Optional[str]:
+    """
+    Заголовок РЦИ для вывода в QTextEdit, жирным:
+    - всю фразу 'по состоянию на'
+    - слово после фразы
+    - слово перед открывающей скобкой '('
+    """
+    if not text:
+        return None
+
+    words = text.split()
+    text_parts = []
+
+    i = 0
+    while i < len(words):
+        if (i + 1 < len(words)) and ('(' in words[i + 1]):
+            text_parts.append(f'<b><u>{words[i]}</u></b>')
+            i += 1
+        elif ((i + 3) < len(words)) and (
+            f'{words[i].lower()} {words[i + 1].lower()} {words[i + 2].lower()}' == 'по состоянию на'
+        ):
+            text_parts.append(f'<b><u>{words[i]} {words[i + 1]} {words[i + 2]} {words[i + 3]}</u></b>')
+            i += 3
+            break
+        else:
+            text_parts.append(words[i])
+            i += 1
+
+    return ' '.join(text_parts)
+
+
+def build_total(sums: Mapping[str, list]) -> dict:
+    """Разбивка итогов и оплата госпошлины по учтенным суммам"""
+    rcy = sum(sums[SU])
+    pod = sum(sums[layouts.OD])
+    pprc = sum(sums[layouts.PRC])
+    pgp = sum(sums[layouts.GP])
+    kmp = sum(sums[layouts.KM])
+    ppp = sum(sums[layouts.PP])
+    ppenprc = sum(sums[layouts.PENPRC])
+    ppenod = sum(sums[layouts.PENOD])
+    prsudp = sum(sums[PRSUD])
+    pneus = sum(sums[layouts.NEUS])
+
+    total = {}
+
+    if rcy > 0:
+        total['Общая сумма'] = round(rcy, 2)
+    if pod > 0:
+        total['Просроченный основной долг'] = round(pod, 2)
+    if pprc > 0:
+        total['Просроченные проценты'] = round(pprc, 2)
+    if pneus > 0:
+        total['Неустойки'] = round(pneus, 2)
+    if pgp > 0:
+        total['Госпошлина'] = round(pgp, 2)
+    if ppenod > 0:
+        total['Пени за кредит'] = round(ppenod, 2)
+    if ppenprc > 0:
+        total['Пени за проценты'] = round(ppenprc, 2)
+    if prsudp > 0:
+        total['Прочие судебные расходы'] = round(prsudp, 2)
+    if ppp > 0:
+        total['Просроченная ссудная задолженность'] = round(ppp, 2)
+    if kmp > 0:
+        total['Комиссия'] = round(kmp, 2)
+
+    if rcy < 100000:
+        gosposhlina = 10000 / 2
+        total['ОПЛАТА ГОСПОШЛИНЫ'] = int(round(gosposhlina))
+    elif rcy > 100000 and rcy < 1000000:
+        gosposhlina = ((rcy - 100000) * 0.05 + 10000) / 2
+        total['ОПЛАТА ГОСПОШЛИНЫ'] = int(round(gosposhlina))
+    elif rcy > 1000000 and rcy < 10000000:
+        gosposhlina = ((rcy - 1000000) * 0.03 + 55000) / 2
+        total['ОПЛАТА ГОСПОШЛИНЫ'] = int(round(gosposhlina))
+    elif rcy > 10000000 and rcy < 50000000:
+        gosposhlina = ((rcy - 10000000) * 0.01 + 325000) / 2
+        total['ОПЛАТА ГОСПОШЛИНЫ'] = int(round(gosposhlina))
+    elif rcy > 50000000:
+        gosposhlina = ((rcy - 50000000) * 0.005 + 725000) / 2
+        if gosposhlina > 10000000:
+            gosposhlina = 10000000
+        total['ОПЛАТА ГОСПОШЛИНЫ'] = int(round(gosposhlina))
+
+    return total
+
+
+def _failure(e: Exception) -> Failure:
+    return Failure(str(e), traceback.format_exc())
+
+
+# --- Шаг 1: разбор файла ---
+def _gp_warnings(wb) -> list[str]:
+    """Сообщения о начислениях в листах госпошлины 'Расчет_7', 'Расчёт', 'Приложение 5'"""
+    messages = []
+    checks = (  # лист, ячейка с суммой начислений, ячейка с названием, текст
+        ('Расчет_7', 17, 10, 'a7', '"НАЙДЕНЫ НАЧИСЛЕНИЯ ПО ГОСПОШЛИНЕ! ОТКРОЙТЕ Расчет_7'),
+        ('Расчёт', 6, 9, 'a1', 'НАЙДЕНЫ НАЧИСЛЕНИЯ ПО ГОСПОШЛИНЕ! ОТКРОЙТЕ Расчет'),
+        ('Приложение 5', 11, 5, 'a7', '"НАЙДЕНЫ НАЧИСЛЕНИЯ ПО ГОСПОШЛИНЕ! ОТКРОЙТЕ Расчет_7'),
+    )
+    for title, row, column, name_cell, text in checks:
+        if title not in wb.sheetnames:
+            continue
+        sheet = wb[title]
+        if sheet.max_row <= 17:  # строк с начислениями нет
+            continue
+        sku = sheet.cell(row=row, column=column).value
+        try:
+            if sku > 0:
+                messages.append(f'{sheet[name_cell].value}, {text}')
+        except TypeError:
+            pass
+    return messages
+
+
+class _FileParser:
+    """Разбор одного файла РЦИ; создаётся на каждый файл"""
+
+    def __init__(self, file: str, load_mode: str):
+        self.file = file
+        self.load_mode = load_mode
+        self.name = None
+        self.steps: list = []
+
+    def parse(self) -> ParsedFile:
+        wb = None
+        try:
+            wb = loader.open_workbook(self.file, self.load_mode)  # способ чтения — по формату файла
+            for sheet in wb.sheetnames:
+                layout = layouts.detect_layout(sheet)
+                if layout is layouts.TITUL:
+                    self._titul(wb)
+                elif layout is layouts.DOGOVOR:
+                    self._dogovor(wb)
+                elif layout is layouts.OPERATIONS:
+                    self._operations(wb, sheet)
+                elif isinstance(wb, loader.GridWorkbook):
+                    # Книга прочитана не openpyxl (восстановлена, HTML, xls): без макета не молчим
+                    raise ValueError(f'Лист "{sheet}" не подходит ни к одному макету РЦИ')
+                break
+        except Exception as e:
+            self.steps.append(_failure(e))
+        finally:
+            if wb is not None:
+                wb.close()  # read_only держит файл открытым до закрытия книги
+        return ParsedFile(str(self.file), self.name, tuple(self.steps))
+
+    def _summary(self, layout: layouts.Layout, title_func: Callable) -> None:
+        """Название обязательства читается после сумм; ошибка в нём не отменяет учтенные суммы"""
+        try:
+            title, heading = title_func()
+        except Exception as e:
+            self.steps.append(Summary(layout.name, failure=_failure(e)))
+        else:
+            self.steps.append(Summary(layout.name, title, heading))
+
+    def _titul(self, wb) -> None:
+        try:
+            ws = wb['Титульный лист']
+        except KeyError:
+            ws = wb['Sheet1']
+        if isinstance(ws['a5'].value, str):
+            self.name = ws['a5'].value[20:]
+        else:
+            self.name = ws['a2'].value[20:]
+
+        # Проверка госпошлин
+        self.steps.extend(Message(text) for text in _gp_warnings(wb))
+        self.read_rows(layouts.TITUL, ws)
+
+        def title():
+            if ws['a1'].value == HEADER_CSKO:
+                return ws['a5'].value[65:81], f'{ws["a5"].value}'
+            if ws['a1'].value in HEADERS_MSC:
+                return ws['a5'].value[110:140], f'{ws["a5"].value}'
+            if ws['g1'].value == HEADER_PROBLEM:
+                return ws['a4'].value[110:140], f'{ws["a4"].value}'
+            if ws['a1'].value is not None:
+                return ws['a1'].value[186:217], f'{ws["a1"].value}'
+            return ws['a2'].value[:201], f'{ws["a2"].value}'
+
+        self._summary(layouts.TITUL, title)
+
+    def _dogovor(self, wb) -> None:
+        ws = wb['Задолженность по договору']
+        self.read_rows(layouts.DOGOVOR, ws)
+        self._summary(layouts.DOGOVOR, lambda: (ws['c4'].value, None))
+
+    def _operations(self, wb, sheet: str) -> None:
+        try:
+            ws = wb[sheet]
+            self.name = ws['a1'].value
+        except KeyError:
+            self.steps.append(Message('Ошибка, Неверный РЦИ'))
+            return
+        self.read_rows(layouts.OPERATIONS, ws)
+
+        def title():
+            if ws['a1'].value == HEADER_CSKO:
+                return ws['a5'].value[65:81], ws['a5'].value
+            if ws['a1'].value in HEADERS_MSC:
+                return ws['a5'].value[110:140], ws['a5'].value
+            return ws['a1'].value[186:217], ws['a1'].value
+
+        self._summary(layouts.OPERATIONS, title)
+
+    # --- Разбор строк листа по макету ---
+    def read_rows(self, layout: layouts.Layout, ws) -> None:
+        """
+        Один проход по строкам layout.first_row..layout.last_row листа ws.
+        Строка читается один раз; правило ищется по названию в колонке A (layout.lookup),
+        строки без точного совпадения проверяются правилами layout.contains.
+        """
+        for values in ws.iter_rows(min_row=layout.first_row, max_row=layout.last_row, values_only=True):
+            label = values[0]
+            rule = layout.lookup.get(label)
+            if rule is not None:
+                self._apply_rule(rule, ws, values)
+                continue
+            try:
+                for rule in layout.contains:
+                    if rule.matches(label) and self._apply_rule(rule, ws, values):
+                        break
+            except Exception:  # название не строка или в строке нет нужной колонки
+                continue
+
+    def _apply_rule(self, rule: layouts.LabelRule, ws, values: tuple) -> bool:
+        """
+        Сумма строки values по правилу rule.
+        :return: False, если у правила не нашлось подходящей колонки
+        """
+        mode = rule.mode
+        if mode == layouts.EACH:
+            for column in rule.columns:
+                if self._column_applies(column, values):
+                    val = self._value(rule, values[column.index])
+                    if val > 0:  # не убирай if
+                        self._amount(rule, ws, column, val)
+                        return True
+            return False
+        if mode == layouts.CHECKED:
+            check, column = rule.columns
+            if values[check.index] > 0:
+                self._amount(rule, ws, column, values[column.index])
+            return True
+        if mode == layouts.FALLBACK:
+            column, fallback = rule.columns
+            try:
+                if values[column.index] > 0:  # не убирай if
+                    self._amount(rule, ws, column, values[column.index])
+            except TypeError:
+                self._amount(rule, ws, fallback, values[fallback.index])
+            return True
+        if mode in (layouts.TEXT, layouts.TEXT_OR_RAW):
+            column = rule.columns[0]
+            val = values[column.index]
+            try:
+                val = val.replace(' ', '').replace(',', '.')
+            except Exception:
+                if mode == layouts.TEXT:
+                    raise
+            self._amount(rule, ws, column, val)
+            return True
+
+        # FIRST и RAW: первая подходящая колонка
+        column = next((c for c in rule.columns if self._column_applies(c, values)), None)
+        if column is None:
+            return False
+        val = self._value(rule, values[column.index])
+        if mode == layouts.FIRST and not val > 0:  # не убирай if
+            return True
+        self._amount(rule, ws, column, val)
+        return True
+
+    @staticmethod
+    def _column_applies(column: layouts.Column, values: tuple) -> bool:
+        return len(values) >= column.min_len and not (column.skip_none and values[column.index] is None)
+
+    @staticmethod
+    def _value(rule: layouts.LabelRule, val):
+        if rule.convert and isinstance(val, str):
+            val = float(val.replace(',', '.'))
+        return val
+
+    def _amount(self, rule: layouts.LabelRule, ws, column: layouts.Column, val) -> None:
+        question = f'{ws[column.msg_cell].value[20:]}' if rule.target == layouts.GP else None
+        self.steps.append(Amount(rule.target, val, rule.unique, question))
+
+
+def parse_file(file: str, load_mode: str = loader.DEFAULT_LOAD_MODE) -> ParsedFile:
+    """
+    Разбор файла РЦИ. Исключения не пробрасывает: ошибка записывается шагом Failure.
+
+    :param load_mode: Способ загрузки книги из loader.LOAD_MODES
+    """
+    return _FileParser(file, load_mode).parse()
+
+
+class CalculationCancelled(Exception):
+    """Расчет остановлен по запросу (например при закрытии окна)"""
+
+
+def _until_cancelled(parsed_files: Iterable[ParsedFile], cancel: Optional[Callable[[], bool]]) -> Iterable[ParsedFile]:
+    """Разобранные файлы по одному; перед выдачей каждого проверяется cancel"""
+    for parsed in parsed_files:
+        if cancel and cancel():
+            raise CalculationCancelled('Расчет прерван')
+        yield parsed
+
+
+def parse_files(
+    files: list,
+    load_mode: str = loader.DEFAULT_LOAD_MODE,
+    workers: Optional[int] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+) -> list:
+    """
+    Разбор файлов РЦИ на пуле процессов.
+    Падение процесса пула записывается в результат файла шагом Failure.
+
+    :param workers: Количество процессов (по умолчанию — число ядер)
+    :param cancel: Возвращает True, если нужно остановиться; проверяется между файлами
+    :return: ParsedFile в порядке files
+    :raises CalculationCancelled: при отмене; еще не начатые файлы не разбираются
+    """
+    max_workers = min(workers or os.cpu_count() or 1, len(files))
+    if max_workers <= 1:
+        return list(_until_cancelled((parse_file(file, load_mode) for file in files), cancel))
+
+    parsed = []
+    # spawn, а не fork: пул запускается из потока расчета внутри приложения Qt, fork многопоточного процесса ненадёжен
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = [executor.submit(parse_file, file, load_mode) for file in files]
+        for file, future in zip(files, futures):
+            if cancel and cancel():
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise CalculationCancelled('Расчет прерван')
+            try:
+                parsed.append(future.result())
+            except Exception as e:  # падение самого процесса (BrokenProcessPool и т.п.)
+                parsed.append(ParsedFile(str(file), steps=(_failure(e),)))
+    return parsed
+
+
+# --- Шаг 2: учет разобранных файлов ---
+def _gp_candidate(obligation: int, position: int, parsed: ParsedFile) -> GpCandidate:
+    title = next((s.title for s in parsed.steps if isinstance(s, Summary) and s.failure is None), None)
+    return GpCandidate(obligation, position, parsed.file, parsed.name, title, parsed.steps[position])
+
+
+def gp_candidates(parsed_files: Iterable[ParsedFile]) -> list[GpCandidate]:
+    """Вся госпошлина разобранных файлов в порядке учета — чтобы решить о ней до учета, одним списком"""
+    candidates = []
+    for obligation, parsed in enumerate(parsed_files, start=1):
+        for position, step in enumerate(parsed.steps):
+            if isinstance(step, Failure):  # дальше файл не учитывается
+                break
+            if isinstance(step, Amount) and step.target == layouts.GP:
+                candidates.append(_gp_candidate(obligation, position, parsed))
+    return candidates
+
+
+class _Run:
+    """Состояние одного расчета: суммы по видам задолженности и результаты обязательств"""
+
+    def __init__(self, decide_gp: Optional[Callable[[GpCandidate], bool]], output: Optional[Callable[[str], None]]):
+        self.decide_gp = decide_gp
+        self.output = output
+        self.sums: dict[str, list] = {key: [] for key in (*TARGETS, SU, TEMP)}
+        self.obligations: list[ObligationResult] = []
+
+    def add(self, parsed: ParsedFile) -> ObligationResult:
+        index = len(self.obligations) + 1
+        messages, counted = [], []
+        total = title = error = None
+
+        def out(text: str) -> None:
+            messages.append(text)
+            if self.output:
+                self.output(text)
+
+        out(f'\n[{index}] Обязательство\n')
+        try:
+            for position, step in enumerate(parsed.steps):
+                if isinstance(step, Message):
+                    out(step.text)
+                elif isinstance(step, Amount):
+                    gp = _gp_candidate(index, position, parsed) if step.target == layouts.GP else None
+                    self._amount(step, out, counted, gp)
+                elif isinstance(step, Failure):
+                    error = step
+                    break
+                elif isinstance(step, Summary):
+                    total, title, error = self._summary(step, out)
+        except Exception as e:
+            error = _failure(e)
+        if error is not None:
+            total = None
+            out(f'<b>Ошибка при обработке файла {os.path.basename(parsed.file)} {error.error}\n{error.details}</b>')
+
+        result = ObligationResult(index, parsed.file, parsed.name, title, tuple(counted), total, tuple(messages), error)
+        self.obligations.append(result)
+        return result
+
+    def _amount(self, amount: Amount, out: Callable, counted: list, gp: Optional[GpCandidate]) -> None:
+        sums, val = self.sums, amount.value
+        if amount.target == layouts.GP:
+            if not (self.decide_gp and self.decide_gp(gp)):
+                out(f'<b><u>Госпошлина в сумме {val} не посчитана!</u></b>')
+                out('')
+                return
+        elif amount.unique == layouts.UNIQUE_FILE and val in sums[TEMP]:
+            return
+        elif amount.unique == layouts.UNIQUE_TARGET and val in sums[amount.target]:
+            return
+        sums[amount.target].append(val)
+        sums[TEMP].append(val)
+        sums[SU].append(val)
+        counted.append((amount.target, val))
+        if amount.target == layouts.GP:
+            out(f'<b><u>Госпошлина в сумме {val} посчитана!</u></b>')
+            out('')
+
+    def _summary(self, summary: Summary, out: Callable) -> tuple:
+        """:return: (итог обязательства, название, ошибка)"""
+        sums = self.sums
+        if summary.layout == layouts.OPERATIONS.name:
+            for key in (layouts.NEUS, SU, TEMP, layouts.OD, layouts.PRC, layouts.PP):
+                to_float(sums[key])
+        if summary.layout == layouts.DOGOVOR.name:
+            y = sum(set(sums[TEMP]))
+        else:
+            y = sum(sums[TEMP])
+        if summary.failure is not None:
+            return None, None, summary.failure
+
+        heading = format_heading(summary.heading)
+        if heading is not None:
+            out(heading)
+        out(f'\nИтоговая задолженность по обязательству - {y:.2f}')
+        if summary.layout != layouts.DOGOVOR.name:
+            out('')
+        sums[TEMP].clear()
+        return y, summary.title, None
+
+    def running_total(self) -> Optional[dict]:
+        """Промежуточные итоги; None, если среди сумм есть нечисловые"""
+        try:
+            return build_total(self.sums)
+        except TypeError:  # нечисловое значение в суммах — ошибка проявится в итоговом расчете
+            return None
+
+    def result(self) -> CalculationResult:
+        sums = {key: tuple(values) for key, values in self.sums.items() if key != TEMP}
+        return CalculationResult(
+            tuple(self.obligations), MappingProxyType(sums), MappingProxyType(build_total(self.sums))
+        )
+
+
+def resolve(
+    parsed_files: Iterable[ParsedFile],
+    count: int,
+    decide_gp: Optional[Callable[[GpCandidate], bool]] = None,
+    output: Optional[Callable[[str], None]] = None,
+    on_file: Optional[Callable[[int, int, dict], None]] = None,
+) -> CalculationResult:
+    """
+    Учет разобранных файлов по порядку.
+
+    :param count: Всего файлов (для on_file)
+    :param decide_gp: Учитывать ли госпошлину GpCandidate; по умолчанию не учитывается
+    :param output: Вывод сообщений по мере учета
+    :param on_file: Вызывается после каждого файла: on_file(номер файла, всего файлов, промежуточные итоги)
+    """
+    run = _Run(decide_gp, output)
+    for idx, parsed in enumerate(parsed_files, start=1):
+        run.add(parsed)
+        if on_file:
+            running_total = run.running_total()
+            if running_total is not None:
+                on_file(idx, count, running_total)
+
+    result = run.result()
+    if output:
+        output('')
+        if not count:
+            output('Файлы не выбраны')
+    return result
+
+
+def _parse(files: list, load_mode: str, workers: Optional[int], cancel=None) -> Iterable[ParsedFile]:
+    """Пул процессов для workers != 1 и не меньше PARALLEL_MIN_FILES файлов, иначе разбор по одному по мере учета"""
+    if workers != 1 and len(files) >= PARALLEL_MIN_FILES:
+        return parse_files(files, load_mode, workers, cancel)
+    return (parse_file(file, load_mode) for file in files)
+
+
+def _parse_cached(files: list, load_mode: str, workers: Optional[int], cache, cancel=None) -> Iterable[ParsedFile]:
+    """Разобранные файлы из кэша; остальные разбираются (_parse) и сохраняются в кэш"""
+    keys = [cache.key(file, load_mode) for file in files]
+    cached = [cache.get(key) for key in keys]
+    fresh = iter(_parse([file for file, parsed in zip(files, cached) if parsed is None], load_mode, workers, cancel))
+    for file, key, parsed in zip(files, keys, cached):
+        if parsed is None:
+            parsed = next(fresh)
+            cache.put(key, parsed)
+        else:
+            parsed = replace(parsed, file=str(file))  # то же содержимое могло лежать под другим именем
+        yield parsed
+
+
+def calculate(
+    files: list,
+    load_mode: str = loader.DEFAULT_LOAD_MODE,
+    decide_gp: Optional[Callable[[GpCandidate], bool]] = None,
+    output: Optional[Callable[[str], None]] = None,
+    on_file: Optional[Callable[[int, int, dict], None]] = None,
+    workers: Optional[int] = 1,
+    cache=None,
+    decide_gp_all: Optional[Callable[[list[GpCandidate]], dict]] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+) -> CalculationResult:
+    """
+    Расчет по файлам РЦИ. Параметры — как у resolve.
+
+    :param workers: 1 — каждый файл разбирается и сразу учитывается, сообщения выводятся по мере разбора.
+        Больше 1 (None — по числу ядер) — файлы разбираются на пуле процессов, затем учитываются по порядку;
+        вопросы о госпошлине задаются после разбора всех файлов. Итоги в обоих случаях одинаковые.
+    :param cache: cache.ParseCache — разбирать только файлы, которых нет в кэше
+    :param decide_gp_all: Решение обо всей госпошлине сразу: список GpCandidate -> {GpCandidate: учитывать}.
+        Вызывается один раз после разбора всех файлов, до учета; о госпошлине, которой нет в ответе, решает decide_gp
+    :param cancel: Возвращает True, если нужно остановиться; проверяется между файлами, начатый файл доразбирается
+    :raises CalculationCancelled: при отмене
+    """
+    if cache is None:
+        parsed = _parse(files, load_mode, workers, cancel)
+    else:
+        parsed = _parse_cached(files, load_mode, workers, cache, cancel)
+    parsed = _until_cancelled(parsed, cancel)
+    if decide_gp_all is not None:
+        parsed = list(parsed)
+        decisions = decide_gp_all(gp_candidates(parsed))
+        ask = decide_gp
+
+        def decide_gp(gp: GpCandidate) -> bool:
+            if gp in decisions:
+                return decisions[gp]
+            return bool(ask and ask(gp))
+
+    return resolve(parsed, len(files), decide_gp, output, on_file)
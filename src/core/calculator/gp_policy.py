@@ -0,0 +1,114 @@
+"""
+Правила учета госпошлины в расчете РЦИ — без вопроса по каждой строке.
+
+Способы (GP_MODES):
+    ask       — вопрос по каждой госпошлине по мере учета (как раньше);
+    ask_all   — вся госпошлина по всем файлам одним списком после разбора;
+    include   — всегда учитывать;
+    exclude   — никогда не учитывать;
+    threshold — учитывать, если сумма меньше порога;
+    rules     — по файлу правил: номер обязательства -> учитывать или нет.
+
+Если правило не решило (нечисловая сумма при пороге, обязательства нет в файле правил),
+вопрос задается пользователю, а без интерфейса госпошлина не учитывается.
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from src.core.calculator.engine import GpCandidate
+
+ASK = 'ask'
+ASK_ALL = 'ask_all'
+INCLUDE = 'include'
+EXCLUDE = 'exclude'
+THRESHOLD = 'threshold'
+RULES = 'rules'
+GP_MODES = (ASK, ASK_ALL, INCLUDE, EXCLUDE, THRESHOLD, RULES)
+
+
+def _number(value) -> Optional[float]:
+    """Сумма как число: 12345.67, '12345.67' и '12 345,67'; None — не число"""
+    if isinstance(value, str):
+        value = value.replace(' ', '').replace('\xa0', '').replace(',', '.')
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def rule_key(title) -> str:
+    """Ключ обязательства в файле правил: краткое название (номер договора) без пробелов по краям"""
+    return str(title).strip()
+
+
+def load_rules(path: str | Path) -> dict[str, bool]:
+    """
+    Файл правил — JSON-объект {"номер обязательства": true/false}.
+    ValueError, если файл не такого вида.
+    """
+    try:
+        data = json.loads(Path(path).read_text(encoding='utf-8'))
+    except json.JSONDecodeError as e:
+        raise ValueError(f'Файл правил госпошлины {path} не в формате JSON: {e}') from e
+    if not isinstance(data, dict) or not all(isinstance(v, bool) for v in data.values()):
+        raise ValueError(f'Файл правил госпошлины {path}: ожидается {{"номер обязательства": true или false}}')
+    return {rule_key(k): v for k, v in data.items()}
+
+
+@dataclass(frozen=True)
+class GpPolicy:
+    """
+    Правило учета госпошлины.
+
+    :param mode: Способ из GP_MODES
+    :param threshold: Для THRESHOLD — госпошлина учитывается, если меньше порога
+    :param rules: Для RULES — номер обязательства (rule_key) -> учитывать
+    """
+
+    mode: str = ASK
+    threshold: float = 0
+    rules: Mapping[str, bool] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.mode not in GP_MODES:
+            raise ValueError(f'Неизвестный способ учета госпошлины: {self.mode}')
+        object.__setattr__(self, 'rules', MappingProxyType(dict(self.rules)))
+
+    @property
+    def asks_all(self) -> bool:
+        """Оставшиеся вопросы задаются одним списком после разбора всех файлов"""
+        return self.mode in (ASK_ALL, THRESHOLD, RULES)
+
+    def decide(self, gp: GpCandidate) -> Optional[bool]:
+        """Учитывать ли госпошлину; None — правило не решает, нужен вопрос"""
+        if self.mode == INCLUDE:
+            return True
+        if self.mode == EXCLUDE:
+            return False
+        if self.mode == THRESHOLD:
+            value = _number(gp.amount.value)
+            return None if value is None else value < self.threshold
+        if self.mode == RULES and gp.title is not None:
+            return self.rules.get(rule_key(gp.title))
+        return None
+
+    def decide_all(self, candidates: list[GpCandidate]) -> tuple[dict[GpCandidate, bool], list[GpCandidate]]:
+        """:return: (решенные правилом, оставшиеся для вопроса)"""
+        decided, undecided = {}, []
+        for gp in candidates:
+            answer = self.decide(gp)
+            if answer is None:
+                undecided.append(gp)
+            else:
+                decided[gp] = answer
+        return decided, undecided
+
+
+def make_policy(mode: str = ASK, threshold: float = 0, rules_file: Optional[str | Path] = None) -> GpPolicy:
+    """Правило из настроек; для RULES читает файл правил (OSError, ValueError — файл не прочитать)"""
+    rules = load_rules(rules_file) if mode == RULES and rules_file else {}
+    return GpPolicy(mode, threshold, rules)
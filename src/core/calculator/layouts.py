@@ -0,0 +1,256 @@
+"""
+Макеты РЦИ: какие строки листа читает расчет, по каким названиям строк (колонка A)
+суммы относятся к видам задолженности и из каких колонок они берутся.
+
+Таблица описывает данные, а не код: новый формат названий строк банка добавляется
+строкой в labels нужного правила. Layout при создании компилирует себя в словарь
+'название строки' -> правило (Layout.lookup), а engine (_FileParser.read_rows) проходит строки листа один раз.
+"""
+
+from dataclasses import dataclass, field
+from typing import NamedTuple, Optional
+
+# Виды задолженности — списки сумм engine, в которые попадает сумма (и всегда ещё в su и temp)
+OD = 'od'  # основной долг
+PRC = 'prc'  # проценты
+GP = 'gp'  # госпошлина — перед учетом задается вопрос
+KM = 'km'  # комиссии
+NEUS = 'neus'  # неустойки
+PENOD = 'penod'  # пени за кредит
+PENPRC = 'penprc'  # пени за проценты
+PP = 'pp'  # просроченные платежи
+
+# Способы выбора колонки и проверки суммы
+FIRST = 'first'  # первая подходящая колонка; сумма учитывается, если > 0
+EACH = 'each'  # колонки по очереди, пока сумма в колонке не окажется > 0
+RAW = 'raw'  # первая подходящая колонка, сумма как есть, без проверок
+CHECKED = 'checked'  # columns[0] > 0 — условие, сумма берется из columns[1]
+FALLBACK = 'fallback'  # columns[0], если > 0; если там не число — columns[1] как есть
+TEXT = 'text'  # строка '12 345,67' -> '12345.67' (в число переводит engine.to_float)
+TEXT_OR_RAW = 'text_or_raw'  # как TEXT, но не строка берется как есть
+
+# Уникальность суммы
+UNIQUE_FILE = 'file'  # сумма не повторяется среди уже учтенных в этом файле
+UNIQUE_TARGET = 'target'  # сумма не повторяется в своем виде задолженности по всем файлам
+
+
+class Column(NamedTuple):
+    """
+    Колонка-кандидат для суммы.
+
+    :param index: Номер колонки, с 0 (A = 0)
+    :param min_len: Колонка берется, только если в строке не меньше min_len ячеек
+    :param skip_none: Пропустить колонку, если ячейка пустая
+    :param msg_cell: Ячейка с названием обязательства для вопроса о госпошлине
+    """
+
+    index: int
+    min_len: int = 0
+    skip_none: bool = False
+    msg_cell: str = 'a5'
+
+
+@dataclass(frozen=True)
+class LabelRule:
+    """
+    Правило для строк с названиями labels.
+
+    :param target: Вид задолженности (OD, PRC, GP, ...)
+    :param labels: Названия строк; для Layout.contains — подстроки названия
+    :param columns: Колонки-кандидаты по порядку
+    :param mode: Способ выбора колонки (FIRST, EACH, ...)
+    :param convert: Строку '123,45' перевести в число
+    :param unique: Пропускать повторяющиеся суммы (UNIQUE_FILE, UNIQUE_TARGET)
+    """
+
+    target: str
+    labels: tuple[str, ...]
+    columns: tuple[Column, ...]
+    mode: str = FIRST
+    convert: bool = False
+    unique: Optional[str] = None
+
+    def matches(self, label: str) -> bool:
+        """Название содержит одну из подстрок labels. TypeError, если название не строка"""
+        return any(part in label for part in self.labels)
+
+
+@dataclass(frozen=True)
+class Layout:
+    """
+    Макет листа РЦИ.
+
+    :param sheets: Названия первого листа книги для этого макета
+    :param sheet_parts: Подстроки названия первого листа
+    :param first_row: Первая строка с суммами
+    :param last_row: Последняя строка с суммами
+    :param rules: Правила по точному названию строки
+    :param contains: Правила по подстроке названия, проверяются по очереди для строк без точного совпадения
+    """
+
+    name: str
+    sheets: tuple[str, ...]
+    first_row: int
+    last_row: int
+    rules: tuple[LabelRule, ...]
+    contains: tuple[LabelRule, ...] = ()
+    sheet_parts: tuple[str, ...] = ()
+    lookup: dict = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        lookup = {}
+        for rule in self.rules:
+            for label in rule.labels:
+                if label in lookup:
+                    raise ValueError(f'Название строки "{label}" указано в макете {self.name} дважды')
+                lookup[label] = rule
+        object.__setattr__(self, 'lookup', lookup)
+
+    def matches_sheet(self, sheet: str) -> bool:
+        return sheet in self.sheets or any(part in sheet for part in self.sheet_parts)
+
+
+# Колонки титульного листа: I, затем H, затем F
+_TITUL_PRC = (Column(8, min_len=9, skip_none=True), Column(7, min_len=8, skip_none=True), Column(5))
+_TITUL_EACH = (Column(8, min_len=9, skip_none=True), Column(7, min_len=9, skip_none=True), Column(5, 6, msg_cell='a2'))
+
+TITUL = Layout(
+    name='Титульный лист',
+    sheets=('Титульный лист', 'Sheet1'),
+    first_row=3,
+    last_row=26,
+    rules=(
+        LabelRule(
+            OD,
+            (
+                'Задолженность по основному долгу (ссудная задолженность)',
+                'Ссудная задолженность',
+                'присужденный основной долг',
+                'Задолженность по кредиту',
+                'Просроченный основной долг, списанный за счет резерва',
+            ),
+            (Column(8, min_len=9), Column(5)),
+            convert=True,
+            unique=UNIQUE_FILE,
+        ),
+        LabelRule(
+            PRC,
+            (
+                'Задолженность по процентам',
+                'Проценты за кредит',
+                'присужденные просроченные проценты на просроченный основной долг',
+                'присужденные просроченные проценты',
+            ),
+            _TITUL_PRC,
+            convert=True,
+        ),
+        LabelRule(GP, ('Сумма госпошлин, списанных за счет резерва', 'Госпошлина'), _TITUL_EACH, EACH, convert=True),
+        LabelRule(
+            KM,
+            (
+                'Комиссии на отчетную дату',
+                'Комиссия за пользование картой',
+                'Сумма списанных коммиссий за счет резерва',
+            ),
+            (Column(8),),
+            RAW,
+        ),
+        LabelRule(
+            NEUS,
+            (
+                'Неустойка по кредиту',
+                'Неустойка по процентам',
+                'Неустойка за несвоевременное погашение Обязательного платежа',
+                'Неустойки, признанные должником в дату реструктуризации/мирового соглашения по банковской карте',
+                'Неустойки (присужденные)',
+                'Сумма неустоек, списанных за счет резерва',
+                'Неустойки за неисполнение условий договора',
+                'Списанные неустойки',
+                'присужденные неустойки по процентам',
+                'присужденные неустойки по кредиту',
+                'Сумма неустоек за просроченный основной долг, списанных за счет резерва',
+                'Неустойка за просроченные проценты',
+            ),
+            _TITUL_EACH,
+            EACH,
+            convert=True,
+        ),
+    ),
+    contains=(
+        LabelRule(GP, ('по госпошлине',), (Column(8),), RAW),
+        LabelRule(PRC, ('Проценты за кредит ',), (Column(7, skip_none=True),), RAW, unique=UNIQUE_TARGET),
+        LabelRule(OD, ('Ссудная задолженность ',), (Column(7, skip_none=True),), RAW, unique=UNIQUE_TARGET),
+    ),
+)
+
+# Колонки листа 'Задолженность по договору': B, если там не число — H
+_DOGOVOR_FALLBACK = (Column(1), Column(7))
+
+DOGOVOR = Layout(
+    name='Задолженность по договору',
+    sheets=('Задолженность по договору',),
+    first_row=3,
+    last_row=26,
+    rules=(
+        LabelRule(
+            OD,
+            (
+                'Просроченная ссудная задолженность (присужденная)',
+                'Просроченная ссудная задолженность',
+                'Ссудная задолженность',
+                'Основной долг на в/б, списанный за счет резерва',
+            ),
+            _DOGOVOR_FALLBACK,
+            FALLBACK,
+        ),
+        LabelRule(
+            PRC,
+            (
+                'Задолженность по процентам',
+                'Просроченная задолженность по процентам (присужденная)',
+                'Неполученные списанные на в/б проценты',
+                'Просроченная задолженность по процентам',
+            ),
+            _DOGOVOR_FALLBACK,
+            FALLBACK,
+        ),
+        LabelRule(PENPRC, ('Пени за проценты (присужденные)',), _DOGOVOR_FALLBACK, FALLBACK),
+        LabelRule(PENOD, ('Пени за кредит (присужденные)',), _DOGOVOR_FALLBACK, FALLBACK),
+        LabelRule(NEUS, ('Неустойка по кредиту', 'Неустойка по процентам'), (Column(8),), RAW),
+        LabelRule(
+            GP,
+            (
+                'Госпошлина',
+                'Госпошлина (присужденная)',
+                'Расходы на оплату третейского сбора',
+                'Списанная на в/б госпошлина (присуждённая)',
+            ),
+            (Column(8), Column(1)),
+            CHECKED,
+        ),
+    ),
+)
+
+OPERATIONS = Layout(
+    name='Отчет по операциям',
+    sheets=('Лист1',),
+    sheet_parts=('Отчет по операциям',),
+    first_row=17,
+    last_row=26,
+    rules=(
+        LabelRule(OD, ('Основной долг',), (Column(2),), TEXT),
+        LabelRule(PRC, ('Проценты за пользование кредитом',), (Column(2),), TEXT_OR_RAW),
+        LabelRule(NEUS, ('Неустойка за просроченную ссуду', 'Неустойка за просроченные проценты'), (Column(2),), TEXT),
+        LabelRule(PP, ('Просроченные платежи',), (Column(2),), TEXT_OR_RAW),
+    ),
+)
+
+LAYOUTS = (TITUL, DOGOVOR, OPERATIONS)
+
+
+def detect_layout(sheet: str) -> Optional[Layout]:
+    """Макет по названию первого листа книги или None"""
+    for layout in LAYOUTS:
+        if layout.matches_sheet(sheet):
+            return layout
+    return None
@@ -0,0 +1,502 @@
+import importlib.util
+import io
+import re
+import zipfile
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional
+
+from openpyxl import load_workbook
+from openpyxl.reader.excel import SUPPORTED_FORMATS
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string
+
+LOAD_MODES = ('read_only', 'full')
+DEFAULT_LOAD_MODE = 'read_only'
+REPAIRED_SHEET = 'Sheet1'  # Название листа книги, восстановленной repair_workbook
+
+# Форматы файлов, которые распознает sniff_format; None — формат не распознан
+XLSX = 'xlsx'  # Office Open XML: xlsx, xlsm, xltx, xltm
+XLSB = 'xlsb'  # двоичная книга Excel 2007+
+XLS = 'xls'  # книга Excel 97-2003 (OLE2)
+ODS = 'ods'  # OpenDocument
+HTML = 'html'  # таблица HTML, сохраненная с расширением xls (выгрузки из веб-интерфейсов)
+
+_OLE2_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+_ZIP_MAGIC = b'PK\x03\x04'
+_OOXML_TYPES = (  # основной документ книги в [Content_Types].xml
+    b'spreadsheetml.sheet.main+xml',
+    b'spreadsheetml.template.main+xml',
+    b'ms-excel.sheet.macroEnabled.main+xml',
+    b'ms-excel.template.macroEnabled.main+xml',
+)
+_XLSB_TYPE = b'ms-excel.sheet.binary.macroEnabled.main'
+_ODS_TYPE = b'application/vnd.oasis.opendocument.spreadsheet'
+
+# Сколько первых строк листа читает расчет. Остальные строки (история операций, графики) не разбираются
+SHEET_ROWS = {
+    'Титульный лист': 26,
+    'Sheet1': 26,
+    'Задолженность по договору': 26,
+    'Лист1': 26,
+    'Отчет по операциям': 26,
+    'Расчёт': 17,
+    'Приложение 5': 17,
+    'Расчет_7': 17,
+}
+DEFAULT_SHEET_ROWS = 26
+
+
+def _sheet_rows(title: str) -> int:
+    if title in SHEET_ROWS:
+        return SHEET_ROWS[title]
+    if 'Отчет по операциям' in title:
+        return SHEET_ROWS['Отчет по операциям']
+    return DEFAULT_SHEET_ROWS
+
+
+class _Cell:
+    """Значение ячейки с интерфейсом openpyxl: cell.value"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class SheetView:
+    """
+    Первые строки листа, прочитанные за один проход в режиме read_only.
+    Повторяет ту часть интерфейса Worksheet, которой пользуется расчет:
+    ws[номер строки], ws['A5'], ws.cell(row, column), ws.iter_rows(...), max_row, max_column.
+    Как и у обычного листа, строка ws[row] имеет длину max_column всего листа.
+    Размеры берутся из файла; если их нет или они меньше данных, лист один раз просматривается целиком.
+    Если запрошена строка за пределами прочитанных, лист дочитывается до неё.
+    """
+
+    def __init__(self, ws, rows: int):
+        self.title = ws.title
+        self._ws = ws
+        self._dimensions = (ws.max_row or 0, ws.max_column or 0)  # размеры из файла, могут отсутствовать
+        ws.reset_dimensions()  # строки читаются как есть, без обрезки по размерам из файла
+        self.max_row = self.max_column = 0
+        self._rows: list[tuple] = []  # Значения строк длиной max_column
+        self._loaded = 0  # Сколько строк запрошено при чтении
+        self._read(rows)
+
+    def _scan(self, rows: int = None) -> tuple[list[tuple], int]:
+        """Значения первых rows строк (всех, если None) и наибольшая ширина строки"""
+        values = [tuple(v) for v in self._ws.iter_rows(max_row=rows, values_only=True)]
+        return values, max((len(v) for v in values), default=0)
+
+    def _read(self, rows: int) -> None:
+        if rows <= self._loaded:
+            return
+        self._loaded = rows
+        values, width = self._scan(rows)
+        self.max_row, self.max_column = self._dimensions
+        if not self.max_row or not self.max_column or width > self.max_column or len(values) > self.max_row:
+            # В файле нет размеров листа или они меньше данных — считаем их по всему листу
+            all_values, self.max_column = self._scan()
+            self.max_row = max((idx for idx, v in enumerate(all_values, start=1) if v), default=0)
+            self._dimensions = (self.max_row, self.max_column)
+        empty = (None,) * self.max_column
+        self._rows = [(row + empty)[: self.max_column] for row in values]
+
+    def _values(self, row: int) -> tuple:
+        self._read(row)
+        if 1 <= row <= len(self._rows):
+            return self._rows[row - 1]
+        return (None,) * self.max_column
+
+    def _row(self, row: int) -> tuple:
+        return tuple(_Cell(v) for v in self._values(row))
+
+    def iter_rows(self, min_row: int = 1, max_row: int = None, values_only: bool = False):
+        """Строки min_row..max_row, как Worksheet.iter_rows: значения (values_only) или ячейки"""
+        for row in range(min_row, (max_row or self.max_row) + 1):
+            yield self._values(row) if values_only else self._row(row)
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self._row(key)
+        column, row = coordinate_from_string(key.upper())
+        return self.cell(row=row, column=column_index_from_string(column))
+
+    def cell(self, row: int, column: int) -> _Cell:
+        values = self._values(row)
+        return _Cell(values[column - 1] if 1 <= column <= len(values) else None)
+
+
+class GridSheet(SheetView):
+    """
+    Лист из готовой таблицы значений — для книг, восстановленных в памяти (см. repair_workbook).
+    Интерфейс тот же, что у SheetView; пустые строки в конце таблицы не учитываются в max_row.
+    """
+
+    def __init__(self, title: str, rows: list[tuple]):
+        self.title = title
+        self.max_row = max((idx for idx, v in enumerate(rows, start=1) if any(c is not None for c in v)), default=0)
+        self.max_column = max((len(v) for v in rows), default=0)
+        empty = (None,) * self.max_column
+        self._rows = [(tuple(row) + empty)[: self.max_column] for row in rows[: self.max_row]]
+
+    def _read(self, rows: int) -> None:
+        pass  # таблица уже в памяти целиком
+
+
+class GridWorkbook:
+    """
+    Книга из таблиц значений по листам, с интерфейсом WorkbookView.
+
+    :param sheets: Название листа -> строки значений, в порядке листов книги
+    """
+
+    mode = 'grid'
+
+    def __init__(self, sheets: dict[str, list[tuple]]):
+        self._sheets = {title: GridSheet(title, rows) for title, rows in sheets.items()}
+
+    @property
+    def sheetnames(self) -> list[str]:
+        return list(self._sheets)
+
+    def __getitem__(self, name: str) -> GridSheet:
+        return self._sheets[name]
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> 'GridWorkbook':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class WorkbookView:
+    """
+    Открытая книга РЦИ. Закрывается через close() или при выходе из with.
+
+    В режиме read_only листы читаются лениво: при первом обращении wb['Лист']
+    разбираются только первые строки этого листа (SHEET_ROWS), остальные листы не читаются вовсе.
+    В режиме full книга загружается целиком, как load_workbook(data_only=True).
+
+    :param mode: Способ загрузки из LOAD_MODES
+    """
+
+    def __init__(self, path: str | Path | BinaryIO, mode: str = DEFAULT_LOAD_MODE):
+        if mode not in LOAD_MODES:
+            raise ValueError(f'Неизвестный способ загрузки книги: {mode}')
+        self.mode = mode
+        self._wb = load_workbook(path, data_only=True, read_only=mode == 'read_only')
+        self._sheets: dict[str, SheetView] = {}
+
+    @property
+    def sheetnames(self) -> list[str]:
+        return self._wb.sheetnames
+
+    def __getitem__(self, name: str):
+        if self.mode == 'full':
+            return self._wb[name]
+        sheet = self._sheets.get(name)
+        if sheet is None:
+            sheet = self._sheets[name] = SheetView(self._wb[name], _sheet_rows(name))
+        return sheet
+
+    def close(self) -> None:
+        self._wb.close()
+
+    def __enter__(self) -> 'WorkbookView':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def sniff_format(path: str | Path) -> Optional[str]:
+    """
+    Формат книги по содержимому, а не по расширению: сигнатура файла и [Content_Types].xml архива.
+    None — файл не прочитать, архив поврежден или формат неизвестен.
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(1024)
+            if head.startswith(_OLE2_MAGIC):
+                return XLS
+            if head.startswith(_ZIP_MAGIC):
+                f.seek(0)
+                return _sniff_zip(f)
+    except (OSError, zipfile.BadZipFile):
+        return None
+    text = head.lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+    if text.startswith(b'<') and any(tag in text for tag in (b'<html', b'<table', b'<!doctype html')):
+        return HTML
+    return None
+
+
+def _sniff_zip(f: BinaryIO) -> Optional[str]:
+    with zipfile.ZipFile(f) as archive:
+        names = set(archive.namelist())
+        if '[Content_Types].xml' in names:
+            types = archive.read('[Content_Types].xml')
+            if any(t in types for t in _OOXML_TYPES):
+                return XLSX
+            if _XLSB_TYPE in types:
+                return XLSB
+        if 'mimetype' in names and archive.read('mimetype').strip() == _ODS_TYPE:
+            return ODS
+    return None
+
+
+def repair_workbook(path: str | Path) -> GridWorkbook:
+    """
+    Книга, которую не открывает openpyxl, восстановленная в памяти через pandas — такой же,
+    какой её раньше делала перезапись файла (read_excel, затем to_excel без заголовков):
+    только первый лист, под названием REPAIRED_SHEET, без первой строки — её pandas читает как заголовки.
+    Под такие книги заведены 'Sheet1' в layouts.TITUL и запасной лист 'Sheet1' в разборе титульного листа.
+    Файл читается один раз и не изменяется.
+    """
+    import pandas as pd  # только для восстановления: расчет обычных книг не тратит время на импорт
+
+    with open(path, 'rb') as f:
+        data = io.BytesIO(f.read())
+    df = pd.read_excel(data)
+    return GridWorkbook({REPAIRED_SHEET: df.astype(object).where(df.notna(), None).values.tolist()})
+
+
+def _open_xlsx(path: str | Path, mode: str) -> WorkbookView:
+    """openpyxl проверяет расширение файла: xlsx, сохраненная как .xls, открывается из памяти"""
+    if Path(path).suffix.lower() in SUPPORTED_FORMATS:
+        return WorkbookView(path, mode)
+    with open(path, 'rb') as f:
+        return WorkbookView(io.BytesIO(f.read()), mode)
+
+
+def _xls_value(cell, datemode: int):
+    import xlrd
+
+    if cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+        return None
+    if cell.ctype == xlrd.XL_CELL_NUMBER:
+        return int(cell.value) if cell.value.is_integer() else cell.value  # как openpyxl: целые без дробной части
+    if cell.ctype == xlrd.XL_CELL_DATE:
+        return xlrd.xldate.xldate_as_datetime(cell.value, datemode)
+    if cell.ctype == xlrd.XL_CELL_BOOLEAN:
+        return bool(cell.value)
+    return cell.value
+
+
+def _open_xls(path: str | Path, mode: str) -> GridWorkbook:
+    """Книга Excel 97-2003 через xlrd; листы загружаются по одному и сразу освобождаются"""
+    import xlrd
+
+    book = xlrd.open_workbook(path, on_demand=True)
+    try:
+        sheets = {}
+        for index, title in enumerate(book.sheet_names()):
+            sheet = book.sheet_by_index(index)
+            sheets[title] = [tuple(_xls_value(c, book.datemode) for c in sheet.row(r)) for r in range(sheet.nrows)]
+            book.unload_sheet(index)
+    finally:
+        book.release_resources()
+    return GridWorkbook(sheets)
+
+
+_NUMBER = re.compile(r'-?\d+(\.\d+)?')
+_CHARSET = re.compile(rb'charset=["\']?([\w-]+)', re.IGNORECASE)
+_SHEET_NAME = re.compile(r'<x:Name>(.*?)</x:Name>', re.IGNORECASE | re.DOTALL)
+_BLOCK_TAGS = {'p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'br', 'li'}
+
+
+class _HtmlTables(HTMLParser):
+    """
+    Строки всех таблиц документа подряд, как их раскладывает Excel при открытии HTML.
+    Текст вне таблиц (заголовки, абзацы) занимает строку с одной ячейкой; colspan добавляет пустые ячейки.
+    Число берется из атрибута x:num выгрузок Excel, иначе из текста ячейки вида 123 или -12.5;
+    ячейка с атрибутом x:str всегда остается текстом.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows: list[tuple] = []
+        self._depth = 0  # вложенность таблиц
+        self._row: Optional[list] = None
+        self._cell: Optional[list[str]] = None
+        self._attrs: dict = {}
+        self._text: list[str] = []  # текст вне таблиц
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            self._flush_text()
+            self._depth += 1
+        elif self._depth == 1 and tag == 'tr':
+            self._end_row()
+            self._row = []
+        elif self._depth == 1 and tag in ('td', 'th'):
+            self._end_cell()
+            if self._row is None:
+                self._row = []
+            self._cell, self._attrs = [], dict(attrs)
+        elif tag == 'br':
+            self._add_text('\n')
+        elif not self._depth and tag in _BLOCK_TAGS:
+            self._flush_text()
+
+    def handle_endtag(self, tag):
+        if tag == 'table' and self._depth:
+            if self._depth == 1:
+                self._end_row()
+            self._depth -= 1
+        elif self._depth == 1 and tag == 'tr':
+            self._end_row()
+        elif self._depth == 1 and tag in ('td', 'th'):
+            self._end_cell()
+        elif not self._depth and tag in _BLOCK_TAGS:
+            self._flush_text()
+
+    def handle_data(self, data):
+        self._add_text(data)
+
+    def close(self):
+        super().close()
+        self._end_row()
+        self._flush_text()
+
+    def _add_text(self, text: str) -> None:
+        if self._cell is not None:
+            self._cell.append(text)
+        elif not self._depth:
+            self._text.append(text)
+
+    def _flush_text(self) -> None:
+        text = ' '.join(''.join(self._text).split())
+        self._text = []
+        if text:
+            self.rows.append((text,))
+
+    def _end_cell(self) -> None:
+        if self._cell is None:
+            return
+        text = '\n'.join(' '.join(line.split()) for line in ''.join(self._cell).strip().splitlines())
+        if 'x:str' in self._attrs:
+            self._row.append(text or None)
+        else:
+            self._row.append(_html_value(text, self._attrs.get('x:num')))
+        try:
+            span = int(self._attrs.get('colspan') or 1)
+        except ValueError:
+            span = 1
+        self._row.extend([None] * (span - 1))
+        self._cell = None
+
+    def _end_row(self) -> None:
+        self._end_cell()
+        if self._row is not None:
+            self.rows.append(tuple(self._row))
+            self._row = None
+
+
+def _html_value(text: str, number: Optional[str]):
+    for value in (number, text):
+        if value and _NUMBER.fullmatch(value.strip()):
+            return float(value) if '.' in value else int(value)
+    return text or None
+
+
+def _html_text(data: bytes) -> str:
+    """Текст HTML в кодировке из BOM или meta charset; без них — UTF-8, затем cp1251"""
+    if data.startswith((b'\xff\xfe', b'\xfe\xff')):
+        return data.decode('utf-16')
+    if data.startswith(b'\xef\xbb\xbf'):
+        return data[3:].decode('utf-8', errors='replace')
+    charset = _CHARSET.search(data[:4096])
+    encodings = [charset.group(1).decode('ascii')] if charset else []
+    for encoding in encodings + ['utf-8', 'cp1251']:
+        try:
+            return data.decode(encoding)
+        except (LookupError, UnicodeDecodeError):
+            continue
+    return data.decode('utf-8', errors='replace')
+
+
+def _open_html(path: str | Path, mode: str) -> GridWorkbook:
+    """
+    Таблица HTML с расширением xls — один лист, как при открытии в Excel.
+    Название листа — из разметки Excel (x:Name), иначе имя файла.
+    """
+    with open(path, 'rb') as f:
+        text = _html_text(f.read())
+    parser = _HtmlTables()
+    parser.feed(text)
+    parser.close()
+    name = _SHEET_NAME.search(text)
+    title = name.group(1).strip() if name else Path(path).stem[:31]
+    return GridWorkbook({title: parser.rows})
+
+
+def _module_available(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+@dataclass
+class Reader:
+    """
+    Способ открыть книгу РЦИ.
+
+    :param name: Название для сообщений
+    :param formats: Форматы из sniff_format, которые читает способ; None — формат не распознан
+    :param is_available: Проверка наличия библиотеки
+    :param open: Открытие (путь, способ загрузки из LOAD_MODES) -> книга с интерфейсом WorkbookView
+    """
+
+    name: str
+    formats: tuple[Optional[str], ...]
+    is_available: Callable[[], bool]
+    open: Callable[[str | Path, str], WorkbookView | GridWorkbook]
+
+
+# Порядок — приоритет: для формата пробуются доступные способы по очереди, пока один не откроет книгу
+_READERS: list[Reader] = [
+    Reader('openpyxl', (XLSX, None), lambda: True, _open_xlsx),
+    Reader('xlrd', (XLS,), lambda: _module_available('xlrd'), _open_xls),
+    Reader('html', (HTML,), lambda: True, _open_html),
+    Reader(
+        'pandas', (XLSX, XLS, XLSB, ODS, None), lambda: _module_available('pandas'), lambda p, _: repair_workbook(p)
+    ),
+]
+
+
+def register_reader(reader: Reader, first: bool = True) -> None:
+    """Добавляет способ открыть книгу (по умолчанию с наивысшим приоритетом)"""
+    if first:
+        _READERS.insert(0, reader)
+    else:
+        _READERS.append(reader)
+
+
+def readers_for(fmt: Optional[str]) -> list[Reader]:
+    """Доступные способы для формата fmt по приоритету"""
+    return [reader for reader in _READERS if fmt in reader.formats and reader.is_available()]
+
+
+def open_workbook(path: str | Path, mode: str = DEFAULT_LOAD_MODE) -> WorkbookView | GridWorkbook:
+    """
+    Открывает книгу РЦИ. Формат определяется по содержимому файла (sniff_format),
+    книга открывается первым подходящим способом из реестра; если он не справился — следующим.
+    Ошибка последнего способа выбрасывается, предыдущие видны в её цепочке исключений.
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f'Неизвестный способ загрузки книги: {mode}')
+    fmt = sniff_format(path)
+    readers = readers_for(fmt)
+    if not readers:
+        raise ValueError(f'Нет способа открыть книгу формата {fmt}: {path}')
+    error = None
+    for reader in readers:
+        try:
+            return reader.open(path, mode)
+        except Exception as e:
+            e.__context__ = error
+            error = e
+    raise error
@@ -1,7 +1,8 @@
+import bisect
 import re
 from copy import deepcopy
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 from docx import Document
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_PARAGRAPH_ALIGNMENT
@@ -10,6 +11,9 @@ from docx.oxml.ns import qn
 from docx.shared import Cm, Pt
 from docx.table import Table
 from docx.text.paragraph import Paragraph
+from docx.text.run import Run
+
+from src.utils.text_utils import get_matcher
 
 
 def open_docx(path: str | Path) -> Document:
@@ -24,6 +28,162 @@ def open_docx(path: str | Path) -> Document:
     return Document(path)
 
 
+# Метки разделов заявления
+OBYAZATELSTVO_MARK = 'Обязательство №'
+PROSIT_SUD_MARK = 'ПРОСИТ СУД:'
+APPENDICES_MARK = 'ПРИЛОЖЕНИЯ:'
+REQUISITES_MARK = 'Реквизиты ПАО Сбербанк'
+
+
+class StatementIndex:
+    """
+    Индекс заявления, строится за один проход по документу.
+    Хранит список абзацев, кэш их текста и позиции меток разделов.
+    Чтобы индекс оставался согласованным с документом, абзацы нужно
+    удалять, вставлять и менять их текст через методы индекса.
+    """
+
+    MARKS = (OBYAZATELSTVO_MARK, PROSIT_SUD_MARK, APPENDICES_MARK, REQUISITES_MARK)
+
+    def __init__(self, doc: Document):
+        self.doc = doc
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Перестраивает индекс заново по документу (после изменений в обход индекса, например restore_body)"""
+        self.paragraphs: list[Paragraph] = list(self.doc.paragraphs)
+        self.texts: list[str] = [para.text for para in self.paragraphs]
+        self._rebuild_marks()
+
+    def __len__(self) -> int:
+        return len(self.paragraphs)
+
+    def _rebuild_marks(self) -> None:
+        self._marks: dict[str, list[int]] = {mark: [] for mark in self.MARKS}
+        for i, text in enumerate(self.texts):
+            for mark in self.MARKS:
+                if mark in text:
+                    self._marks[mark].append(i)
+
+    def _shift_marks(self, pos: int, delta: int) -> None:
+        """Сдвигает позиции меток начиная с pos на delta"""
+        for positions in self._marks.values():
+            for j, value in enumerate(positions):
+                if value >= pos:
+                    positions[j] = value + delta
+
+    def _update_marks(self, i: int) -> None:
+        """Пересчитывает метки для абзаца i после изменения его текста"""
+        for mark, positions in self._marks.items():
+            k = bisect.bisect_left(positions, i)
+            present = k < len(positions) and positions[k] == i
+            if mark in self.texts[i]:
+                if not present:
+                    positions.insert(k, i)
+            elif present:
+                del positions[k]
+
+    def find(self, mark: str, start: int = 0) -> Optional[int]:
+        """Индекс первого абзаца не раньше start, содержащего mark"""
+        if mark in self._marks:
+            positions = self._marks[mark]
+            k = bisect.bisect_left(positions, start)
+            return positions[k] if k < len(positions) else None
+        for i in range(start, len(self.texts)):
+            if mark in self.texts[i]:
+                return i
+        return None
+
+    def section(self, start_mark: str, end_mark: str) -> Optional[range]:
+        """
+        Диапазон абзацев после первого абзаца с start_mark
+        до первого следующего абзаца с end_mark (не включая его).
+        Если end_mark не найдена — до конца документа. None, если нет start_mark.
+        """
+        start = self.find(start_mark)
+        if start is None:
+            return None
+        end = self.find(end_mark, start + 1)
+        return range(start + 1, len(self) if end is None else end)
+
+    def set_text(self, i: int, text: str) -> None:
+        """Заменяет текст абзаца i"""
+        self.paragraphs[i].text = text
+        self.refresh(i)
+
+    def refresh(self, i: int) -> None:
+        """Перечитывает текст абзаца i после изменения его runs"""
+        self.texts[i] = self.paragraphs[i].text
+        self._update_marks(i)
+
+    def remove(self, indices) -> None:
+        """Удаляет абзацы с указанными индексами из документа и индекса"""
+        drop = set(indices)
+        if not drop:
+            return
+        for i in drop:
+            p_element = self.paragraphs[i]._element
+            if p_element.getparent() is not None:
+                p_element.getparent().remove(p_element)
+        self.paragraphs = [para for i, para in enumerate(self.paragraphs) if i not in drop]
+        self.texts = [text for i, text in enumerate(self.texts) if i not in drop]
+        self._rebuild_marks()
+
+    def _insert(self, pos: int, element, parent) -> Paragraph:
+        para = Paragraph(element, parent)
+        self._shift_marks(pos, 1)
+        self.paragraphs.insert(pos, para)
+        self.texts.insert(pos, para.text)
+        self._update_marks(pos)
+        return para
+
+    def insert_before(self, i: int, element) -> Paragraph:
+        """Вставляет XML-элемент абзаца перед абзацем i"""
+        anchor = self.paragraphs[i]
+        anchor._element.addprevious(element)
+        return self._insert(i, element, anchor._parent)
+
+    def insert_after(self, i: int, element) -> Paragraph:
+        """Вставляет XML-элемент абзаца после абзаца i"""
+        anchor = self.paragraphs[i]
+        anchor._element.addnext(element)
+        return self._insert(i + 1, element, anchor._parent)
+
+
+def _ensure_index(doc: Document, index: Optional[StatementIndex]) -> StatementIndex:
+    """Возвращает переданный индекс или строит новый"""
+    return index if index is not None else StatementIndex(doc)
+
+
+def snapshot_body(doc: Document) -> tuple:
+    """
+    Снимок тела документа в памяти: глубокая копия XML body и идентификаторы связей основной части.
+    Используется для отката шага обработки без сохранения на диск.
+    """
+    return deepcopy(doc.element.body), frozenset(doc.part.rels)
+
+
+def restore_body(doc: Document, snapshot: tuple, index: Optional[StatementIndex] = None) -> None:
+    """
+    Откатывает тело документа к снимку из snapshot_body.
+    Элемент body остаётся тем же, меняется только его содержимое. Связи, добавленные после снимка
+    (например рисунок подписи), удаляются — их части не попадут в сохраненный файл.
+    Остальные части пакета (стили, нумерация) не откатываются.
+
+    :param index: Индекс документа — перестраивается, старые абзацы в нем после отката недействительны
+    """
+    body_copy, rel_ids = snapshot
+    body = doc.element.body
+    for child in list(body):
+        body.remove(child)
+    for child in deepcopy(body_copy):
+        body.append(child)
+    for r_id in set(doc.part.rels) - rel_ids:
+        doc.part.rels.pop(r_id)
+    if index is not None:
+        index.rebuild()
+
+
 def _extract_after_label(doc: Document, label: str) -> Optional[str]:
     """
     Поиск метки (label) и возвращение текста следующего абзаца после неё
@@ -82,227 +242,251 @@ def extract_case_number(doc: Document) -> Optional[str]:
     return None
 
 
-def format_header(doc: Document) -> None:
+def format_header(doc: Document, index: Optional[StatementIndex] = None) -> None:
     """Форматирование шапки документа"""
-    paras = doc.paragraphs
+    index = _ensure_index(doc, index)
 
     idx_statement = None
-    for i, para in enumerate(paras):
-        if 'ЗАЯВЛЕНИЕ' == para.text.upper():
+    for i, text in enumerate(index.texts):
+        if 'ЗАЯВЛЕНИЕ' == text.upper():
             idx_statement = i
             break
 
     if idx_statement is None:
         return
 
-    for para in paras[2:idx_statement]:  # форматируем абзацы с 3-го до найденного
+    for para in index.paragraphs[2:idx_statement]:  # форматируем абзацы с 3-го до найденного
         fmt = para.paragraph_format
         fmt.left_indent = Cm(8)
 
 
-def delete_words_in_obyazatelstvo(doc: Document, targets: list[str]) -> None:
+def delete_words_in_obyazatelstvo(doc: Document, targets: list[str], index: Optional[StatementIndex] = None) -> None:
     """
     Удаляет слова/фразы из документа только в диапазоне
     от "Обязательство №" до "ПРОСИТ СУД:".
     При этом сбрасывает форматирование текста, но сохраняет
     размер шрифта и выставляет Times New Roman.
     """
-    start_found = False
-
-    for para in doc.paragraphs:
-        text = para.text.strip()
+    index = _ensure_index(doc, index)
+    section = index.section(OBYAZATELSTVO_MARK, PROSIT_SUD_MARK)
+    if section is None:
+        return
 
-        if 'Обязательство №' in text:
-            start_found = True
+    matcher = get_matcher(targets)
+    for i in section:
+        text = index.texts[i]
+        if OBYAZATELSTVO_MARK in text:
             continue
 
-        if start_found and 'ПРОСИТ СУД:' in text:
-            break
+        if matcher.search(text):
+            index.set_text(i, matcher.remove(text))
 
-        if start_found and any(target in para.text for target in targets):
-            new_text = para.text
-            for target in targets:
-                new_text = new_text.replace(target, '')
-            para.text = new_text
+            _force_font_size(index.paragraphs[i])
 
-            _force_font_size(para)
 
-
-def delete_paragraphs_in_obyazatelstvo(doc: Document, targets: list[str]) -> None:
+def delete_paragraphs_in_obyazatelstvo(
+    doc: Document, targets: list[str], index: Optional[StatementIndex] = None
+) -> None:
     """
     Удаляет целиком абзацы, содержащие слова/фразы из targets,
     но только в диапазоне от абзаца с "Обязательство №"
     до абзаца с "ПРОСИТ СУД:" (не включая его)
     """
-    start_found = False
-
-    for para in list(doc.paragraphs):
-        text = para.text.strip()
+    index = _ensure_index(doc, index)
+    section = index.section(OBYAZATELSTVO_MARK, PROSIT_SUD_MARK)
+    if section is None:
+        return
 
-        if 'Обязательство №' in text:
-            start_found = True
+    matcher = get_matcher(targets)
+    to_remove = []
+    for i in section:
+        text = index.texts[i]
+        if OBYAZATELSTVO_MARK in text:
             continue
 
-        if start_found and 'ПРОСИТ СУД:' in text:
-            break
+        if matcher.search(text):
+            to_remove.append(i)
 
-        if start_found and any(target in para.text for target in targets):
-            p_element = para._element
-            p_element.getparent().remove(p_element)
+    index.remove(to_remove)
 
 
-def delete_paragraphs_in_gosposhlina(doc: Document, targets: list[str]) -> None:
+def delete_paragraphs_in_gosposhlina(doc: Document, targets: list[str], index: Optional[StatementIndex] = None) -> None:
     """Удаляет целиком абзацы, содержащие слова/фразы из targets,
     но только в диапазоне от абзаца с "ПРОСИТ СУД:"
-    до абзаца с "ПРИЛОЖЕНИЧ:" (не включая его)"""
-    start_found = False
-
-    paragraphs = list(doc.paragraphs)
-    for idx, para in enumerate(paragraphs):
-        text = para.text.strip()
+    до абзаца с "ПРИЛОЖЕНИЯ:" (не включая его)"""
+    index = _ensure_index(doc, index)
+    section = index.section(PROSIT_SUD_MARK, APPENDICES_MARK)
+    if section is None:
+        return
 
-        if 'ПРОСИТ СУД:' in text:
-            start_found = True
+    matcher = get_matcher(targets)
+    to_remove = set()
+    for i in section:
+        text = index.texts[i]
+        if PROSIT_SUD_MARK in text:
             continue
 
-        if start_found and 'ПРИЛОЖЕНИЯ:' in text:
-            break
+        if matcher.search(text):
+            to_remove.add(i)
+            if i > 0:  # удаляем предыдущий абзац(пустая строка), если он существует
+                to_remove.add(i - 1)
 
-        if start_found and any(target in para.text for target in targets):
-            p_element = para._element
-            p_element.getparent().remove(p_element)
+    index.remove(to_remove)
 
-            if idx > 0:  # удаляем предыдущий абзац(пустая строка), если он существует
-                prev_para = paragraphs[idx - 1]
-                prev_el = prev_para._element
-                if prev_el.getparent() is not None:  # чтобы не упасть, если уже удалён
-                    prev_el.getparent().remove(prev_el)
 
+_NUMBER_PREFIX = re.compile(r'^\d+\.')  # Номер пункта списка: '1.', '12.'
 
-def insert_gosposhlina(doc: Document, template: Document):
+
+def insert_gosposhlina(doc: Document, template: Document, index: Optional[StatementIndex] = None):
     """
     Вставляет в судебную часть вставку про оплату госпошлины.
     Берет ФИО из судебной части.
     Следующие пункты увеличивает на +1.
     """
-    start_found = False
-    inserted = False
+    index = _ensure_index(doc, index)
+    section = index.section(PROSIT_SUD_MARK, APPENDICES_MARK)
+    if section is None:
+        return
+
     fio_debtor = ''
+    start_idx = None
 
-    for idx, para in enumerate(doc.paragraphs):
-        text = para.text.strip()
+    for idx in section:
+        text = index.texts[idx].strip()
+        if PROSIT_SUD_MARK in text:
+            continue
+
+        if text.startswith('1.'):  # Находим параграф с "1." чтобы взять ФИО
+            text_1 = index.texts[idx]
+            start = text_1.find('кредиторов')
+            end = text_1.find('в размере')
+            if start != -1 and end != -1:  # Ищем ФИО между "кредиторов" и "в размере"
+                fio_debtor = text_1[start + len('кредиторов') : end].strip()
+                continue
 
-        if 'ПРОСИТ СУД:' in text:
-            start_found = True
+        if _NUMBER_PREFIX.match(text):
+            # --- вставка 1-го параграфа шаблона (Пункт про Госпошлину) ---
+            para_to_copy = template.paragraphs[0]
+            p_xml = para_to_copy._p.xml.replace('ФИО', fio_debtor)
+            new_para = index.insert_before(idx, parse_xml(p_xml))
+            _force_font_size(new_para, size=11)
+
+            # --- вставка 2-го параграфа шаблона (абзац с размером Pt5 - пустая строка) ---
+            para_to_copy2 = template.paragraphs[1]
+            new_para2 = index.insert_after(idx, parse_xml(para_to_copy2._p.xml))
+            _force_font_size(new_para2, size=5)
+
+            start_idx = idx + 1  # С пустой строки после вставки продолжаем изменение нумерации
+            break
+
+    if start_idx is None:
+        return
+
+    # Увеличиваем номера следующих пунктов
+    renumber_list(index, start_idx, first_number=3, stop='ПРИЛОЖЕНИЯ', style_number=_style_gosposhlina_number)
+
+
+def _style_gosposhlina_number(run) -> None:
+    """Оформление номера пункта в ПРОСИТ СУД"""
+    run.font.name = 'Times New Roman'
+    run.font.size = Pt(11)
+    run.font.bold = True
+
+
+def renumber_list(
+    index: StatementIndex,
+    start: int,
+    first_number: int = 1,
+    stop: Optional[str] = None,
+    style_number: Optional[Callable] = None,
+) -> int:
+    """
+    Перенумеровывает пункты вида "N." за один проход по абзацам, начиная с start.
+    Проход заканчивается на абзаце, текст которого начинается с stop, или в конце документа.
+    Старый номер вырезается из runs на месте, текст и оформление остальных runs не меняются.
+    Новый номер ставится отдельным run с оформлением первого run абзаца
+    либо оформляется через style_number(run).
+
+    :param index: Индекс документа
+    :param start: Индекс абзаца, с которого начинается перенумерация
+    :param first_number: Номер первого найденного пункта
+    :param stop: Префикс абзаца, на котором перенумерация заканчивается
+    :param style_number: Функция оформления run с новым номером
+    :return: Номер, который получил бы следующий пункт
+    """
+    current_number = first_number
+    for i in range(start, len(index)):
+        text = index.texts[i].strip()
+        if stop and text.startswith(stop):
+            break
+
+        if not _NUMBER_PREFIX.match(text):
             continue
 
-        if start_found and 'ПРИЛОЖЕНИЯ:' in text:
+        para = index.paragraphs[i]
+        runs = para.runs
+        number_el = deepcopy(runs[0]._element)  # новый run с оформлением первого run
+
+        # Вырезаем старый номер: runs до точки удаляются, в run с точкой остаётся текст после неё
+        for run in runs:
+            dot_idx = run.text.find('.')
+            if dot_idx == -1:
+                run._element.getparent().remove(run._element)
+                continue
+            run.text = run.text[dot_idx + 1 :]
             break
 
-        if start_found and not inserted:
-            if text.startswith('1.'):  # Находим параграф с "1." чтобы взять ФИО
-                text_1 = para.text
-                start = text_1.find('кредиторов')
-                end = text_1.find('в размере')
-                if start != -1 and end != -1:  # Ищем ФИО между "кредиторов" и "в размере"
-                    fio_debtor = text_1[start + len('кредиторов') : end].strip()
-                    continue
-
-            if text and text[0].isdigit() and text[1] == '.':
-                # --- вставка 1-го параграфа шаблона (Пункт про Госпошлину) ---
-                para_to_copy = template.paragraphs[0]
-                p_xml = para_to_copy._p.xml.replace('ФИО', fio_debtor)
-                e = parse_xml(p_xml)
-                para._element.addprevious(e)
-                new_para = Paragraph(e, para._parent)
-                _force_font_size(new_para, size=11)
-
-                # --- вставка 2-го параграфа шаблона (абзац с размером Pt5 - пустая строка) ---
-                para_to_copy2 = template.paragraphs[1]
-                p_xml2 = para_to_copy2._p.xml
-                e2 = parse_xml(p_xml2)
-                new_para._element.addnext(e2)
-                new_para2 = Paragraph(e2, para._parent)
-                _force_font_size(new_para2, size=5)
-
-                inserted = True
-                start_idx = idx + 1  # Продолжаем с текущего индекса для изменения нумерации
-
-        # Если вставили, идём дальше и увеличиваем номера
-        if start_found and inserted:
-            current_number = 3
-            for para in doc.paragraphs[start_idx:]:
-                text = para.text.strip()
-                if text.startswith('ПРИЛОЖЕНИЯ'):
-                    break
+        first_el = para._p.r_lst[0] if para._p.r_lst else None
+        if first_el is not None:
+            first_el.addprevious(number_el)
+        else:
+            para._p.append(number_el)
 
-                if len(text) > 1 and text[0].isdigit() and text[1] == '.':
-                    # Сохраняем run, удаляя первую цифру с точкой
-                    original_runs = []
-                    first_run_skipped = False
-                    for r in para.runs:
-                        r_text = r.text
-                        if not first_run_skipped:
-                            # Ищем позицию точки после цифры
-                            dot_idx = r_text.find('.')
-                            if dot_idx != -1:
-                                r_text = r_text[dot_idx + 1 :]  # убираем цифру и точку
-                                first_run_skipped = True
-                            else:
-                                # весь run игнорируем, если точка ещё не найдена
-                                continue
-                        # Создаём новый run XML с обрезанным текстом
-                        new_r = deepcopy(r._element)
-                        new_r.text = r_text  # устанавливаем обрезанный текст
-                        original_runs.append(new_r)
-
-                    # Очищаем абзац
-                    para.clear()
-
-                    # Новый run для номера
-                    run_num = para.add_run(f'{current_number}.')
-                    run_num.font.name = 'Times New Roman'
-                    run_num.font.size = Pt(11)
-                    run_num.font.bold = True
-
-                    # Вставляем оставшиеся run
-                    for r_element in original_runs:
-                        para._element.append(deepcopy(r_element))
-
-                    current_number += 1
-
-
-def delete_paragraphs_in_appendices(doc: Document, targets: list[str]) -> None:
+        run_num = Run(number_el, para)
+        run_num.text = f'{current_number}.'
+        if style_number:
+            style_number(run_num)
+
+        index.refresh(i)
+        current_number += 1
+
+    return current_number
+
+
+def delete_paragraphs_in_appendices(doc: Document, targets: list[str], index: Optional[StatementIndex] = None) -> None:
     """
     Удаляет целиком абзацы, содержащие слова/фразы из targets,
     но только в диапазоне от абзаца с "ПРИЛОЖЕНИЯ:"
     до абзаца с "Реквизиты ПАО Сбербанк" (не включая его)
     """
-    start_found = False
-
-    for para in list(doc.paragraphs):
-        text = para.text.strip()
+    index = _ensure_index(doc, index)
+    section = index.section(APPENDICES_MARK, REQUISITES_MARK)
+    if section is None:
+        return
 
-        if 'ПРИЛОЖЕНИЯ:' in text:
-            start_found = True
+    matcher = get_matcher(targets)
+    to_remove = []
+    for i in section:
+        text = index.texts[i]
+        if APPENDICES_MARK in text:
             continue
 
-        if start_found and 'Реквизиты ПАО Сбербанк' in text:
-            break
+        if matcher.search(text):
+            to_remove.append(i)
 
-        if start_found and any(target in para.text for target in targets):
-            p_element = para._element
-            p_element.getparent().remove(p_element)
+    index.remove(to_remove)
 
 
-def format_appendices(doc: Document) -> None:
+def format_appendices(doc: Document, index: Optional[StatementIndex] = None) -> None:
     """
     Форматирует блок "ПРИЛОЖЕНИЯ:" в документе как нумерованный список.
     Убирает старые цифры перед созданием формата списка.
     """
+    index = _ensure_index(doc, index)
+
     appendices_start = None
-    for i, para in enumerate(doc.paragraphs):
-        if para.text.strip().upper() == 'ПРИЛОЖЕНИЯ:' and any(run.bold for run in para.runs):
+    for i, text in enumerate(index.texts):
+        if text.strip().upper() == 'ПРИЛОЖЕНИЯ:' and any(run.bold for run in index.paragraphs[i].runs):
             appendices_start = i + 1
             break
 
@@ -311,12 +495,13 @@ def format_appendices(doc: Document) -> None:
 
     num_id = 1  # id нумерации Word, можно оставить 1 для простого случая
 
-    for para in doc.paragraphs[appendices_start:]:
-        text = para.text.strip()
+    for i in range(appendices_start, len(index)):
+        para = index.paragraphs[i]
+        text = index.texts[i].strip()
         if text and re.match(r'^\d+\.\s+', text):
             run_formats = [(run.font.name, run.font.size, run.font.bold, run.font.italic) for run in para.runs]
 
-            para.text = re.sub(r'^\d+\.\s+', '', text)
+            index.set_text(i, re.sub(r'^\d+\.\s+', '', text))
 
             p = para._p
             pPr = p.get_or_add_pPr()
@@ -341,14 +526,19 @@ def format_appendices(doc: Document) -> None:
             break
 
 
-def insert_bank_table(doc_statement: Document, doc_requisities: Document, bank_name: str):
+def insert_bank_table(
+    doc_statement: Document, doc_requisities: Document, bank_name: str, index: Optional[StatementIndex] = None
+):
     """
     Вставляет таблицу с реквизитами нужного банка в заявление.
 
-    :param statement_path: Путь к заявлению
-    :param path_banks_file: Путь к файлу с реквизитами банков
+    :param doc_statement: Заявление
+    :param doc_requisities: Документ с реквизитами банков
     :param bank_name: Название банка, чьи реквизиты нужно вставить
+    :param index: Индекс заявления
     """
+    index = _ensure_index(doc_statement, index)
+
     # --- Находим таблицу нужного банка ---
     target_table: Table | None = None
     for table in doc_requisities.tables:
@@ -367,13 +557,15 @@ def insert_bank_table(doc_statement: Document, doc_requisities: Document, bank_n
 
     # --- Находим таблицу в заявлении ---
     stmt_table: Table | None = None
-    for idx, para in enumerate(doc_statement.paragraphs):
-        if para.text.startswith('Реквизиты ПАО Сбербанк для погашения задолженности'):
-            for child in doc_statement.element.body[idx + 1 :]:
-                if child.tag.endswith('tbl'):  # ищем первую таблицу после параграфа
+    idx = index.find(REQUISITES_MARK)
+    while idx is not None:
+        if index.texts[idx].startswith('Реквизиты ПАО Сбербанк для погашения задолженности'):
+            for child in index.paragraphs[idx]._element.itersiblings():
+                if child.tag == qn('w:tbl'):  # ищем первую таблицу после параграфа
                     stmt_table = Table(child, doc_statement)
                     break
             break
+        idx = index.find(REQUISITES_MARK, idx + 1)
 
     if stmt_table is None:
         raise ValueError('Таблица для вставки реквизитов в заявлении не найдена')
@@ -410,43 +602,39 @@ def get_bank_list(doc: Document) -> list[str]:
     return banks
 
 
-def insert_signature(doc: Document, signa_path: Path):
+def insert_signature(doc: Document, signa_path: Path, index: Optional[StatementIndex] = None):
     """
     Добавляет подпись в самый последний абзац документа и центрирует её.
 
     :param doc: Document - объект python-docx
     :param signa_path: Path - путь к картинке подписи
-    :param width_cm: ширина подписи в сантиметрах (по умолчанию 5 см)
+    :param index: Индекс заявления
     """
-    last_paragraph = doc.paragraphs[-1]  # Берём последний абзац
+    index = _ensure_index(doc, index)
+    last_paragraph = index.paragraphs[-1]  # Берём последний абзац
     last_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER  # Центрируем абзац
 
     run = last_paragraph.add_run()  # Вставляем подпись
     run.add_picture(str(signa_path), width=Cm(3))
 
 
-def insert_zalog_contacts(doc: Document, template: Document):
+def insert_zalog_contacts(doc: Document, template: Document, index: Optional[StatementIndex] = None):
     """
     Вставляет залоговые контакты из шаблона в документ после абзаца,
     который содержит текст 'Электронный адрес: Bankrot_FL@sberbank.ru'
     Если в документе уже есть контакты, то не будет вставлять.
     """
+    index = _ensure_index(doc, index)
     target_text = 'Электронный адрес: Bankrot_FL@sberbank.ru'
     template_para_text = template.paragraphs[0].text.strip()
 
-    for para in doc.paragraphs:  # Проверяем, есть ли уже такой параграф после target_text
-        if template_para_text in para.text:
-            return
+    if index.find(template_para_text) is not None:  # Проверяем, есть ли уже такой параграф
+        return
 
-    for para in doc.paragraphs:  # Ищем абзац с target_text
-        if target_text in para.text:
-            para_to_copy = template.paragraphs[0]
-            p_xml = para_to_copy._p.xml
-            e = parse_xml(p_xml)
-            para._element.addnext(e)
-            new_para = Paragraph(e, para._parent)
-            _force_font_size(new_para, size=11)
-            break
+    idx = index.find(target_text)  # Ищем абзац с target_text
+    if idx is not None:
+        new_para = index.insert_after(idx, parse_xml(template.paragraphs[0]._p.xml))
+        _force_font_size(new_para, size=11)
 
 
 if __name__ == '__main__':
@@ -1,12 +1,25 @@
+import errno
+import io
+import mmap
 import os
 import re
 import shutil
+import subprocess
+import threading
+import time
 import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext, suppress
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 import rarfile
 
+RTK_DOC_PATTERN = 'Заявление на включение требований*.docx'
+DOSSIER_ARCHIVE_PATTERN = 'Досье по банкротству*.zip'
+
 
 def _safe_path(path: Path) -> str:
     """
@@ -33,8 +46,7 @@ def find_rtk_doc(folder: str | Path) -> Path:
     if not folder.exists() or not folder.is_dir():
         raise NotADirectoryError(f'Папка {folder} не существует')
 
-    pattern = 'Заявление на включение требований*.docx'
-    files = list(folder.glob(pattern))  # только текущая папка
+    files = list(folder.glob(RTK_DOC_PATTERN))  # только текущая папка
 
     if not files:
         raise FileNotFoundError("Документ 'Заявление на включение в требований' не найден")
@@ -58,8 +70,7 @@ def find_dossier_archive(folder: str | Path) -> Path:
     if not folder.exists() or not folder.is_dir():
         raise NotADirectoryError(f'Папка {folder} не существует')
 
-    pattern = 'Досье по банкротству*.zip'
-    files = list(folder.glob(pattern))  # только текущая папка
+    files = list(folder.glob(DOSSIER_ARCHIVE_PATTERN))  # только текущая папка
 
     if not files:
         raise FileNotFoundError("Архив 'Досье по банкротству' не найден")
@@ -96,9 +107,312 @@ def find_dossier_no_statement_folder(folder: str | Path, case_number: str) -> Pa
     return Path(_safe_path(folders[0]))
 
 
-def unzip_archive(archive_path: str | Path, extract_to: Optional[str | Path] = None) -> Path:
+EXTRACT_BUFFER_SIZE = 1024 * 1024  # Размер буфера копирования при распаковке (1 МБ)
+PROGRESS_INTERVAL = 0.5  # Минимальный интервал между вызовами progress, сек
+
+
+@dataclass
+class ExtractProgress:
+    """Прогресс распаковки архива"""
+
+    files_done: int
+    files_total: int
+    bytes_done: int
+    bytes_total: int
+    elapsed: float
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.bytes_done / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class _MappedFile(io.RawIOBase):
+    """Файловый объект поверх mmap для чтения архива без копирования в память процесса"""
+
+    def __init__(self, mm: mmap.mmap):
+        super().__init__()
+        self._mm = mm
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        return self._mm.read(None if size is None or size < 0 else size)
+
+    def readinto(self, buffer) -> int:
+        data = self._mm.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        try:
+            self._mm.seek(offset, whence)
+        except ValueError as e:  # zipfile ожидает OSError, как у обычного файла
+            raise OSError(str(e)) from e
+        return self._mm.tell()
+
+    def tell(self) -> int:
+        return self._mm.tell()
+
+    def close(self) -> None:
+        if not self.closed:
+            self._mm.close()
+        super().close()
+
+
+@contextmanager
+def _open_archive_file(archive_str: str):
+    """
+    Открывает локальный архив через mmap.
+    Если отобразить файл нельзя (пустой файл, сетевой путь и т.п.), возвращает обычный файл.
+    """
+    with open(archive_str, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            yield f
+            return
+        with _MappedFile(mm) as mapped:
+            yield mapped
+
+
+def _zip_member_path(extract_str: str, filename: str) -> str:
+    """Безопасный путь распаковки элемента ZIP (как в zipfile.ZipFile.extract)"""
+    arcname = filename.replace('/', os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    invalid_path_parts = ('', os.path.curdir, os.path.pardir)
+    arcname = os.path.sep.join(x for x in arcname.split(os.path.sep) if x not in invalid_path_parts)
+    if os.path.sep == '\\':
+        arcname = zipfile.ZipFile._sanitize_windows_name(arcname, os.path.sep)
+    return os.path.join(extract_str, arcname)
+
+
+def _extract_zip(
+    archive_str: str, extract_str: str, progress: Optional[Callable[[ExtractProgress], None]] = None
+) -> list[str]:
+    """
+    Распаковка ZIP целиком по центральному каталогу.
+    Сначала создаются все папки, затем каждый файл потоково копируется буфером EXTRACT_BUFFER_SIZE,
+    поэтому расход памяти не зависит от размера элементов архива.
+
+    :return: Пути распакованных файлов
+    """
+    started = time.perf_counter()
+    written = []
+
+    with _open_archive_file(archive_str) as fp, zipfile.ZipFile(fp, 'r') as zip_ref:
+        members = []
+        folders = set()
+        for info in zip_ref.infolist():
+            target = _zip_member_path(extract_str, info.filename)
+            if info.is_dir():
+                folders.add(target)
+            else:
+                folders.add(os.path.dirname(target))
+                members.append((info, target))
+
+        for folder in sorted(folders):
+            os.makedirs(folder, exist_ok=True)
+
+        bytes_total = sum(info.file_size for info, _ in members)
+        bytes_done = 0
+        last_report = started
+
+        for files_done, (info, target) in enumerate(members, start=1):
+            try:
+                with zip_ref.open(info) as src, open(target, 'wb') as dst:
+                    while chunk := src.read(EXTRACT_BUFFER_SIZE):
+                        dst.write(chunk)
+                        bytes_done += len(chunk)
+                        now = time.perf_counter()
+                        if progress and now - last_report >= PROGRESS_INTERVAL:
+                            last_report = now
+                            progress(
+                                ExtractProgress(files_done - 1, len(members), bytes_done, bytes_total, now - started)
+                            )
+            except Exception as e:
+                raise RuntimeError(f'Ошибка при распаковке {info.filename}: {e}') from e
+            written.append(target)
+
+        if progress:
+            progress(
+                ExtractProgress(len(members), len(members), bytes_done, bytes_total, time.perf_counter() - started)
+            )
+
+    return written
+
+
+RAR_TOOL_TIMEOUT = 600  # Максимальное время работы внешней утилиты распаковки RAR, сек
+
+
+@dataclass
+class RarBackend:
+    """
+    Способ распаковки RAR целиком за один вызов.
+
+    :param name: Название для логов
+    :param is_available: Проверка наличия утилиты или библиотеки
+    :param extract: Распаковка (архив, папка назначения), при ошибке выбрасывает исключение
+    """
+
+    name: str
+    is_available: Callable[[], bool]
+    extract: Callable[[str, str], None]
+
+
+def _run_rar_tool(args: list[str]) -> None:
+    """Запуск внешней утилиты распаковки, ненулевой код возврата — ошибка"""
+    env = None
+    if os.name != 'nt':  # bsdtar не распаковывает кириллические имена в локали POSIX
+        env = {**os.environ, 'LC_ALL': 'C.UTF-8'}
+    result = subprocess.run(args, capture_output=True, env=env, timeout=RAR_TOOL_TIMEOUT)
+    if result.returncode != 0:
+        message = result.stderr.decode(errors='replace').strip() or f'код возврата {result.returncode}'
+        raise RuntimeError(f'{os.path.basename(args[0])}: {message}')
+
+
+def _which(*names: str) -> Optional[str]:
+    for name in names:
+        tool = shutil.which(name)
+        if tool:
+            return tool
+    return None
+
+
+def _extract_unrar(archive_str: str, extract_str: str) -> None:
+    _run_rar_tool([_which('unrar'), 'x', '-y', '-o+', '-idq', archive_str, extract_str + os.path.sep])
+
+
+def _extract_7z(archive_str: str, extract_str: str) -> None:
+    _run_rar_tool([_which('7z', '7zz', '7za'), 'x', '-y', f'-o{extract_str}', archive_str])
+
+
+def _extract_bsdtar(archive_str: str, extract_str: str) -> None:
+    _run_rar_tool([_which('bsdtar'), '-x', '-f', archive_str, '-C', extract_str])
+
+
+def _libarchive_available() -> bool:
+    try:
+        import libarchive  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _extract_libarchive(archive_str: str, extract_str: str) -> None:
+    """
+    Распаковка через привязки libarchive (python-libarchive-c).
+    libarchive.extract_file пишет в текущую папку процесса, а распаковка идёт из нескольких потоков,
+    поэтому элементы записываются вручную.
+    """
+    import libarchive
+
+    with libarchive.file_reader(archive_str) as archive:
+        for entry in archive:
+            target = os.path.join(extract_str, rarfile.sanitize_filename(entry.pathname, os.path.sep, rarfile.WIN32))
+            if entry.isdir:
+                os.makedirs(target, exist_ok=True)
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as dst:
+                for block in entry.get_blocks():
+                    dst.write(block)
+
+
+# Порядок — приоритет выбора: первый доступный используется для всех RAR
+_RAR_BACKENDS: list[RarBackend] = [
+    RarBackend('unrar', lambda: _which('unrar') is not None, _extract_unrar),
+    RarBackend('7z', lambda: _which('7z', '7zz', '7za') is not None, _extract_7z),
+    RarBackend('libarchive', _libarchive_available, _extract_libarchive),
+    RarBackend('bsdtar', lambda: _which('bsdtar') is not None, _extract_bsdtar),
+]
+
+
+def register_rar_backend(backend: RarBackend, first: bool = True) -> None:
+    """Добавляет способ распаковки RAR (по умолчанию с наивысшим приоритетом)"""
+    if first:
+        _RAR_BACKENDS.insert(0, backend)
+    else:
+        _RAR_BACKENDS.append(backend)
+    _select_rar_backend.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def _select_rar_backend() -> Optional[RarBackend]:
+    """Первый доступный способ распаковки RAR целиком или None"""
+    for backend in _RAR_BACKENDS:
+        try:
+            if backend.is_available():
+                return backend
+        except Exception:
+            continue
+    return None
+
+
+def _has_size(path: str, size: int) -> bool:
+    """Файл существует и имеет указанный размер"""
+    try:
+        return os.stat(path).st_size == size
+    except OSError:
+        return False
+
+
+def _extract_rar(archive_str: str, extract_str: str) -> list[str]:
+    """
+    Распаковка RAR одним вызовом выбранного RarBackend вместо запуска unrar на каждый элемент.
+    Если способа нет или он завершился ошибкой, все элементы распаковываются заново по одному через rarfile
+    (файлы, которые способ успел записать, могут быть недописаны) — с прежним сообщением об ошибке
+    для конкретного файла. После успешного вызова через rarfile распаковываются только элементы,
+    которых нет или размер которых не совпадает с размером в архиве; контрольные суммы проверяет сам способ.
+
+    :return: Пути распакованных файлов
+    """
+    with rarfile.RarFile(archive_str) as rar_ref:
+        infos = rar_ref.infolist()
+        targets = {
+            info.filename: os.path.join(
+                extract_str, rarfile.sanitize_filename(info.filename, os.path.sep, rarfile.WIN32)
+            )
+            for info in infos
+        }
+        written = [targets[info.filename] for info in infos if not info.is_dir()]
+
+        backend = _select_rar_backend()
+        if backend is not None and not rar_ref.needs_password():
+            try:
+                backend.extract(archive_str, extract_str)
+            except Exception:
+                pass  # всё распакуется заново по одному ниже
+            else:
+                infos = [
+                    info
+                    for info in infos
+                    if not info.is_dir() and not _has_size(targets[info.filename], info.file_size)
+                ]
+
+        for info in infos:
+            try:
+                rar_ref.extract(info, extract_str)
+            except Exception as e:
+                raise RuntimeError(f'Ошибка при распаковке {info.filename}: {e}') from e
+
+    return written
+
+
+def unzip_archive(
+    archive_path: str | Path,
+    extract_to: Optional[str | Path] = None,
+    progress: Optional[Callable[[ExtractProgress], None]] = None,
+) -> Path:
     """
     Безопасная распаковка ZIP или RAR архива с учётом Windows длинных путей.
+
+    :param progress: Вызывается с ExtractProgress по ходу распаковки ZIP
     """
     archive_path = Path(archive_path)
 
@@ -111,57 +425,115 @@ def unzip_archive(archive_path: str | Path, extract_to: Optional[str | Path] = N
         extract_to = Path(extract_to)
 
     extract_to.mkdir(parents=True, exist_ok=True)
+    _unpack(archive_path, extract_to, progress)
+    return extract_to
+
 
+def _unpack(
+    archive_path: Path, extract_to: Path, progress: Optional[Callable[[ExtractProgress], None]] = None
+) -> list[str]:
+    """
+    Распаковка архива в существующую папку.
+    :return: Пути распакованных файлов
+    """
     suffix = archive_path.suffix.lower()
 
     archive_str = _safe_path(archive_path)
     extract_str = _safe_path(extract_to)
 
     if suffix == '.zip':
-        with zipfile.ZipFile(archive_str, 'r') as zip_ref:
-            for member in zip_ref.namelist():
-                try:
-                    zip_ref.extract(member, extract_str)
-                except Exception as e:
-                    raise RuntimeError(f'Ошибка при распаковке {member}: {e}') from e
+        return _extract_zip(archive_str, extract_str, progress)
     elif suffix == '.rar':
-        with rarfile.RarFile(archive_str) as rar_ref:
-            for member in rar_ref.namelist():
-                try:
-                    rar_ref.extract(member, extract_str)
-                except Exception as e:
-                    raise RuntimeError(f'Ошибка при распаковке {member}: {e}') from e
+        return _extract_rar(archive_str, extract_str)
     else:
         raise ValueError(f'Неподдерживаемый формат архива: {archive_path.suffix}')
 
-    return extract_to
 
+ARCHIVE_SUFFIXES = ('.zip', '.rar')
+MAX_NESTING_DEPTH = 10  # Максимальная глубина вложенности архивов
+NESTED_EXTRACT_WORKERS = 4  # Потоков для распаковки вложенных архивов
 
-def unzip_all_nested_archives(folder: str | Path) -> None:
+
+def _is_archive(path: str | Path) -> bool:
+    return os.path.splitext(str(path))[1].lower() in ARCHIVE_SUFFIXES
+
+
+def unzip_all_nested_archives(
+    folder: str | Path,
+    max_depth: int = MAX_NESTING_DEPTH,
+    delete_archives: bool = False,
+    max_workers: int = NESTED_EXTRACT_WORKERS,
+) -> int:
     """
-    Рекурсивно разархивирует все ZIP и RAR файлы в папке.
+    Разархивирует все ZIP и RAR файлы в папке, включая вложенные.
     Каждый архив распаковывается в подпапку с именем архива.
+    Папка сканируется один раз до начала распаковки, новые архивы берутся из списка файлов,
+    записанных при распаковке, и ставятся в очередь. Независимые архивы распаковываются параллельно на пуле потоков,
+    каждый архив обрабатывается ровно один раз.
+
+    :param max_depth: Архивы глубже этого уровня вложенности не распаковываются
+    :param delete_archives: Удалять архив после распаковки
+    :param max_workers: Количество потоков
+    :return: Количество распакованных файлов
     Бросает RuntimeError при ошибках распаковки конкретного файла.
     """
     folder = Path(folder)
+    folder_str = _safe_path(folder)
 
-    for archive_file in folder.rglob('*'):
-        if archive_file.suffix.lower() not in ('.zip', '.rar'):
-            continue  # Ищем только ZIP и RAR
+    seen: set[str] = set()
+    files_written = 0
+    dest_locks: dict[str, threading.Lock] = {}
+    locks_guard = threading.Lock()
 
+    def _extract_one(archive_str: str) -> list[str]:
+        archive_file = Path(archive_str)
         extract_to = archive_file.parent / archive_file.stem
-        extract_to.mkdir(parents=True, exist_ok=True)
+        with locks_guard:  # архивы с одинаковой папкой назначения (a.zip и a.rar) распаковываются по очереди
+            dest_lock = dest_locks.setdefault(os.path.normcase(str(extract_to)), threading.Lock())
+        with dest_lock:
+            extract_to.mkdir(parents=True, exist_ok=True)
+            written = _unpack(archive_file, extract_to)
+        if delete_archives:
+            os.remove(archive_str)
+        return written
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+
+        def _submit(archive_str: str, depth: int) -> None:
+            key = os.path.normcase(os.path.abspath(archive_str))
+            if depth > max_depth or key in seen:
+                return
+            seen.add(key)
+            pending[executor.submit(_extract_one, archive_str)] = (archive_str, depth)
+
+        # Сначала весь обход: иначе os.walk увидит файлы, которые уже распаковываются, в том числе недописанные
+        archives = [
+            os.path.join(dirpath, name)
+            for dirpath, _, filenames in os.walk(folder_str)
+            for name in filenames
+            if _is_archive(name)
+        ]
+        for archive_str in archives:
+            _submit(archive_str, 1)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                archive_str, depth = pending.pop(future)
+                try:
+                    written = future.result()
+                except Exception as e:
+                    for other in pending:
+                        other.cancel()
+                    raise RuntimeError(f'Ошибка при распаковке архива {archive_str}: {e}') from e
 
-        try:
-            unzip_archive(archive_file, extract_to)
-        except Exception as e:
-            raise RuntimeError(f'Ошибка при распаковке архива {archive_file}: {e}') from e
+                files_written += len(written)
+                for path in written:  # вложенные архивы из только что распакованных файлов
+                    if _is_archive(path):
+                        _submit(path, depth + 1)
 
-        # Рекурсивно проверяем новую папку на вложенные архивы
-        try:
-            unzip_all_nested_archives(extract_to)
-        except Exception as e:
-            raise RuntimeError(f'Ошибка при рекурсивной распаковке {extract_to}: {e}') from e
+    return files_written
 
 
 def delete_file(path: str | Path) -> None:
@@ -253,11 +625,273 @@ def copy_file(src: str | Path, dst: str | Path) -> Path:
     return dst
 
 
-def copy_folder(src: str | Path, dst: str | Path) -> Path:
+MATERIALIZE_MODES = ('auto', 'reflink', 'hardlink', 'symlink', 'copy')
+COPY_WORKERS = 8  # Потоков копирования файлов (на сетевых папках время уходит на задержку каждого файла)
+COPY_CHUNK_SIZE = 8 * 1024 * 1024  # Размер блока для copy_file_range/sendfile
+_FICLONE = 0x40049409  # ioctl FICLONE (Linux: btrfs, XFS, bcachefs)
+
+
+def format_size(size: float) -> str:
+    """Размер в байтах в читаемом виде: '512 Б', '1.5 МБ'"""
+    for unit in ('Б', 'КБ', 'МБ', 'ГБ'):
+        if size < 1024 or unit == 'ГБ':
+            return f'{size:.0f} {unit}' if unit == 'Б' else f'{size:.1f} {unit}'
+        size /= 1024
+
+
+@dataclass
+class MaterializeStats:
+    """Статистика формирования файлов: сколько файлов каким способом и сколько байт не скопировано"""
+
+    strategies: dict[str, int] = field(default_factory=dict)
+    files: int = 0
+    bytes_total: int = 0
+    bytes_saved: int = 0
+    elapsed: float = 0.0
+
+    def add(self, strategy: str, size: int) -> None:
+        self.strategies[strategy] = self.strategies.get(strategy, 0) + 1
+        self.files += 1
+        self.bytes_total += size
+        if strategy != 'copy':
+            self.bytes_saved += size
+
+    def merge(self, other: 'MaterializeStats') -> None:
+        for strategy, count in other.strategies.items():
+            self.strategies[strategy] = self.strategies.get(strategy, 0) + count
+        self.files += other.files
+        self.bytes_total += other.bytes_total
+        self.bytes_saved += other.bytes_saved
+        self.elapsed += other.elapsed
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.bytes_total / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        used = ', '.join(f'{name}: {count}' for name, count in self.strategies.items()) or 'нет файлов'
+        return (
+            f'Файлов: {self.files} ({used}), сэкономлено {format_size(self.bytes_saved)}, '
+            f'{self.files_per_sec:.0f} файлов/с, {format_size(self.bytes_per_sec)}/с'
+        )
+
+
+def _reflink(src: str, dst: str) -> None:
+    """Копия-клон (copy-on-write): данные общие с исходным файлом, пока один из них не изменят"""
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        raise OSError(errno.EOPNOTSUPP, 'reflink не поддерживается') from None
+
+    with open(src, 'rb') as fsrc:
+        fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            fcntl.ioctl(fd, _FICLONE, fsrc.fileno())
+        except OSError:
+            os.close(fd)
+            os.unlink(dst)
+            raise
+        os.close(fd)
+    shutil.copystat(src, dst)
+
+
+def _symlink(src: str, dst: str) -> None:
+    os.symlink(os.path.abspath(src), dst)
+
+
+# Ошибки, при которых вызов ядра не подходит для пары файлов и нужно пробовать следующий способ
+_COPY_RANGE_UNSUPPORTED = (errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF, errno.ENOTSOCK)
+
+
+def _copy_range(fsrc: int, fdst: int, size: int) -> bool:
+    """
+    Копирование данных средствами ядра: copy_file_range (в т.ч. копия на стороне сервера NFS/SMB),
+    затем sendfile. Возвращает False, если ни один вызов не поддерживается или не скопировал ни байта.
+    OSError, если копия вышла короче size.
+    """
+    for name in ('copy_file_range', 'sendfile'):
+        func = getattr(os, name, None)
+        if func is None:
+            continue
+        offset = 0
+        try:
+            while offset < size:
+                count = min(COPY_CHUNK_SIZE, size - offset)
+                if name == 'copy_file_range':
+                    sent = func(fsrc, fdst, count, offset, offset)
+                else:
+                    sent = func(fdst, fsrc, offset, count)
+                if sent == 0:  # конец файла или вызов не копирует (некоторые FUSE/CIFS возвращают 0)
+                    break
+                offset += sent
+        except OSError as e:
+            if offset == 0 and e.errno in _COPY_RANGE_UNSUPPORTED:
+                continue
+            raise
+        if offset == 0 and size:  # ничего не скопировано — пробуем следующий способ
+            continue
+        if offset < size:
+            raise OSError(errno.EIO, f'Скопировано {offset} из {size} байт')
+        return True
+    return False
+
+
+def _copy(src: str, dst: str) -> None:
+    """Копирование данных и метаданных, как shutil.copy2"""
+    # Имя занимается атомарно, чтобы не перезаписать файл, созданный параллельно другим процессом
+    fdst = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with open(src, 'rb') as fsrc:
+            if not _copy_range(fsrc.fileno(), fdst, os.fstat(fsrc.fileno()).st_size):
+                with open(fdst, 'wb', closefd=False) as out:
+                    shutil.copyfileobj(fsrc, out, COPY_CHUNK_SIZE)
+    except BaseException:
+        os.close(fdst)
+        with suppress(OSError):
+            os.remove(dst)  # неполная копия не должна остаться под видом готовой
+        raise
+    os.close(fdst)
+    shutil.copystat(src, dst)
+
+
+_STRATEGIES: dict[str, Callable[[str, str], None]] = {
+    'reflink': _reflink,
+    'hardlink': os.link,
+    'symlink': _symlink,
+    'copy': _copy,
+}
+
+
+class Materializer:
+    """
+    Формирование копий файлов без дублирования данных, где это возможно.
+
+    Режимы:
+        auto     — reflink, затем жёсткая ссылка, затем обычное копирование;
+        reflink  — только клон copy-on-write, иначе копирование;
+        hardlink — жёсткая ссылка (файл общий с исходным), иначе копирование;
+        symlink  — символическая ссылка, иначе копирование;
+        copy     — обычное копирование, как shutil.copy2 (по умолчанию).
+
+    Способ, не поддерживаемый парой файловых систем, запоминается и для неё больше не пробуется.
+    Пакеты файлов (copy_tree, run) обрабатываются на пуле из workers потоков; пул закрывается close().
+    """
+
+    def __init__(self, mode: str = 'copy', workers: int = COPY_WORKERS):
+        if mode not in MATERIALIZE_MODES:
+            raise ValueError(f'Неизвестный способ формирования файлов: {mode}')
+        self.mode = mode
+        self.workers = workers
+        self.stats = MaterializeStats()
+        self._order = ['reflink', 'hardlink', 'copy'] if mode == 'auto' else list(dict.fromkeys([mode, 'copy']))
+        self._unsupported: set[tuple[str, int, int]] = set()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._devices: dict[str, int] = {}  # папка назначения -> st_dev
+
+    def __enter__(self) -> 'Materializer':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def run(self, func: Callable, jobs: list[tuple]) -> None:
+        """
+        Выполняет func(*job) для каждого задания на пуле потоков и ждёт завершения всех.
+        Первая ошибка пробрасывается, ещё не начатые задания отменяются.
+        """
+        if not jobs:
+            return
+        started = time.perf_counter()
+        try:
+            if self.workers <= 1 or len(jobs) == 1:
+                for job in jobs:
+                    func(*job)
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            futures = [self._executor.submit(func, *job) for job in jobs]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        finally:
+            with self._lock:
+                self.stats.elapsed += time.perf_counter() - started
+
+    def copy_tree(self, src: str, dst: str) -> str:
+        """
+        Копирует папку src в новую папку dst (как shutil.copytree).
+        Сначала создаётся всё дерево папок, затем файлы копируются параллельно,
+        в конце папкам переносятся метаданные.
+
+        :return: dst
+        """
+        folders = [(src, dst)]
+        files = []
+        for dirpath, dirnames, filenames in os.walk(src, followlinks=True):  # как copytree(symlinks=False)
+            target = os.path.join(dst, os.path.relpath(dirpath, src)) if dirpath != src else dst
+            folders.extend((os.path.join(dirpath, d), os.path.join(target, d)) for d in dirnames)
+            files.extend((os.path.join(dirpath, f), os.path.join(target, f)) for f in filenames)
+
+        os.makedirs(dst)
+        for _, target in folders[1:]:
+            os.makedirs(target, exist_ok=True)
+
+        self.run(self.copy_file, files)
+
+        for source, target in reversed(folders):
+            shutil.copystat(source, target)
+        return dst
+
+    def copy_file(self, src: str, dst: str) -> str:
+        """
+        Создаёт dst из src первым сработавшим способом.
+        Сигнатура совместима с copy_function у shutil.copytree.
+
+        :return: dst
+        """
+        src_stat = os.stat(src)
+        dst_dir = os.path.dirname(dst) or '.'
+        dst_dev = self._devices.get(dst_dir)
+        if dst_dev is None:
+            dst_dev = self._devices[dst_dir] = os.stat(dst_dir).st_dev
+        for strategy in self._order:
+            key = (strategy, src_stat.st_dev, dst_dev)
+            if strategy != 'copy' and key in self._unsupported:
+                continue
+            try:
+                _STRATEGIES[strategy](src, dst)
+            except OSError as e:
+                if strategy == 'copy' or e.errno == errno.EEXIST:
+                    raise
+                with self._lock:
+                    self._unsupported.add(key)
+                continue
+            with self._lock:
+                self.stats.add(strategy, src_stat.st_size)
+            return dst
+        raise OSError(f'Не удалось создать {dst}')
+
+
+def copy_folder(src: str | Path, dst: str | Path, materializer: Optional[Materializer] = None) -> Path:
     """
     Копирует папку рекурсивно в указанное место.
     :param src: Исходная папка
     :param dst: Папка назначения
+    :param materializer: Способ создания файлов (по умолчанию обычное копирование)
     :return: Путь к скопированной папке
     """
     src = Path(src)
@@ -267,7 +901,8 @@ def copy_folder(src: str | Path, dst: str | Path) -> Path:
         raise FileNotFoundError(f'Папка {src} не найдена')
 
     dst = dst / src.name
-    shutil.copytree(_safe_path(src), _safe_path(dst))
+    with Materializer('copy') if materializer is None else nullcontext(materializer) as materializer:
+        materializer.copy_tree(_safe_path(src), _safe_path(dst))
     return dst
 
 
@@ -343,34 +978,87 @@ def find_folders_obligations(folder: str | Path) -> List[Path]:
     ]
 
 
-def copy_contents_with_num(src_folder: str, target_folder: str, num_oblig: str):
+class NameAllocator:
+    """
+    Выдача свободных имён файлов в папке без проверки диска на каждую попытку.
+    Папка читается один раз, занятые имена и следующий номер для каждого имени хранятся в памяти.
+    Схема имён как при переборе: 'Выписка.pdf', 'Выписка_1.pdf', 'Выписка_2.pdf', ...
+    Один экземпляр можно использовать из нескольких потоков.
+    """
+
+    def __init__(self, folder: str | Path):
+        self.folder = _safe_path(Path(folder))
+        self._used = {os.path.normcase(name) for name in os.listdir(self.folder)}
+        self._next: dict[str, int] = {}  # имя -> следующий номер для проверки
+        self._lock = threading.Lock()
+
+    def add(self, name: str) -> None:
+        """Отмечает имя занятым (например, папку, созданную в обход allocate)"""
+        with self._lock:
+            self._used.add(os.path.normcase(name))
+
+    def allocate(self, name: str) -> str:
+        """
+        Занимает свободное имя на основе name.
+
+        :return: Полный путь в папке
+        """
+        with self._lock:
+            candidate = name
+            if os.path.normcase(candidate) in self._used:
+                base, ext = os.path.splitext(name)
+                counter = self._next.get(name, 1)
+                candidate = f'{base}_{counter}{ext}'
+                while os.path.normcase(candidate) in self._used:
+                    counter += 1
+                    candidate = f'{base}_{counter}{ext}'
+                self._next[name] = counter + 1
+            self._used.add(os.path.normcase(candidate))
+        return os.path.join(self.folder, candidate)
+
+
+def copy_contents_with_num(
+    src_folder: str,
+    target_folder: str,
+    num_oblig: str,
+    materializer: Optional[Materializer] = None,
+    allocator: Optional[NameAllocator] = None,
+):
     """Копирует содержимое src_folder в target_folder.
     Если имя файла/папки не содержит num_oblig, добавляет его в имя.
+    Файлы создаются через materializer, если он передан.
+    При совпадении имён добавляется номер '_N' (см. NameAllocator). Чтобы номера не пересекались
+    между вызовами для одной папки, передавайте общий allocator.
     """
-    src_folder = Path(src_folder)
-    target_folder = Path(target_folder)
-
-    for item in src_folder.iterdir():
-        src_path = item
-        item_name = item.name
-
-        # Добавляем num_oblig к имени, если его там нет
-        if num_oblig not in item_name:
-            base, ext = os.path.splitext(item_name)
-            item_name = f'{base}_{num_oblig}{ext}'
+    allocator = allocator or NameAllocator(target_folder)
 
-        dst_path = target_folder / item_name
+    def _collect(folder: Path, jobs: list):
+        for item in folder.iterdir():
+            item_name = item.name
 
-        if src_path.is_dir():
-            copy_contents_with_num(src_path, target_folder, num_oblig)
-        else:
-            counter = 1
-            orig_dst = dst_path
-            while dst_path.exists():
+            # Добавляем num_oblig к имени, если его там нет
+            if num_oblig not in item_name:
                 base, ext = os.path.splitext(item_name)
-                dst_path = target_folder / f'{base}_{counter}{ext}'
-                counter += 1
-            shutil.copy2(_safe_path(src_path), _safe_path(dst_path))
+                item_name = f'{base}_{num_oblig}{ext}'
+
+            if item.is_dir():
+                _collect(item, jobs)
+            else:
+                # Имена выдаются по порядку обхода, поэтому не зависят от параллельного копирования
+                jobs.append((_safe_path(item), item_name, allocator.allocate(item_name)))
+        return jobs
+
+    def _copy_one(src_path: str, item_name: str, dst_path: str):
+        while True:
+            try:
+                materializer.copy_file(src_path, dst_path)
+            except FileExistsError:
+                dst_path = allocator.allocate(item_name)  # имя занял другой процесс после чтения папки
+                continue
+            break
+
+    with Materializer('copy') if materializer is None else nullcontext(materializer) as materializer:
+        materializer.run(_copy_one, _collect(Path(src_folder), []))
 
 
 # if __name__ == '__main__':
@@ -1,4 +1,5 @@
 import os
+import time
 from pathlib import Path
 
 from src.core import docx_tools, file_tools
@@ -13,6 +14,9 @@ from src.utils.templates_utils import (
     load_zalog_contacts_template,
 )
 from src.utils.text_utils import get_case_number_from_filename, get_number_obligation_from_foldername, sanitize_filename
+from src.utils.trace_utils import NULL_TRACER, Tracer
+
+TRACE_FOLDER_NAME = 'Трассировка'  # Папка с файлами трассировки в рабочей директории
 
 
 def _get_debtor_info(path_folder: Path) -> tuple[str, str, Path]:
@@ -27,23 +31,45 @@ def _get_debtor_info(path_folder: Path) -> tuple[str, str, Path]:
     return path_doc, fio_debtor, case_number
 
 
-def _extract_dossier(path_folder: Path, path_extract: Path = None) -> Path:
+def _extract_dossier(path_folder: Path, path_extract: Path = None, tracer=NULL_TRACER, report=None) -> Path:
     """
     Находит архив досье и распаковывает его.
     Если задан path_extract, то распакует туда, иначе в папку с '<ФИО> без заявления'.
     Удаляет исходный архив после распаковки.
+    report(текст) получает ход распаковки: файлы и скорость.
     """
-    path_archive = file_tools.find_dossier_archive(path_folder)
+    with tracer.span('Поиск архива досье'):
+        path_archive = file_tools.find_dossier_archive(path_folder)
     case_number = get_case_number_from_filename(str(path_archive.stem))
-    if path_extract:
-        path_dossier = file_tools.unzip_archive(path_archive, path_extract)
-    else:
+    if not path_extract:
         path_extract = path_folder / f'{sanitize_filename(case_number)} без заявления'
-        path_dossier = file_tools.unzip_archive(path_archive, path_extract)
+    with tracer.span('Распаковка архива досье') as span:
+        progress = _extract_progress(span if tracer.enabled else None, report)
+        path_dossier = file_tools.unzip_archive(path_archive, path_extract, progress=progress)
     file_tools.delete_file(path_archive)
     return path_dossier, case_number
 
 
+def _extract_progress(span=None, report=None):
+    """
+    progress для unzip_archive: ход распаковки (файлы, МБ/с) передается в report,
+    итог записывается в отрезок трассировки span — количество файлов, байты и байт/с.
+    None, если передавать некуда.
+    """
+    if span is None and report is None:
+        return None
+
+    def _progress(p: file_tools.ExtractProgress):
+        if report:
+            report(f'{p.files_done} из {p.files_total} файлов, {p.bytes_per_sec / 1024 / 1024:.1f} МБ/с')
+        if span is not None and p.files_done == p.files_total:
+            span.files = p.files_total
+            span.args['bytes'] = p.bytes_done
+            span.args['bytes_per_sec'] = round(p.bytes_per_sec)
+
+    return _progress
+
+
 def _get_dossier_no_statement(path_folder: Path, fio_debtor: str, case_number: str):
     """Находит распакованную папку досье по его номеру дела и переименовывает ее"""
     case_number = sanitize_filename(case_number)
@@ -52,9 +78,9 @@ def _get_dossier_no_statement(path_folder: Path, fio_debtor: str, case_number: s
     return new_path
 
 
-def _extract_all_nested_archives(path_folder: Path) -> None:
-    """Распаковка вложенных архивов в папке"""
-    file_tools.unzip_all_nested_archives(path_folder)
+def _extract_all_nested_archives(path_folder: Path) -> int:
+    """Распаковка вложенных архивов в папке. Возвращает количество распакованных файлов"""
+    return file_tools.unzip_all_nested_archives(path_folder)
 
 
 def _move_rtk_doc(path_doc: Path, path_dossier: Path, save_orig=False) -> Path:
@@ -67,9 +93,19 @@ def _move_rtk_doc(path_doc: Path, path_dossier: Path, save_orig=False) -> Path:
 
 
 def _prepare_arbiter_folder(
-    path_dossier: Path, case_number: str, fio_debtor: str, all_in_arb=False, arb_name: str = None
-):
-    """Формирование папки арбитр"""
+    path_dossier: Path,
+    case_number: str,
+    fio_debtor: str,
+    all_in_arb=False,
+    arb_name: str = None,
+    materialize_mode: str = 'copy',
+) -> tuple[Path, file_tools.MaterializeStats]:
+    """
+    Формирование папки арбитр.
+    Файлы обязательств создаются способом materialize_mode (см. file_tools.Materializer),
+    при копировании — параллельно на пуле потоков.
+    Возвращает (путь к папке арбитр, статистика способов создания файлов)
+    """
     paths_obligations = file_tools.find_folders_obligations(path_dossier)
     if arb_name == '<Номер дела> <ФИО>':
         path_arbitter = file_tools.ensure_folder(path_dossier / f'{sanitize_filename(case_number)} {fio_debtor}')
@@ -78,18 +114,103 @@ def _prepare_arbiter_folder(
     else:
         path_arbitter = file_tools.ensure_folder(path_dossier / f'А {fio_debtor}')
 
-    for path_oblig in paths_obligations:
-        if all_in_arb:
-            folder_name = os.path.basename(path_oblig)
-            num_oblig = get_number_obligation_from_foldername(folder_name)
-            if num_oblig:
-                file_tools.copy_contents_with_num(path_oblig, path_arbitter, num_oblig)
+    with file_tools.Materializer(materialize_mode) as materializer:
+        allocator = file_tools.NameAllocator(path_arbitter) if all_in_arb else None  # Общий для всех обязательств
+        for path_oblig in paths_obligations:
+            if all_in_arb:
+                folder_name = os.path.basename(path_oblig)
+                num_oblig = get_number_obligation_from_foldername(folder_name)
+                if num_oblig:
+                    file_tools.copy_contents_with_num(path_oblig, path_arbitter, num_oblig, materializer, allocator)
+                else:
+                    file_tools.copy_folder(path_oblig, path_arbitter, materializer)
+                    allocator.add(folder_name)
             else:
-                file_tools.copy_folder(path_oblig, path_arbitter)
-        else:
-            file_tools.copy_folder(path_oblig, path_arbitter)
+                file_tools.copy_folder(path_oblig, path_arbitter, materializer)
+
+    return path_arbitter, materializer.stats
+
+
+class WorkflowCancelled(Exception):
+    """Обработка остановлена по запросу пользователя"""
+
+
+class _Stages:
+    """
+    Ход обработки по этапам: сообщает о начале этапа и проверяет запрос отмены.
+    Отмена срабатывает только между этапами (и между шагами обработки заявления),
+    поэтому начатый этап всегда доводится до конца.
+    Каждый этап — отрезок трассировки. При выходе из with трассировка сохраняется
+    в папку TRACE_FOLDER_NAME рабочей директории, а итоговая строка выводится в log.
+
+    :param progress: progress(этап, завершено этапов, всего этапов)
+    :param cancel: Возвращает True, если пользователь запросил отмену
+    :param log: Вывод строк лога
+    :param trace_folder: Рабочая директория, если трассировка включена, иначе None
+    """
 
-    return path_arbitter
+    def __init__(self, total: int, progress=None, cancel=None, log=None, trace_folder: Path = None):
+        self.total = total
+        self.done = 0
+        self.progress = progress
+        self.cancel = cancel
+        self.log = log
+        self.current = None
+        self.trace_folder = trace_folder
+        self.tracer = Tracer() if trace_folder else NULL_TRACER
+        self._span = None
+
+    def __enter__(self) -> '_Stages':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._close_span(exc_type, exc, tb)
+        if self.tracer.enabled:
+            name = sanitize_filename(f'{self.tracer.name} {time.strftime("%Y%m%d-%H%M%S")}'.strip())
+            path = self.tracer.save(self.trace_folder / TRACE_FOLDER_NAME / f'{name}.json')
+            if self.log:
+                self.log(f'{self.tracer.summary()}. Трассировка: {path}')
+
+    def _close_span(self, exc_type=None, exc=None, tb=None) -> None:
+        if self._span is not None:
+            self._span.__exit__(exc_type, exc, tb)
+            self._span = None
+
+    def check_cancel(self, name: str) -> None:
+        if self.cancel and self.cancel():
+            raise WorkflowCancelled(f'Обработка отменена перед этапом "{name}"')
+
+    def start(self, name: str):
+        """Начало этапа. Возвращает отрезок трассировки этапа"""
+        self.check_cancel(name)
+        self._close_span()
+        if self.current is not None:
+            self.done += 1
+        self.current = name
+        if self.progress:
+            self.progress(name, self.done, self.total)
+        if self.log:
+            self.log(f'{name}...')
+        self._span = self.tracer.span(name, cat='stage').__enter__()
+        return self._span
+
+    def report(self, text: str) -> None:
+        """Ход текущего этапа (без изменения счётчика и без проверки отмены)"""
+        if self.progress:
+            self.progress(f'{self.current}: {text}', self.done, self.total)
+
+    def step(self, name: str) -> None:
+        """Шаг внутри текущего этапа (без изменения счётчика)"""
+        self.check_cancel(name)
+        if self.progress:
+            self.progress(f'{self.current}: {name}', self.done, self.total)
+
+    def finish(self) -> None:
+        self._close_span()
+        self.done = self.total
+        self.current = None
+        if self.progress:
+            self.progress('Готово', self.total, self.total)
 
 
 # ==== Функции для контроллера ====
@@ -101,27 +222,67 @@ def procces_package(
     all_in_arb=False,
     arb_name=None,
     format_header=None,
+    checkpoint=False,
+    materialize_mode='copy',
+    log=None,
+    progress=None,
+    cancel=None,
+    trace=False,
 ):
-    """Распаковка архива досье и обработка заявления"""
+    """
+    Распаковка архива досье и обработка заявления.
+
+    :param log: Вывод строк лога
+    :param progress: progress(этап, завершено этапов, всего этапов)
+    :param cancel: Возвращает True, если нужно остановиться; проверяется между этапами
+    :param checkpoint: При ошибке шага сохранить заявление с успешными шагами (см. proccess_statement)
+    :param trace: Сохранить трассировку времени этапов и шагов (см. _Stages)
+    :raises WorkflowCancelled: при отмене
+    """
     folder = Path(folder_path)  # Рабочая директория
-    path_doc, fio_debtor, case_number = _get_debtor_info(folder)  # Получение инфо с заявления
-
-    _path_extract = folder / fio_debtor  # Создаём путь для распаковки
-    path_dossier, _case_number = _extract_dossier(folder, _path_extract)  # Получаем путь к распакованному архиву
+    with _Stages(5, progress, cancel, log, folder if trace else None) as stages:
+        tracer = stages.tracer
+
+        stages.start('Чтение заявления').add_files(1)
+        path_doc, fio_debtor, case_number = _get_debtor_info(folder)  # Получение инфо с заявления
+        tracer.name = f'{case_number} {fio_debtor}'
+
+        stages.start('Распаковка досье')
+        _path_extract = folder / fio_debtor  # Создаём путь для распаковки
+        path_dossier, _case_number = _extract_dossier(
+            folder, _path_extract, tracer, stages.report
+        )  # Путь к распакованному архиву
+
+        stages.start('Обработка заявления').add_files(1)
+        current_path_doc = _move_rtk_doc(path_doc, path_dossier, save_orig)  # Путь к перемещенному заявлению
+        proccess_statement(  # Обрабатываем заявление
+            current_path_doc, bank, signa, format_header, checkpoint, on_step=stages.step, tracer=tracer
+        )
 
-    current_path_doc = _move_rtk_doc(path_doc, path_dossier, save_orig)  # Получаем путь к перемещенному заявлению
-    proccess_statement(current_path_doc, bank, signa, format_header)  # Обрабатываем заявление
+        span = stages.start('Распаковка вложенных архивов')
+        span.add_files(_extract_all_nested_archives(path_dossier))  # Распаковываем вложенные архивы
 
-    _extract_all_nested_archives(path_dossier)  # Распаковываем вложенные архивы
-    _prepare_arbiter_folder(path_dossier, case_number, fio_debtor, all_in_arb, arb_name)  # Формируем папку арбитр
+        span = stages.start('Формирование папки арбитр')
+        _, stats = _prepare_arbiter_folder(  # Формируем папку арбитр
+            path_dossier, case_number, fio_debtor, all_in_arb, arb_name, materialize_mode
+        )
+        span.add_files(stats.files)
+        if log:
+            log(f'Папка арбитр: {stats.summary()}')
 
+        stages.finish()
     return fio_debtor, case_number
 
 
-def unpack_package(folder_path: str, save_orig=False):
+def unpack_package(folder_path: str, save_orig=False, log=None, progress=None, cancel=None, trace=False):
     """Распаковка архива досье без заявления"""
     folder = Path(folder_path)  # Рабочая директория
-    path, case_number = _extract_dossier(folder)  # Распаковываем архив
+    with _Stages(1, progress, cancel, log, folder if trace else None) as stages:
+        stages.start('Распаковка досье')
+        path, case_number = _extract_dossier(folder, tracer=stages.tracer, report=stages.report)  # Распаковываем архив
+        stages.tracer.name = case_number
+
+        stages.finish()
     return case_number
 
 
@@ -133,43 +294,91 @@ def insert_statement(
     all_in_arb=False,
     arb_name=None,
     format_header=None,
+    checkpoint=False,
+    materialize_mode='copy',
+    log=None,
+    progress=None,
+    cancel=None,
+    trace=False,
 ):
-    """Вставка заявления в распакованную папку архива досье без заявления"""
+    """
+    Вставка заявления в распакованную папку архива досье без заявления.
+    Параметры checkpoint, log, progress, cancel и trace — как у procces_package.
+    """
     folder = Path(folder_path)  # Рабочая директория
-    path_doc, fio_debtor, case_number = _get_debtor_info(folder)  # Получение инфо с заявления
-
-    path_dossier = _get_dossier_no_statement(folder, fio_debtor, case_number)  # Получаем путь к папке досье
+    with _Stages(4, progress, cancel, log, folder if trace else None) as stages:
+        tracer = stages.tracer
+
+        stages.start('Чтение заявления').add_files(1)
+        path_doc, fio_debtor, case_number = _get_debtor_info(folder)  # Получение инфо с заявления
+        tracer.name = f'{case_number} {fio_debtor}'
+        path_dossier = _get_dossier_no_statement(folder, fio_debtor, case_number)  # Получаем путь к папке досье
+
+        stages.start('Обработка заявления').add_files(1)
+        current_path_doc = _move_rtk_doc(path_doc, path_dossier, save_orig)  # Путь к перемещенному заявлению
+        proccess_statement(  # Обрабатываем заявление
+            current_path_doc, bank, signa, format_header, checkpoint, on_step=stages.step, tracer=tracer
+        )
 
-    current_path_doc = _move_rtk_doc(path_doc, path_dossier, save_orig)  # Получаем путь к перемещенному заявлению
-    proccess_statement(current_path_doc, bank, signa, format_header)  # Обрабатываем заявление
+        span = stages.start('Распаковка вложенных архивов')
+        span.add_files(_extract_all_nested_archives(path_dossier))  # Распаковываем вложенные архивы
 
-    _extract_all_nested_archives(path_dossier)  # Распаковываем вложенные архивы
-    _prepare_arbiter_folder(path_dossier, case_number, fio_debtor, all_in_arb, arb_name)  # Формируем папку арбитр
+        span = stages.start('Формирование папки арбитр')
+        _, stats = _prepare_arbiter_folder(  # Формируем папку арбитр
+            path_dossier, case_number, fio_debtor, all_in_arb, arb_name, materialize_mode
+        )
+        span.add_files(stats.files)
+        if log:
+            log(f'Папка арбитр: {stats.summary()}')
 
+        stages.finish()
     return fio_debtor, case_number
 
 
-def proccess_statement(path_doc: Path, bank, signa, format_header):
-    """Обработка заявления"""
-    doc = docx_tools.open_docx(path_doc)
+def proccess_statement(path_doc: Path, bank, signa, format_header, checkpoint=False, on_step=None, tracer=NULL_TRACER):
+    """
+    Обработка заявления.
+    Все шаги выполняются над загруженным документом, файл сохраняется один раз в конце.
+    Если checkpoint=True, перед каждым шагом в памяти делается снимок документа:
+    при ошибке шага документ откатывается к снимку и сохраняется с результатами успешных шагов.
+    Без checkpoint при ошибке файл на диске остаётся нетронутым.
+    on_step(название шага) вызывается перед каждым шагом и может прервать обработку исключением
+    (например WorkflowCancelled) — тогда файл не сохраняется.
+    Открытие, каждый шаг и сохранение записываются в tracer.
+    """
+    with tracer.span('Открытие заявления', cat='step'):
+        doc = docx_tools.open_docx(path_doc)
+        index = docx_tools.StatementIndex(doc)  # Общий индекс разделов для всех шагов
 
     def _step(step_name: str, func: callable, *args):  # Функция для выполнения каждого шага обработки
+        if on_step:
+            on_step(step_name)
+        snapshot = docx_tools.snapshot_body(doc) if checkpoint else None
         try:
-            func(*args)
-            doc.save(path_doc)
+            with tracer.span(step_name, cat='step'):
+                func(*args)
         except Exception as e:
+            if snapshot is not None:
+                docx_tools.restore_body(doc, snapshot, index)
+                doc.save(path_doc)
             raise RuntimeError(f'Ошибка шага "{step_name}": {e}') from e
             # self.view.append_log(f'{step_name}: ошибка — {e}')
 
     # === Форматирование шапки ===
     if format_header:
-        _step('Форматирование шапки', docx_tools.format_header, doc)
+        _step('Форматирование шапки', docx_tools.format_header, doc, index)
 
     # === Обработка Обязательств ===
     # Удаление слов из документа
     del_words_obyaz = load_del_words_obyazatelstv()
     if del_words_obyaz:
-        _step('Удаление слов в Обязательствах', docx_tools.delete_words_in_obyazatelstvo, doc, del_words_obyaz)
+        _step(
+            'Удаление слов в Обязательствах',
+            docx_tools.delete_words_in_obyazatelstvo,
+            doc,
+            del_words_obyaz,
+            index,
+        )
 
     # Удаление параграфов из документа
     del_paragraphs_obyaz = load_del_paragraphs_obyazatelstv()
@@ -179,6 +388,7 @@ def proccess_statement(path_doc: Path, bank, signa, format_header):
             docx_tools.delete_paragraphs_in_obyazatelstvo,
             doc,
             del_paragraphs_obyaz,
+            index,
         )
 
     # === Обработка части ПРОСИТ СУД ===
@@ -190,36 +400,44 @@ def proccess_statement(path_doc: Path, bank, signa, format_header):
             docx_tools.delete_paragraphs_in_gosposhlina,
             doc,
             del_paragraphs_gosposhlina,
+            index,
         )
 
     # Вставка шаблона госпошлины
     gosposhlina_temp = load_gosposhlina_template()
     if gosposhlina_temp:
-        _step('Вставка шаблона госпошлины', docx_tools.insert_gosposhlina, doc, gosposhlina_temp)
+        _step('Вставка шаблона госпошлины', docx_tools.insert_gosposhlina, doc, gosposhlina_temp, index)
 
     # === Обработка части Приложения ===
     del_paragraphs_appendices = load_del_paragraphs_appendices()
     if del_paragraphs_appendices:
         _step(
-            'Удаление пунктов в Приложения', docx_tools.delete_paragraphs_in_appendices, doc, del_paragraphs_appendices
+            'Удаление пунктов в Приложения',
+            docx_tools.delete_paragraphs_in_appendices,
+            doc,
+            del_paragraphs_appendices,
+            index,
         )
 
     # Форматирование списка приложений
-    _step('Форматирование приложений', docx_tools.format_appendices, doc)
+    _step('Форматирование приложений', docx_tools.format_appendices, doc, index)
 
     # === Обработка части Реквизиты ===
     # Вставка реквизитов банка в таблицу
     if bank:
         doc_requisities = load_bank_requisites()
-        _step('Вставка реквизитов банка', docx_tools.insert_bank_table, doc, doc_requisities, bank)
+        _step('Вставка реквизитов банка', docx_tools.insert_bank_table, doc, doc_requisities, bank, index)
 
     # === Обработка контактов ===
     # Вставка залоговых контактов
     zalog_contacts_temp = load_zalog_contacts_template()
     if zalog_contacts_temp:
-        _step('Вставка залоговых контактов ', docx_tools.insert_zalog_contacts, doc, zalog_contacts_temp)
+        _step('Вставка залоговых контактов ', docx_tools.insert_zalog_contacts, doc, zalog_contacts_temp, index)
 
     # Вставка подписи
     if signa:
         path_signa = load_path_signa()
-        _step('Вставка подписи', docx_tools.insert_signature, doc, path_signa)
+        _step('Вставка подписи', docx_tools.insert_signature, doc, path_signa, index)
+
+    with tracer.span('Сохранение заявления', cat='step'):
+        doc.save(path_doc)
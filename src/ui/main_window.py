@@ -37,3 +37,8 @@ class DocPrepApp(QWidget):
 
         layout.addWidget(tabs)
         self.setLayout(layout)
+
+    def closeEvent(self, event):
+        self.package_controller.shutdown()  # Дожидаемся остановки фоновой обработки
+        self.calculator_controller.shutdown()
+        super().closeEvent(event)
@@ -1,22 +1,93 @@
 import os
 import sys
 
-from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtWidgets import (
     QApplication,
+    QDialog,
+    QDialogButtonBox,
     QGridLayout,
     QGroupBox,
     QHBoxLayout,
+    QHeaderView,
     QLabel,
     QLineEdit,
     QMessageBox,
+    QProgressBar,
     QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
     QTextEdit,
     QVBoxLayout,
     QWidget,
 )
 
 
+class GpConfirmDialog(QDialog):
+    """
+    Вся госпошлина расчета одной таблицей: отмеченная учитывается.
+
+    :param candidates: Список engine.GpCandidate
+    """
+
+    def __init__(self, candidates: list, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Госпошлина')
+        self.candidates = list(candidates)
+        self.resize(800, 400)
+
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel('Отметьте госпошлину, которую нужно учесть при расчетах'))
+
+        self.table = QTableWidget(len(self.candidates), 4)
+        self.table.setHorizontalHeaderLabels(['Учесть', '№', 'Обязательство', 'Сумма'])
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        for row, gp in enumerate(self.candidates):
+            check = QTableWidgetItem()
+            check.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
+            check.setCheckState(Qt.CheckState.Unchecked)
+            self.table.setItem(row, 0, check)
+            self.table.setItem(row, 1, QTableWidgetItem(str(gp.obligation)))
+            name = gp.amount.question or gp.name or os.path.basename(gp.file)
+            item = QTableWidgetItem(str(name))
+            item.setToolTip(os.path.basename(gp.file))
+            self.table.setItem(row, 2, item)
+            self.table.setItem(row, 3, QTableWidgetItem(str(gp.amount.value).replace('.', ',')))
+        layout.addWidget(self.table)
+
+        buttons_check = QHBoxLayout()
+        btn_all = QPushButton('Отметить все')
+        btn_all.clicked.connect(lambda: self.set_all(True))
+        btn_none = QPushButton('Снять все')
+        btn_none.clicked.connect(lambda: self.set_all(False))
+        buttons_check.addWidget(btn_all)
+        buttons_check.addWidget(btn_none)
+        buttons_check.addStretch()
+        layout.addLayout(buttons_check)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.setLayout(layout)
+
+    def set_all(self, checked: bool):
+        state = Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked
+        for row in range(self.table.rowCount()):
+            self.table.item(row, 0).setCheckState(state)
+
+    def decisions(self) -> dict:
+        """{GpCandidate: учитывать}"""
+        return {
+            gp: self.table.item(row, 0).checkState() == Qt.CheckState.Checked for row, gp in enumerate(self.candidates)
+        }
+
+
 class CalculatorTab(QWidget):
     files_dropped = pyqtSignal(list)
     select_files_clicked = pyqtSignal()
@@ -67,6 +138,10 @@ class CalculatorTab(QWidget):
         self.btn_resave.clicked.connect(self.resave_clicked.emit)
         layout.addWidget(self.btn_resave)
 
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
         self.text_output = QTextEdit()
         self.text_output.setReadOnly(True)
         self.text_output.setPlaceholderText('Перетащите сюда файлы Excel или выберите их кнопкой Выбрать файлы')
@@ -91,6 +166,20 @@ class CalculatorTab(QWidget):
         self._clear_totals()
         self._recreate_totals_group()
 
+    def set_busy(self, busy: bool):
+        """Блокирует кнопки на время расчета"""
+        for btn in (self.btn_select_file, self.btn_run, self.btn_reset, self.btn_resave):
+            btn.setEnabled(not busy)
+        self.setAcceptDrops(not busy)
+        self.progress_bar.setVisible(busy)
+        if busy:
+            self.progress_bar.setRange(0, 0)
+
+    def set_progress(self, done: int, total: int):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+        self.progress_bar.setFormat(f'{done} из {total}')
+
     def print_select_files(self, files):
         """Выводит список файлов"""
         self.reset()
@@ -104,6 +193,13 @@ class CalculatorTab(QWidget):
         )
         return reply == QMessageBox.StandardButton.Yes
 
+    def ask_gp_all_callback(self, candidates: list) -> dict:
+        """Показать всю госпошлину одной таблицей; при отмене ничего не учитывается"""
+        dialog = GpConfirmDialog(candidates, self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            return dialog.decisions()
+        return {}
+
     def add_zalog(self, gosposhlina, row):
         self.btn_plus_zalog.hide()  # скрываем кнопку
 
@@ -160,13 +256,16 @@ class CalculatorTab(QWidget):
         self.btn_plus_zalog.clicked.connect(lambda: self.add_zalog(gosposhlina, row))
 
     # ==== Внутренние методы класса ====
-    def _clear_totals(self):
-        """Очищает виджеты из итоговой таблицы"""
-        while self.totals_layout.count():
-            item = self.totals_layout.takeAt(0)
+    def _clear_totals(self, layout=None):
+        """Очищает виджеты из итоговой таблицы (включая вложенные строки с кнопкой копирования)"""
+        layout = layout if layout is not None else self.totals_layout
+        while layout.count():
+            item = layout.takeAt(0)
             widget = item.widget()
             if widget:
                 widget.deleteLater()
+            elif item.layout():
+                self._clear_totals(item.layout())
 
     def _recreate_totals_group(self):
         """Очищаем и пересоздаём группу итогов"""
@@ -8,6 +8,7 @@ from PyQt6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QLineEdit,
+    QProgressBar,
     QPushButton,
     QRadioButton,
     QTextEdit,
@@ -21,6 +22,7 @@ class PackageTab(QWidget):
     unpack_clicked = pyqtSignal()  # Сигнал, для кнопки распаковки архива документов
     insert_clicked = pyqtSignal()  # Сигнал, для кнопки вставки заявления
     reset_clicked = pyqtSignal()  # Сигнал для кнопки сброса
+    cancel_clicked = pyqtSignal()  # Сигнал для кнопки остановки обработки
 
     def __init__(self):
         super().__init__()
@@ -120,6 +122,18 @@ class PackageTab(QWidget):
         self.btn_reset.clicked.connect(lambda: self.reset_clicked.emit())
         main_layout.addWidget(self.btn_reset)
 
+        # == Ход обработки и кнопка остановки (видны во время обработки) ==
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        progress_layout.addWidget(self.progress_bar)
+
+        self.btn_cancel = QPushButton('Остановить')
+        self.btn_cancel.setVisible(False)
+        self.btn_cancel.clicked.connect(lambda: self.cancel_clicked.emit())
+        progress_layout.addWidget(self.btn_cancel)
+        main_layout.addLayout(progress_layout)
+
         # == Блок "Текущее дело" ==
         case_layout = QHBoxLayout()
         case_layout.addWidget(QLabel('Текущее дело:'))
@@ -150,6 +164,25 @@ class PackageTab(QWidget):
     def append_log(self, text: str):
         self.logs.append(text)
 
+    def set_busy(self, busy: bool):
+        """Блокирует кнопки запуска на время обработки и показывает ход обработки"""
+        for btn in (self.btn_process, self.btn_unpack, self.btn_insert):
+            btn.setEnabled(not busy and not btn.isHidden())
+        self.btn_reset.setEnabled(not busy)
+        self.checkbox_no_statement.setEnabled(not busy)
+
+        self.btn_cancel.setEnabled(True)
+        self.btn_cancel.setVisible(busy)
+        self.progress_bar.setVisible(busy)
+        if busy:
+            self.progress_bar.setRange(0, 0)  # до первого этапа — бегущий индикатор
+            self.progress_bar.setFormat('')
+
+    def set_progress(self, stage: str, done: int, total: int):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+        self.progress_bar.setFormat(f'{stage} — %p%')
+
     def reset(self):
         self.current_case.clear()
         self.logs.clear()
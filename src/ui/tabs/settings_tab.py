@@ -2,6 +2,7 @@ from PyQt6.QtCore import pyqtSignal
 from PyQt6.QtWidgets import (
     QCheckBox,
     QComboBox,
+    QDoubleSpinBox,
     QGridLayout,
     QGroupBox,
     QHBoxLayout,
@@ -19,6 +20,7 @@ class SettingsTab(QWidget):
     save_clicked = pyqtSignal()
     browse_clicked = pyqtSignal()
     aplly_settings_clicked = pyqtSignal()
+    gp_rules_browse_clicked = pyqtSignal()
 
     def __init__(self):
         super().__init__()
@@ -65,6 +67,27 @@ class SettingsTab(QWidget):
         layout2.addWidget(self.arbitter_selector)
 
         grid2.addLayout(layout2, 0, 0)
+
+        layout_materialize = QHBoxLayout()
+        layout_materialize.addWidget(QLabel('Файлы в папке арбитр'))
+
+        self.materialize_selector = QComboBox()
+        self.materialize_selector.addItem('Копия', 'copy')  # по умолчанию
+        self.materialize_selector.addItem('Клон copy-on-write (reflink)', 'reflink')
+        self.materialize_selector.addItem('Авто (клон, жёсткая ссылка, копия)', 'auto')
+        self.materialize_selector.addItem('Жёсткая ссылка', 'hardlink')
+        self.materialize_selector.addItem('Символическая ссылка', 'symlink')
+        self.materialize_selector.setToolTip(
+            'Клон и ссылки не занимают место на диске под повторные данные.\n'
+            'Жёсткая ссылка (и режим «Авто», если клон не поддерживается) — общие данные с файлом в досье:\n'
+            'изменение файла в папке арбитр меняет и файл в досье, и наоборот.'
+        )
+        layout_materialize.addWidget(self.materialize_selector)
+
+        grid2.addLayout(layout_materialize, 1, 0)
+
+        self.checkbox_trace = QCheckBox('Сохранять трассировку времени обработки (папка "Трассировка")')
+        grid2.addWidget(self.checkbox_trace, 2, 0)
         group2.setLayout(grid2)
         main_layout.addWidget(group2)
 
@@ -75,6 +98,13 @@ class SettingsTab(QWidget):
         self.checkbox_format_header = QCheckBox('Форматировать отступ шапки документа')
         grid3.addWidget(self.checkbox_format_header, 0, 0)
 
+        self.checkbox_checkpoint = QCheckBox('При ошибке шага сохранять заявление с успешными шагами')
+        self.checkbox_checkpoint.setToolTip(
+            'Шаг с ошибкой откатывается, заявление сохраняется с результатами предыдущих шагов.\n'
+            'Без флажка при ошибке заявление на диске остаётся без изменений.'
+        )
+        grid3.addWidget(self.checkbox_checkpoint, 1, 0)
+
         group3.setLayout(grid3)
         main_layout.addWidget(group3)
 
@@ -89,6 +119,52 @@ class SettingsTab(QWidget):
         self.checkbox_show_btn_resave = QCheckBox('Показать кнопку Пересохранять файлы')
         grid4.addWidget(self.checkbox_show_btn_resave, 1, 0)
 
+        self.checkbox_parallel_rci = QCheckBox('Разбирать файлы РЦИ в нескольких процессах')
+        self.checkbox_parallel_rci.setToolTip(
+            'Ускоряет расчет большого количества файлов.\nВопросы о госпошлине задаются после разбора всех файлов.'
+        )
+        grid4.addWidget(self.checkbox_parallel_rci, 2, 0)
+
+        self.checkbox_cache_rci = QCheckBox('Запоминать разобранные файлы РЦИ')
+        self.checkbox_cache_rci.setToolTip(
+            'Повторный расчет тех же файлов не разбирает их заново.\n'
+            'Кэш хранится в профиле пользователя, измененный файл разбирается снова.'
+        )
+        grid4.addWidget(self.checkbox_cache_rci, 3, 0)
+
+        layout_gp = QHBoxLayout()
+        layout_gp.addWidget(QLabel('Госпошлина'))
+
+        self.gp_mode_selector = QComboBox()
+        self.gp_mode_selector.addItem('Спрашивать по каждой', 'ask')
+        self.gp_mode_selector.addItem('Спрашивать одной таблицей', 'ask_all')
+        self.gp_mode_selector.addItem('Всегда учитывать', 'include')
+        self.gp_mode_selector.addItem('Никогда не учитывать', 'exclude')
+        self.gp_mode_selector.addItem('Учитывать меньше порога', 'threshold')
+        self.gp_mode_selector.addItem('По файлу правил', 'rules')
+        self.gp_mode_selector.setToolTip(
+            'Госпошлина, о которой не решил порог или файл правил, показывается одной таблицей.\n'
+            'Файл правил — JSON: {"номер обязательства": true или false}.'
+        )
+        layout_gp.addWidget(self.gp_mode_selector)
+
+        self.gp_threshold = QDoubleSpinBox()
+        self.gp_threshold.setRange(0, 1_000_000_000)
+        self.gp_threshold.setDecimals(2)
+        self.gp_threshold.setPrefix('порог ')
+        layout_gp.addWidget(self.gp_threshold)
+        grid4.addLayout(layout_gp, 4, 0)
+
+        layout_gp_rules = QHBoxLayout()
+        layout_gp_rules.addWidget(QLabel('Файл правил:'))
+        self.gp_rules_path = QLineEdit()
+        self.gp_rules_path.setPlaceholderText('JSON с правилами учета госпошлины по номеру обязательства')
+        layout_gp_rules.addWidget(self.gp_rules_path)
+        self.btn_gp_rules_browse = QPushButton('Обзор')
+        self.btn_gp_rules_browse.clicked.connect(lambda: self.gp_rules_browse_clicked.emit())
+        layout_gp_rules.addWidget(self.btn_gp_rules_browse)
+        grid4.addLayout(layout_gp_rules, 5, 0)
+
         group4.setLayout(grid4)
         main_layout.addWidget(group4)
 
@@ -88,6 +88,7 @@ def load_arbitter_name() -> str | None:
 
     return value
 
+
 # Форматирование шапки документа
 def save_format_header(value: bool) -> None:
     """Сохраняет в настройках 'Форматирование шапки документа'"""
@@ -106,6 +107,24 @@ def load_format_header() -> bool | None:
     return value
 
 
+# Откат шага обработки заявления
+def save_checkpoint(value: bool) -> None:
+    """Сохраняет в настройках 'Сохранять заявление с успешными шагами при ошибке шага'"""
+    set_setting('checkpoint', value)
+
+
+def load_checkpoint() -> bool:
+    """
+    Загружает флаг 'Сохранять заявление с успешными шагами при ошибке шага' из settings.json.
+    Возвращает False, если настройка не существует.
+    """
+    value = get_setting('checkpoint')
+    if not value:
+        return False
+
+    return value
+
+
 # Пересохранение РЦИ
 def save_resave_rci(value: bool) -> None:
     """Сохраняет в настройках 'Пересохранение РЦИ после расчета'"""
@@ -124,6 +143,94 @@ def load_resave_rci() -> bool | None:
     return value
 
 
+# Параллельный расчет РЦИ
+def save_parallel_rci(value: bool) -> None:
+    """Сохраняет в настройках 'Разбирать файлы РЦИ в нескольких процессах'"""
+    set_setting('parallel_rci', value)
+
+
+def load_parallel_rci() -> bool:
+    """
+    Загружает флаг 'Разбирать файлы РЦИ в нескольких процессах' из settings.json.
+    Возвращает False, если настройка не существует.
+    """
+    value = get_setting('parallel_rci')
+    if not value:
+        return False
+
+    return value
+
+
+# Кэш разбора РЦИ
+def save_cache_rci(value: bool) -> None:
+    """Сохраняет в настройках 'Запоминать разобранные файлы РЦИ'"""
+    set_setting('cache_rci', value)
+
+
+def load_cache_rci() -> bool:
+    """
+    Загружает флаг 'Запоминать разобранные файлы РЦИ' из settings.json.
+    Возвращает True, если настройка не существует.
+    """
+    value = get_setting('cache_rci')
+    if value is None:
+        return True
+
+    return value
+
+
+# Учет госпошлины в расчете РЦИ
+def save_gp_mode(value: str) -> None:
+    """Сохраняет в настройках способ учета госпошлины (gp_policy.GP_MODES)"""
+    set_setting('gp_mode', value)
+
+
+def load_gp_mode() -> str:
+    """
+    Загружает способ учета госпошлины из settings.json.
+    Возвращает 'ask', если настройка не существует.
+    """
+    value = get_setting('gp_mode')
+    if not value:
+        return 'ask'
+
+    return value
+
+
+def save_gp_threshold(value: float) -> None:
+    """Сохраняет в настройках порог госпошлины: меньшая сумма учитывается"""
+    set_setting('gp_threshold', value)
+
+
+def load_gp_threshold() -> float:
+    """
+    Загружает порог госпошлины из settings.json.
+    Возвращает 0, если настройка не существует.
+    """
+    value = get_setting('gp_threshold')
+    if not value:
+        return 0
+
+    return value
+
+
+def save_gp_rules_file(path: str) -> None:
+    """Сохраняет в настройках путь к файлу правил госпошлины"""
+    set_setting('gp_rules_file', path)
+
+
+def load_gp_rules_file() -> str | None:
+    """
+    Загружает путь к файлу правил госпошлины из settings.json.
+    Возвращает None, если настройка не существует.
+    """
+    value = get_setting('gp_rules_file')
+    if not value:
+        return None
+
+    return value
+
+
 # Показать кнопку Пересохраненить файлы
 def save_show_btn_resave(value: bool) -> None:
     """Сохраняет в настройках 'Показать кнопку Пересохранить файлы'"""
@@ -158,3 +265,39 @@ def load_all_in_arbitter() -> bool | None:
         return False
 
     return value
+
+
+# Способ формирования файлов в папке арбитр
+def save_materialize_mode(value: str) -> None:
+    """Сохраняет в настройках способ формирования файлов в папке арбитр"""
+    set_setting('materialize_mode', value)
+
+
+def load_materialize_mode() -> str:
+    """
+    Загружает способ формирования файлов в папке арбитр из settings.json.
+    Возвращает 'copy', если настройка не существует: ссылки и клоны включаются только явно.
+    """
+    value = get_setting('materialize_mode')
+    if not value:
+        return 'copy'
+
+    return value
+
+
+# Трассировка времени обработки пакета
+def save_trace(value: bool) -> None:
+    """Сохраняет в настройках 'Сохранять трассировку времени обработки'"""
+    set_setting('trace', value)
+
+
+def load_trace() -> bool:
+    """
+    Загружает флаг 'Сохранять трассировку времени обработки' из settings.json.
+    Возвращает False, если настройка не существует.
+    """
+    value = get_setting('trace')
+    if not value:
+        return False
+
+    return value
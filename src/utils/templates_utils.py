@@ -1,6 +1,79 @@
+import os
+import threading
 from pathlib import Path
+from typing import Any, Callable
 
 from src.core.docx_tools import open_docx
+from src.utils.text_utils import TargetList
+
+
+class TemplateRegistry:
+    """
+    Кэш загруженных шаблонов на процесс.
+    Каждый шаблон читается и разбирается один раз, запись сбрасывается
+    только при изменении mtime или размера файла.
+    Возвращаемые объекты общие для всех вызовов — изменять их нельзя.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, tuple[tuple[int, int], Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str | Path, parser: Callable[[Path], Any]) -> Any:
+        """
+        Возвращает разобранный шаблон из кэша или загружает его через parser.
+        :raises FileNotFoundError: если файл шаблона не существует
+        """
+        path = Path(path)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        key = str(path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = parser(path)
+        with self._lock:
+            self._entries[key] = (stamp, value)
+        return value
+
+    def stats(self) -> dict:
+        """Счётчики попаданий/промахов кэша"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+    def clear(self) -> None:
+        """Очищает кэш и счётчики"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_registry = TemplateRegistry()
+
+
+def template_cache_stats() -> dict:
+    """Статистика кэша шаблонов: hits, misses, entries"""
+    return _registry.stats()
+
+
+def clear_template_cache() -> None:
+    """Сбрасывает кэш шаблонов"""
+    _registry.clear()
+
+
+def _read_lines(path: Path) -> TargetList:
+    """Чтение непустых строк текстового шаблона"""
+    with open(path, 'r', encoding='utf-8') as file:
+        return TargetList(line.strip('\n') for line in file if line.strip())
+
 
 # ==== Шаблоны для блока Обязательство ====
 DEL_WORDS_OBYAZATELSTVO_PATH = 'templates/obyazatelstvo/del_words.txt'
@@ -9,9 +82,7 @@ DEL_WORDS_OBYAZATELSTVO_PATH = 'templates/obyazatelstvo/del_words.txt'
 def load_del_words_obyazatelstv() -> list[str]:
     """Загрузка слов для удаления в частях Обязательств"""
     try:
-        with open(DEL_WORDS_OBYAZATELSTVO_PATH, 'r', encoding='utf-8') as file:
-            words = [line.strip('\n') for line in file if line.strip()]
-        return words
+        return _registry.get(DEL_WORDS_OBYAZATELSTVO_PATH, _read_lines)
     except FileNotFoundError:
         return None
 
@@ -22,9 +93,7 @@ DEL_PARAGRAPHS_OBYAZATELSTVO_PATH = 'templates/obyazatelstvo/del_paragraphs.txt'
 def load_del_paragraphs_obyazatelstv() -> list[str]:
     """Загрузка параграфов для удаления в частях Обязательств"""
     try:
-        with open(DEL_PARAGRAPHS_OBYAZATELSTVO_PATH, 'r', encoding='utf-8') as file:
-            paragraphs = [line.strip('\n') for line in file if line.strip()]
-        return paragraphs
+        return _registry.get(DEL_PARAGRAPHS_OBYAZATELSTVO_PATH, _read_lines)
     except FileNotFoundError:
         return None
 
@@ -36,8 +105,7 @@ GOSPOSHLINA_TEMPLATE_PATH = 'templates/gosposhlina/add_gosposhlina.docx'
 def load_gosposhlina_template():
     """Загрузка шаблона вставки госпошлины"""
     try:
-        gp_temp = open_docx(GOSPOSHLINA_TEMPLATE_PATH)
-        return gp_temp
+        return _registry.get(GOSPOSHLINA_TEMPLATE_PATH, open_docx)
     except FileNotFoundError:
         return None
 
@@ -48,9 +116,7 @@ DEL_PARAGRAPHS_GOSPOSHLINA_PATH = 'templates/gosposhlina/del_paragraphs.txt'
 def load_del_paragraphs_gosposhlina():
     """Загрузка параграфов для удаления в блоке ПРОСИТ СУД"""
     try:
-        with open(DEL_PARAGRAPHS_GOSPOSHLINA_PATH, 'r', encoding='utf-8') as file:
-            paragraphs = [line.strip('\n') for line in file if line.strip()]
-        return paragraphs
+        return _registry.get(DEL_PARAGRAPHS_GOSPOSHLINA_PATH, _read_lines)
     except FileNotFoundError:
         return None
 
@@ -64,9 +130,7 @@ DEL_PARAGRAPHS_APPENDICES_PATH = 'templates/appendices/del_paragraphs.txt'
 def load_del_paragraphs_appendices():
     """Загрузка параграфов для удаления в блоке Приложения"""
     try:
-        with open(DEL_PARAGRAPHS_APPENDICES_PATH, 'r', encoding='utf-8') as file:
-            paragraphs = [line.strip('\n') for line in file if line.strip()]
-        return paragraphs
+        return _registry.get(DEL_PARAGRAPHS_APPENDICES_PATH, _read_lines)
     except FileNotFoundError:
         return None
 
@@ -85,8 +149,7 @@ BANK_REQUISITES_FILE = Path('templates/bank_requisites.docx')
 def load_bank_requisites() -> str | None:
     """Загрузка банковских реквизитов"""
     try:
-        bank_requisities = open_docx(BANK_REQUISITES_FILE)
-        return bank_requisities
+        return _registry.get(BANK_REQUISITES_FILE, open_docx)
     except FileNotFoundError:
         return None
 
@@ -98,8 +161,7 @@ ZALOG_CONTACTS_TEMPLATE_PATH = 'templates/zalog_contacts.docx'
 def load_zalog_contacts_template():
     """Загрузка шаблона вставки залоговых контактов"""
     try:
-        z_contacts = open_docx(ZALOG_CONTACTS_TEMPLATE_PATH)
-        return z_contacts
+        return _registry.get(ZALOG_CONTACTS_TEMPLATE_PATH, open_docx)
     except FileNotFoundError:
         return None
 
@@ -111,12 +173,6 @@ def load_path_signa() -> Path:
     """Загрузка пути к подписи"""
     try:
         # Приводим к Path для удобной работы
-        signa_path = Path(SIGNA_PATH)
-
-        if not signa_path.exists():
-            raise FileNotFoundError(f'Файл подписи не найден: {signa_path}')
-
-        return signa_path
-
+        return _registry.get(SIGNA_PATH, Path)
     except FileNotFoundError:
         return None
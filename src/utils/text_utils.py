@@ -1,5 +1,6 @@
 import re
-from typing import Optional
+from functools import cached_property
+from typing import Iterable, Optional
 
 
 def sanitize_filename(name: str) -> str:
@@ -49,3 +50,42 @@ def get_number_obligation_from_foldername(foldername: str) -> Optional[str]:
         return candidate
 
     return None
+
+
+class TargetMatcher:
+    """
+    Поиск и удаление сразу всех фраз из списка за один проход по строке.
+    Фразы компилируются в одно регулярное выражение; более длинные фразы
+    проверяются раньше коротких, поэтому при пересечении удаляется длинная.
+    """
+
+    def __init__(self, targets: Iterable[str]):
+        self.targets = tuple(target for target in targets if target)
+        phrases = sorted(set(self.targets), key=len, reverse=True)
+        self._regex = re.compile('|'.join(re.escape(phrase) for phrase in phrases)) if phrases else None
+
+    def __bool__(self) -> bool:
+        return self._regex is not None
+
+    def search(self, text: str) -> bool:
+        """Есть ли в тексте хотя бы одна фраза"""
+        return self._regex is not None and self._regex.search(text) is not None
+
+    def remove(self, text: str) -> str:
+        """Удаляет из текста все вхождения всех фраз"""
+        return self._regex.sub('', text) if self._regex is not None else text
+
+
+class TargetList(list):
+    """Список фраз шаблона, скомпилированный TargetMatcher строится один раз и хранится вместе со списком"""
+
+    @cached_property
+    def matcher(self) -> TargetMatcher:
+        return TargetMatcher(self)
+
+
+def get_matcher(targets: Iterable[str]) -> TargetMatcher:
+    """Возвращает закэшированный TargetMatcher списка шаблона или компилирует новый"""
+    if isinstance(targets, TargetList):
+        return targets.matcher
+    return TargetMatcher(targets)
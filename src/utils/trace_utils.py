@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+try:  # psutil не обязателен: без него байты чтения/записи берутся из /proc (Linux) или не считаются
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def _io_counters() -> Optional[tuple[int, int]]:
+    """Байты, прочитанные и записанные процессом (все потоки), или None, если узнать нельзя"""
+    if psutil is not None:
+        try:
+            io = psutil.Process().io_counters()
+        except (psutil.Error, AttributeError):
+            return None
+        # read_chars/write_chars (Linux) учитывают и чтение из кэша ОС, как и на Windows
+        return getattr(io, 'read_chars', io.read_bytes), getattr(io, 'write_chars', io.write_bytes)
+    try:
+        with open('/proc/self/io', encoding='ascii') as f:
+            values = dict(line.split(':', 1) for line in f)
+        return int(values['rchar']), int(values['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+class Span:
+    """
+    Отрезок трассировки: время, процессорное время, байты чтения/записи и количество файлов.
+    Используется как контекстный менеджер: with tracer.span('Этап') as span: ...
+    Процессорное время и байты считаются по процессу целиком, поэтому включают работу пулов потоков.
+    """
+
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'files', 'start', 'wall', 'cpu', 'read', 'write', 'tid', '_begin')
+
+    def __init__(self, tracer: 'Tracer', name: str, cat: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.files = 0
+        self.start = self.wall = self.cpu = 0.0
+        self.read = self.write = None
+        self.tid = 0
+        self._begin = None
+
+    def add_files(self, count: int) -> None:
+        self.files += count
+
+    def __enter__(self) -> 'Span':
+        self.tid = threading.get_ident()
+        self._begin = (time.process_time(), _io_counters())
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.wall = time.perf_counter() - self.start
+        cpu_begin, io_begin = self._begin
+        self.cpu = time.process_time() - cpu_begin
+        io_end = _io_counters() if io_begin is not None else None
+        if io_end is not None:
+            self.read, self.write = io_end[0] - io_begin[0], io_end[1] - io_begin[1]
+        if exc_type is not None:
+            self.args['error'] = f'{exc_type.__name__}: {exc}'
+        self.tracer._add(self)
+
+
+class Tracer:
+    """
+    Сбор отрезков трассировки одной обработки (одного дела).
+    Результат сохраняется в формате Chrome trace (chrome://tracing, Perfetto).
+
+    :param name: Название для файла трассировки и итоговой строки
+    """
+
+    enabled = True
+
+    def __init__(self, name: str = ''):
+        self.name = name
+        self.spans: list[Span] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def span(self, name: str, cat: str = 'workflow', **args) -> Span:
+        return Span(self, name, cat, args)
+
+    def _add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def to_chrome_trace(self) -> dict:
+        pid = os.getpid()
+        events = []
+        for span in sorted(self.spans, key=lambda s: s.start):
+            args = {'cpu_ms': round(span.cpu * 1000, 3), 'files': span.files, **span.args}
+            if span.read is not None:
+                args['read_bytes'] = span.read
+                args['write_bytes'] = span.write
+            events.append(
+                {
+                    'name': span.name,
+                    'cat': span.cat,
+                    'ph': 'X',
+                    'ts': round((span.start - self._origin) * 1_000_000, 1),
+                    'dur': round(span.wall * 1_000_000, 1),
+                    'pid': pid,
+                    'tid': span.tid,
+                    'args': args,
+                }
+            )
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'name': self.name}}
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_chrome_trace(), ensure_ascii=False), encoding='utf-8')
+        return path
+
+    def summary(self, cat: str = 'stage') -> str:
+        """Одна строка: общее время и время каждого отрезка категории cat"""
+        spans = [s for s in self.spans if s.cat == cat]
+        total = sum(s.wall for s in spans)
+        parts = ', '.join(f'{s.name} {s.wall:.2f} с' for s in sorted(spans, key=lambda s: s.start))
+        line = f'Время обработки {total:.2f} с: {parts}' if parts else f'Время обработки {total:.2f} с'
+        read = sum(s.read for s in spans if s.read is not None)
+        write = sum(s.write for s in spans if s.write is not None)
+        files = sum(s.files for s in spans)
+        if any(s.read is not None for s in spans):
+            line += f'; чтение {read / 1024 / 1024:.1f} МБ, запись {write / 1024 / 1024:.1f} МБ'
+        if files:
+            line += f'; файлов {files}'
+        return line
+
+
+class _NullSpan:
+    """Отрезок выключенной трассировки: ничего не измеряет"""
+
+    __slots__ = ()
+    files = 0
+
+    def add_files(self, count: int) -> None:
+        pass
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullTracer:
+    """Выключенная трассировка: span() возвращает один общий пустой объект"""
+
+    enabled = False
+    name = ''
+    spans: list = []
+
+    def span(self, name: str, cat: str = 'workflow', **args) -> _NullSpan:
+        return _NULL_SPAN
+
+    def summary(self, cat: str = 'stage') -> str:
+        return ''
+
+
+NULL_TRACER = NullTracer()